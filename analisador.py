@@ -1,239 +1,369 @@
 from nos import *
+from visitante import executar
+from lexico import TokenBuffer, IDENTIFIER, KEYWORD, NUMBER, STRING, OPERATOR, DELIMITER, EOF, KIND_NAMES
+
+class SyntaxErrors(SyntaxError):
+    """Todos os erros de sintaxe encontrados em uma análise (ver Parser.parse_program)."""
+    def __init__(self, errors):
+        super().__init__("\n".join(errors))
+        self.errors = errors
 
 class Parser:
-    def __init__(self, tokens):
+    # Os métodos que analisam instruções (que podem se aninhar) são geradores: a
+    # sub-análise é pedida com 'no = yield self.parse_...()' e executada com pilha
+    # explícita por visitante.executar, sem limite de profundidade de aninhamento.
+    #
+    # Erros de sintaxe não interrompem a análise: cada um é registrado com linha e
+    # coluna e o parser se recupera em modo pânico, descartando tokens até o fim da
+    # instrução (';') ou do bloco ('}'). Ao final, parse_program lança SyntaxErrors com
+    # todos os erros; com 'max_errors', a análise para ao atingir o limite.
+    def __init__(self, tokens, max_errors=None):
+        # Recebe um lexico.TokenBuffer, preenchido sob demanda enquanto o parser avança.
+        # O token atual fica em self.kind (código inteiro do tipo) e self.value.
         self.tokens = tokens
-        self.pos = 0
-        self.current_token = self.tokens[self.pos] if self.pos < len(self.tokens) else None
+        self.max_errors = max_errors
+        self.errors = []
+        self.last_error = None
+        self.kinds = tokens.kinds
+        self.values = tokens.values
+        self.available = 0
+        self.pos = -1
+        self.advance()
 
     def advance(self):
         self.pos += 1
-        self.current_token = self.tokens[self.pos] if self.pos < len(self.tokens) else None
+        pos = self.pos
+        if pos + 1 >= self.available:
+            # Garante o token atual e o de lookahead no buffer.
+            self.available = self.tokens.fill(pos + TokenBuffer.CHUNK)
+        if pos < self.available:
+            self.kind = self.kinds[pos]
+            self.value = self.values[pos]
+        else:
+            self.kind = EOF
+            self.value = None
+
+    def peek(self):
+        # Retorna (tipo, valor) do próximo token sem consumi-lo.
+        pos = self.pos + 1
+        if pos < self.available:
+            return self.kinds[pos], self.values[pos]
+        return EOF, None
+
+    @property
+    def current_token(self):
+        # Forma legível do token atual (tipo e valor), usada nas mensagens de erro; a linha e
+        # a coluna são acrescentadas por report.
+        if self.kind == EOF:
+            return "o fim do arquivo"
+        return f"{KIND_NAMES[self.kind]} '{self.value}'"
+
+    def span(self, node, first, last=None):
+        # Registra no nó o trecho do código-fonte entre o token 'first' e o token 'last'
+        # (por padrão, o último token consumido).
+        node.span = self.tokens.starts[first] << 32 | self.tokens.ends[self.pos - 1 if last is None else last]
+        return node
 
     def eat(self, token_type, value=None):
-        if self.current_token and self.current_token[0] == token_type:
-            if value is None or self.current_token[1] == value:
-                token = self.current_token
-                self.advance()
-                return token
-        raise SyntaxError(f"Esperado token {token_type} ('{value}') mas encontrou {self.current_token}")
+        if self.kind == token_type and (value is None or self.value == value):
+            token_value = self.value
+            self.advance()
+            return token_value
+        raise SyntaxError(f"Esperado token {KIND_NAMES[token_type]} ('{value}') mas encontrou {self.current_token}")
+
+    def report(self, error):
+        # Registra o erro na posição do token atual. Erros em cascata no mesmo token
+        # (como um '}' ausente no fim do arquivo, visto por cada bloco aberto) contam uma vez.
+        if self.last_error == self.pos:
+            return
+        self.last_error = self.pos
+        if self.kind != EOF:
+            line, column = self.tokens.position(self.pos)
+        else:
+            line, column = self.tokens.line_column(len(self.tokens.code))
+        self.errors.append(f"{error} (linha {line}, coluna {column})")
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            self.errors.append(f"Limite de {self.max_errors} erro(s) atingido; análise interrompida.")
+            raise SyntaxErrors(self.errors)
+
+    def synchronize(self):
+        # Modo pânico: descarta tokens até depois de um ';' ou antes do '}' que fecha o
+        # bloco atual. Blocos abertos no trecho descartado são pulados inteiros.
+        depth = 0
+        while self.kind != EOF:
+            if self.kind == DELIMITER:
+                if self.value == '{':
+                    depth += 1
+                elif self.value == '}':
+                    if depth == 0:
+                        return
+                    depth -= 1
+                    if depth == 0:
+                        self.advance()
+                        return
+                elif self.value == ';' and depth == 0:
+                    self.advance()
+                    return
+            self.advance()
+
+    def skip_function(self):
+        # Descarta tokens até depois do '}' que fecha a definição de função atual.
+        depth = 0
+        while self.kind != EOF:
+            if self.kind == DELIMITER and self.value == '{':
+                depth += 1
+            elif self.kind == DELIMITER and self.value == '}':
+                depth -= 1
+                if depth <= 0:
+                    self.advance()
+                    return
+            self.advance()
 
     def parse_program(self):
         nodes = []
-        while self.current_token:
-            nodes.append(self.parse_function_definition())
+        while self.kind != EOF:
+            try:
+                nodes.append(executar(self.parse_function_definition()))
+            except SyntaxErrors:
+                raise
+            except SyntaxError as error:
+                self.report(error)
+                self.skip_function()
+        if self.errors:
+            raise SyntaxErrors(self.errors)
         return nodes
 
     def parse_function_definition(self):
-        return_type = self.eat('KEYWORD')[1]
-        name = self.eat('IDENTIFIER')[1]
-        self.eat('DELIMITER', '(')
-        self.eat('DELIMITER', ')')
-        body = self.parse_compound_statement()
-        return FunctionDefinition(name=name, return_type=return_type, body=body)
+        first = self.pos
+        return_type = self.eat(KEYWORD)
+        name = self.eat(IDENTIFIER)
+        self.eat(DELIMITER, '(')
+        self.eat(DELIMITER, ')')
+        body = yield self.parse_compound_statement()
+        return self.span(FunctionDefinition(name=name, return_type=return_type, body=body), first)
 
     def parse_compound_statement(self):
-        self.eat('DELIMITER', '{')
+        first = self.pos
+        self.eat(DELIMITER, '{')
         statements = []
-        while self.current_token and self.current_token[1] != '}':
-            statements.append(self.parse_statement())
-        self.eat('DELIMITER', '}')
-        return CompoundStatement(statements)
+        while self.kind != EOF and self.value != '}':
+            try:
+                statements.append((yield self.parse_statement()))
+            except SyntaxErrors:
+                raise
+            except SyntaxError as error:
+                self.report(error)
+                self.synchronize()
+        self.eat(DELIMITER, '}')
+        return self.span(CompoundStatement(statements), first)
 
     def parse_statement(self):
         # Analisa uma única instrução.
-        if not self.current_token:
+        if self.kind == EOF:
             raise SyntaxError("Fim inesperado da entrada durante análise de instrução.")
 
-        token_type, token_value = self.current_token
+        token_type, token_value = self.kind, self.value
 
         # Declaração de variável
-        if token_type == 'KEYWORD' and token_value in ['int', 'char', 'float']:
+        if token_type == KEYWORD and token_value in ['int', 'char', 'float']:
             return self.parse_declaration()
 
         # Condicional IF
-        elif token_type == 'KEYWORD' and token_value == 'if':
-            return self.parse_if_statement()
+        elif token_type == KEYWORD and token_value == 'if':
+            return (yield self.parse_if_statement())
 
         # Laço FOR
-        elif token_type == 'KEYWORD' and token_value == 'for':
-            return self.parse_for_statement()
+        elif token_type == KEYWORD and token_value == 'for':
+            return (yield self.parse_for_statement())
 
         # Laço WHILE
-        elif token_type == 'KEYWORD' and token_value == 'while':
-            return self.parse_while_statement()
+        elif token_type == KEYWORD and token_value == 'while':
+            return (yield self.parse_while_statement())
 
         # Laço DO ... WHILE
-        elif token_type == 'KEYWORD' and token_value == 'do':
-            return self.parse_do_while_statement()
+        elif token_type == KEYWORD and token_value == 'do':
+            return (yield self.parse_do_while_statement())
 
         # Retorno
-        elif token_type == 'KEYWORD' and token_value == 'return':
+        elif token_type == KEYWORD and token_value == 'return':
             return self.parse_return_statement()
 
         # Chamada de função (ex: printf)
-        elif token_type == 'KEYWORD' and token_value == 'printf':
+        elif token_type == KEYWORD and token_value == 'printf':
             return self.parse_function_call()
 
         # Atribuição ou incremento (IDENTIFIER)
-        elif token_type == 'IDENTIFIER':
-            next_token = self.tokens[self.pos + 1] if self.pos + 1 < len(self.tokens) else None
+        elif token_type == IDENTIFIER:
+            next_type, next_value = self.peek()
 
             # Atribuição tradicional: x = ...
-            if next_token and next_token[0] == 'OPERATOR' and next_token[1] == '=':
+            if next_type == OPERATOR and next_value == '=':
                 return self.parse_assignment()
 
             # Operadores de incremento simples: x++, x--
-            elif next_token and next_token[0] == 'OPERATOR' and next_token[1] in ['++', '--']:
-                lhs = Identifier(self.eat('IDENTIFIER')[1])
-                op = self.eat('OPERATOR')[1]
+            elif next_type == OPERATOR and next_value in ['++', '--']:
+                first = self.pos
+                lhs = self.span(Identifier(self.eat(IDENTIFIER)), first)
+                op = self.eat(OPERATOR)
                 # Converte para uma atribuição implícita
                 rhs = BinaryOperation(
                     op='+' if op == '++' else '-',
                     left=lhs,
                     right=Constant('1', 'int')
                 )
-                self.eat('DELIMITER', ';')
-                return Assignment(lhs=lhs, rhs=rhs)
+                self.eat(DELIMITER, ';')
+                return self.span(Assignment(lhs=lhs, rhs=rhs), first)
 
         # Se nenhum caso corresponde
         raise SyntaxError(f"Instrução inesperada iniciada com o token: {self.current_token}")
 
 
     def parse_declaration(self):
-        var_type = self.eat('KEYWORD')[1]
-        name = self.eat('IDENTIFIER')[1]
+        first = self.pos
+        var_type = self.eat(KEYWORD)
+        name = self.eat(IDENTIFIER)
         initial_value = None
-        if self.current_token and self.current_token[1] == '=':
-            self.eat('OPERATOR', '=')
+        if self.kind != EOF and self.value == '=':
+            self.eat(OPERATOR, '=')
             initial_value = self.parse_expression()
-        self.eat('DELIMITER', ';')
-        return Declaration(var_type=var_type, name=name, initial_value=initial_value)
+        self.eat(DELIMITER, ';')
+        return self.span(Declaration(var_type=var_type, name=name, initial_value=initial_value), first)
 
     def parse_assignment(self, for_header=False):
-        lhs = Identifier(self.eat('IDENTIFIER')[1])
+        first = self.pos
+        lhs = self.span(Identifier(self.eat(IDENTIFIER)), first)
 
-        if self.current_token[0] == 'OPERATOR' and self.current_token[1] == '=':
-            self.eat('OPERATOR', '=')
+        if self.kind == OPERATOR and self.value == '=':
+            self.eat(OPERATOR, '=')
             rhs = self.parse_expression()
             if not for_header:
-                self.eat('DELIMITER', ';')
-            return Assignment(lhs=lhs, rhs=rhs)
-        elif self.current_token[0] == 'OPERATOR' and self.current_token[1] in ['++', '--']:
-            op = self.eat('OPERATOR')[1]
+                self.eat(DELIMITER, ';')
+            return self.span(Assignment(lhs=lhs, rhs=rhs), first)
+        elif self.kind == OPERATOR and self.value in ['++', '--']:
+            op = self.eat(OPERATOR)
             if not for_header:
-                self.eat('DELIMITER', ';')
-            return UnaryOperation(op=op, operand=lhs, is_postfix=True)
+                self.eat(DELIMITER, ';')
+            return self.span(UnaryOperation(op=op, operand=lhs, is_postfix=True), first)
         else:
             raise SyntaxError(f"Esperado '=' ou '++/--' após identificador, mas encontrou {self.current_token}")
 
     def parse_if_statement(self):
-        self.eat('KEYWORD', 'if')
-        self.eat('DELIMITER', '(')
+        first = self.pos
+        self.eat(KEYWORD, 'if')
+        self.eat(DELIMITER, '(')
         condition = self.parse_expression()
-        self.eat('DELIMITER', ')')
-        true_body = self.parse_compound_statement()
+        self.eat(DELIMITER, ')')
+        true_body = yield self.parse_compound_statement()
         false_body = None
-        if self.current_token and self.current_token[0] == 'KEYWORD' and self.current_token[1] == 'else':
-            self.eat('KEYWORD', 'else')
-            false_body = self.parse_compound_statement()
-        return IfStatement(condition=condition, true_body=true_body, false_body=false_body)
+        if self.kind == KEYWORD and self.value == 'else':
+            self.eat(KEYWORD, 'else')
+            false_body = yield self.parse_compound_statement()
+        return self.span(IfStatement(condition=condition, true_body=true_body, false_body=false_body), first)
 
     def parse_for_statement(self):
-        self.eat('KEYWORD', 'for')
-        self.eat('DELIMITER', '(')
+        first = self.pos
+        self.eat(KEYWORD, 'for')
+        self.eat(DELIMITER, '(')
 
         # init
-        if self.current_token[0] == 'KEYWORD' and self.current_token[1] in ['int', 'char', 'float']:
+        if self.kind == KEYWORD and self.value in ['int', 'char', 'float']:
             init = self.parse_declaration()
-        elif self.current_token[0] == 'IDENTIFIER':
+        elif self.kind == IDENTIFIER:
             init = self.parse_assignment(for_header=True)
-            self.eat('DELIMITER', ';')
-        elif self.current_token[0] == 'DELIMITER' and self.current_token[1] == ';':
+            self.eat(DELIMITER, ';')
+        elif self.kind == DELIMITER and self.value == ';':
             init = None
-            self.eat('DELIMITER', ';')
+            self.eat(DELIMITER, ';')
         else:
             raise SyntaxError(f"Parte 'init' inválida no for: {self.current_token}")
 
         # cond
-        if self.current_token[1] != ';':
+        if self.value != ';':
             cond = self.parse_expression()
         else:
             cond = None
-        self.eat('DELIMITER', ';')
+        self.eat(DELIMITER, ';')
 
         # incr
-        if self.current_token[1] != ')':
-            if self.current_token[0] == 'IDENTIFIER':
+        if self.value != ')':
+            if self.kind == IDENTIFIER:
                 incr = self.parse_assignment(for_header=True)
             else:
                 incr = None
         else:
             incr = None
-        self.eat('DELIMITER', ')')
+        self.eat(DELIMITER, ')')
 
-        body = self.parse_compound_statement()
+        body = yield self.parse_compound_statement()
 
-        return ForStatement(init=init, cond=cond, incr=incr, body=body)
+        return self.span(ForStatement(init=init, cond=cond, incr=incr, body=body), first)
 
     def parse_while_statement(self):
-        self.eat('KEYWORD', 'while')
-        self.eat('DELIMITER', '(')
+        first = self.pos
+        self.eat(KEYWORD, 'while')
+        self.eat(DELIMITER, '(')
         condition = self.parse_expression()
-        self.eat('DELIMITER', ')')
-        body = self.parse_compound_statement()
-        return WhileStatement(condition=condition, body=body)
+        self.eat(DELIMITER, ')')
+        body = yield self.parse_compound_statement()
+        return self.span(WhileStatement(condition=condition, body=body), first)
 
     def parse_do_while_statement(self):
-        self.eat('KEYWORD', 'do')
-        body = self.parse_compound_statement()
-        self.eat('KEYWORD', 'while')
-        self.eat('DELIMITER', '(')
+        first = self.pos
+        self.eat(KEYWORD, 'do')
+        body = yield self.parse_compound_statement()
+        self.eat(KEYWORD, 'while')
+        self.eat(DELIMITER, '(')
         condition = self.parse_expression()
-        self.eat('DELIMITER', ')')
-        self.eat('DELIMITER', ';')
-        return DoWhileStatement(body=body, condition=condition)
+        self.eat(DELIMITER, ')')
+        self.eat(DELIMITER, ';')
+        return self.span(DoWhileStatement(body=body, condition=condition), first)
 
     def parse_return_statement(self):
-        self.eat('KEYWORD', 'return')
+        first = self.pos
+        self.eat(KEYWORD, 'return')
         value = self.parse_expression()
-        self.eat('DELIMITER', ';')
-        return ReturnStatement(value)
+        self.eat(DELIMITER, ';')
+        return self.span(ReturnStatement(value), first)
 
     def parse_function_call(self):
-        name = Identifier(self.eat('KEYWORD', 'printf')[1])
-        self.eat('DELIMITER', '(')
+        first = self.pos
+        name = self.span(Identifier(self.eat(KEYWORD, 'printf')), first)
+        self.eat(DELIMITER, '(')
         args = []
-        if self.current_token[0] == 'STRING':
-            args.append(Constant(self.current_token[1], 'string'))
+        if self.kind == STRING:
+            args.append(self.span(Constant(self.value, 'string'), self.pos, self.pos))
             self.advance()
-        self.eat('DELIMITER', ')')
-        self.eat('DELIMITER', ';')
-        return FunctionCall(name=name, args=args)
+        self.eat(DELIMITER, ')')
+        self.eat(DELIMITER, ';')
+        return self.span(FunctionCall(name=name, args=args), first)
 
     def parse_expression(self):
+        first = self.pos
         # CORREÇÃO: Removida a verificação inicial restritiva.
         # O trabalho de validar o token inicial é do parse_term.
         left = self.parse_term()
-        while self.current_token and self.current_token[0] == 'OPERATOR':
-            op = self.current_token[1]
+        while self.kind == OPERATOR:
+            op = self.value
             if op not in ['+', '-', '*', '/', '<', '>', '<=', '>=', '==', '!=']:
                 break
-            self.eat('OPERATOR', op)
+            self.eat(OPERATOR, op)
             right = self.parse_term()
-            left = BinaryOperation(op=op, left=left, right=right)
+            left = self.span(BinaryOperation(op=op, left=left, right=right), first)
         return left
 
     def parse_term(self):
-        token_type, token_value = self.current_token
-        if token_type == 'NUMBER':
+        first = self.pos
+        if self.kind == EOF:
+            raise SyntaxError("Fim inesperado da entrada durante análise de expressão.")
+        token_type, token_value = self.kind, self.value
+        if token_type == NUMBER:
             self.advance()
-            return Constant(token_value, 'int')
-        elif token_type == 'IDENTIFIER':
+            return self.span(Constant(token_value, 'int'), first)
+        elif token_type == IDENTIFIER:
             self.advance()
-            return Identifier(token_value)
+            return self.span(Identifier(token_value), first)
         # CORREÇÃO: Adicionado suporte para strings como um termo.
-        elif token_type == 'STRING':
+        elif token_type == STRING:
             self.advance()
-            return Constant(token_value, 'string')
+            return self.span(Constant(token_value, 'string'), first)
         raise SyntaxError(f"Termo inesperado na expressão: {self.current_token}")
\ No newline at end of file
@@ -0,0 +1,219 @@
+from intermediario import Var, Copy, BinOp, Print, Jump, CondJump, Return, NEGATED
+from registradores import LOCAL_REGISTERS, LOOP_WEIGHT, linear_scan, assign_stack_slots, frame_size
+from gerador_assembly import string_label, assemble
+
+ARITHMETIC = {'+': 'add', '-': 'sub', '*': 'imul'}
+CONDITION_CODES = {'<': 'l', '>': 'g', '<=': 'le', '>=': 'ge', '==': 'e', '!=': 'ne'}
+
+def live_intervals(function):
+    """
+    Intervalos de vida das variáveis e temporários da função sobre a numeração linear
+    das instruções, a partir da análise de variáveis vivas do CFG. Retorna
+    [(início, fim, peso, variável)] ordenados pelo início, como em registradores.py.
+
+    O peso soma LOOP_WEIGHT ** profundidade por uso; a profundidade de cada bloco é o
+    número de arestas de retorno (para um bloco anterior na ordem) que o envolvem.
+    """
+    _, live_out = function.liveness()
+    index = {block: i for i, block in enumerate(function.blocks)}
+    depth = [0] * len(function.blocks)
+    for block in function.blocks:
+        for successor in block.successors:
+            if index[successor] <= index[block]:
+                for i in range(index[successor], index[block] + 1):
+                    depth[i] += 1
+
+    start = {}
+    end = {}
+    weight = {}
+    position = 0
+    for block in function.blocks:
+        first = position
+        position += len(block.instructions)
+        live = set(live_out[block])
+        for var in live:
+            end[var] = max(end.get(var, -1), position - 1)
+            start[var] = min(start.get(var, position), first)
+        for offset in range(len(block.instructions) - 1, -1, -1):
+            instruction = block.instructions[offset]
+            here = first + offset
+            dest = instruction.defines()
+            uses = instruction.uses()
+            for var in uses + ([dest] if dest is not None else []):
+                start[var] = min(start.get(var, here), here)
+                end[var] = max(end.get(var, here), here)
+                weight[var] = weight.get(var, 0) + LOOP_WEIGHT ** min(depth[index[block]], 6)
+            if dest is not None:
+                live.discard(dest)
+            live.update(uses)
+        # Variáveis vivas na entrada do bloco ficam vivas desde a sua primeira instrução.
+        for var in live:
+            start[var] = min(start.get(var, first), first)
+            end[var] = max(end.get(var, first), first)
+
+    # Empates no início seguem a ordem de criação das variáveis: 'start' é preenchido a
+    # partir de conjuntos de Var, cuja ordem de iteração depende dos endereços dos objetos.
+    order = {var: k for k, var in enumerate(function.variables)}
+    return sorted(((start[var], end[var], weight.get(var, 0), var) for var in start),
+                  key=lambda interval: (interval[0], order[interval[3]]))
+
+class X86Backend:
+    """
+    Traduz as funções em IR (intermediario.py) para o mesmo Assembly NASM do
+    AssemblyGenerator. Variáveis e temporários recebem esi/edi/ebx pela varredura
+    linear sobre os intervalos de 'live_intervals'; os demais ficam em posições
+    [ebp-N] reservadas com um único 'sub esp' no prólogo, compartilhadas entre valores
+    com intervalos de vida disjuntos. eax, ecx e edx servem de
+    rascunho dentro de cada instrução e nunca guardam valores entre instruções.
+    """
+    def __init__(self):
+        self.text_section = []
+        self.data_section = []
+        self.function_name = None
+        self.string_counter = 0
+        self.locations = {}
+        self.saved_registers = []
+
+    def generate(self, functions):
+        return assemble(self.generate_functions(functions))
+
+    def generate_functions(self, functions):
+        # Assembly de cada função como (linhas da seção de dados, texto), como no
+        # AssemblyGenerator; os rótulos dos blocos já são numerados por função na IR.
+        return [self.function(function) for function in functions]
+
+    def emit(self, line):
+        self.text_section.append(line)
+
+    def function(self, function):
+        self.text_section = []
+        self.data_section = []
+        self.function_name = function.name
+        self.string_counter = 0
+        intervals = live_intervals(function)
+        self.locations = linear_scan(intervals)
+        used = set(self.locations.values())
+        self.saved_registers = [register for register in LOCAL_REGISTERS if register in used]
+        locals_size = assign_stack_slots(intervals, self.locations, -4 * len(self.saved_registers))
+        calls = any(type(instruction) is Print for block in function.blocks for instruction in block.instructions)
+        size = frame_size(locals_size, len(self.saved_registers), calls)
+
+        self.emit(f"global {function.name}")
+        self.emit(f"\n{function.name}:")
+        self.emit("  push ebp")
+        self.emit("  mov ebp, esp")
+        for register in self.saved_registers:
+            self.emit(f"  push {register}")
+        if size:
+            self.emit(f"  sub esp, {size}")
+
+        blocks = function.blocks
+        for i, block in enumerate(blocks):
+            following = blocks[i + 1] if i + 1 < len(blocks) else None
+            if block.predecessors:
+                self.emit(f".{block.label}:")
+            for instruction in block.instructions:
+                self.instruction(instruction, following)
+        return self.data_section, "\n".join(self.text_section)
+
+    def operand(self, value):
+        if type(value) is Var:
+            return self.locations[value]
+        return str(value)
+
+    def is_memory(self, location):
+        return location[0] == '['
+
+    def instruction(self, instruction, following):
+        kind = type(instruction)
+        if kind is Copy:
+            self.move(self.operand(instruction.dest), self.operand(instruction.src))
+        elif kind is BinOp:
+            self.binary(instruction)
+        elif kind is CondJump:
+            self.conditional_jump(instruction, following)
+        elif kind is Jump:
+            if instruction.target is not following:
+                self.emit(f"  jmp .{instruction.target.label}")
+        elif kind is Return:
+            if instruction.value is not None:
+                self.move("eax", self.operand(instruction.value))
+            if self.saved_registers:
+                self.emit(f"  lea esp, [ebp-{4 * len(self.saved_registers)}]")
+                for register in reversed(self.saved_registers):
+                    self.emit(f"  pop {register}")
+            else:
+                self.emit("  mov esp, ebp")
+            self.emit("  pop ebp")
+            self.emit("  ret")
+        elif kind is Print:
+            label = string_label(self.function_name, self.string_counter)
+            self.string_counter += 1
+            self.data_section.append(f'  {label} db {instruction.string}, 10, 0')
+            self.emit(f"  push {label}")
+            self.emit("  call printf")
+            self.emit("  add esp, 4")
+
+    def move(self, dest, src):
+        if dest == src:
+            return
+        if self.is_memory(dest) and self.is_memory(src):
+            self.emit(f"  mov eax, {src}")
+            src = "eax"
+        elif self.is_memory(dest) and not src[0].isalpha():
+            dest = f"dword {dest}"
+        self.emit(f"  mov {dest}, {src}")
+
+    def binary(self, instruction):
+        dest = self.operand(instruction.dest)
+        left = self.operand(instruction.left)
+        right = self.operand(instruction.right)
+        op = instruction.op
+
+        if op in ARITHMETIC:
+            if not self.is_memory(dest) and dest != right:
+                self.move(dest, left)
+                self.emit(f"  {ARITHMETIC[op]} {dest}, {right}")
+            elif not self.is_memory(dest) and op != '-':
+                # dest já contém o operando direito e a operação é comutativa.
+                self.emit(f"  {ARITHMETIC[op]} {dest}, {left}")
+            else:
+                self.move("eax", left)
+                self.emit(f"  {ARITHMETIC[op]} eax, {right}")
+                self.move(dest, "eax")
+        elif op == '/':
+            self.move("eax", left)
+            self.emit("  cdq")
+            if right[0].isalpha():
+                self.emit(f"  idiv {right}")
+            elif self.is_memory(right):
+                self.emit(f"  idiv dword {right}")
+            else:
+                self.emit(f"  mov ecx, {right}")
+                self.emit("  idiv ecx")
+            self.move(dest, "eax")
+        else:
+            self.move("eax", left)
+            self.emit(f"  cmp eax, {right}")
+            self.emit(f"  set{CONDITION_CODES[op]} al")
+            self.emit("  movzx eax, al")
+            self.move(dest, "eax")
+
+    def conditional_jump(self, instruction, following):
+        left = self.operand(instruction.left)
+        right = self.operand(instruction.right)
+        if not left[0].isalpha() and not self.is_memory(left) or self.is_memory(left) and self.is_memory(right):
+            # cmp não aceita um imediato à esquerda nem dois operandos em memória.
+            self.move("eax", left)
+            left = "eax"
+        elif self.is_memory(left) and not right[0].isalpha():
+            left = f"dword {left}"
+        self.emit(f"  cmp {left}, {right}")
+
+        op = instruction.op
+        if instruction.true_target is following:
+            self.emit(f"  j{CONDITION_CODES[NEGATED[op]]} .{instruction.false_target.label}")
+        else:
+            self.emit(f"  j{CONDITION_CODES[op]} .{instruction.true_target.label}")
+            if instruction.false_target is not following:
+                self.emit(f"  jmp .{instruction.false_target.label}")
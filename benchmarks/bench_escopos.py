@@ -0,0 +1,87 @@
+# Benchmark da tabela de escopos (escopos.py) em programas profundamente aninhados:
+# cada nível abre um bloco, declara uma variável e lê variáveis dos níveis mais
+# externos. Mede a análise semântica e a geração de código com a tabela atual, de
+# consulta O(1), e com a lista de dicionários percorrida do escopo mais interno para o
+# mais externo usada antes, cujo custo cresce com a profundidade. Só a análise
+# semântica consulta a tabela: a geração usa os símbolos anotados por ela.
+#
+# Uso: python benchmarks/bench_escopos.py [profundidade_maxima]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lexico
+from analisador import Parser
+from escopos import ScopedTable
+from semantico import SemanticAnalyzer
+from gerador_assembly import AssemblyGenerator
+from relatorio import Reporter, QUIET
+
+class TabelaAntiga:
+    # Cópia da tabela anterior, mantida apenas como referência de comparação.
+    def __init__(self):
+        self.scopes = [{}]
+
+    def push_scope(self):
+        self.scopes.append({})
+
+    def pop_scope(self):
+        return list(self.scopes.pop().values())
+
+    def define(self, name, value):
+        self.scopes[-1][name] = value
+
+    def defined_in_scope(self, name):
+        return name in self.scopes[-1]
+
+    def lookup(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+METODOS = ('__init__', 'push_scope', 'pop_scope', 'define', 'defined_in_scope', 'lookup')
+
+def programa_aninhado(profundidade):
+    # 'total' e 'n' são do nível mais externo; cada bloco também lê a variável do anterior.
+    partes = ["int main() { int total = 0; int n = 3; int v0 = 1;"]
+    for nivel in range(1, profundidade + 1):
+        partes.append(f"if (n > {nivel % 7}) {{ int v{nivel} = v{nivel - 1} + n; total = total + v{nivel};")
+    partes.append("}" * profundidade)
+    partes.append(" return total; }")
+    return " ".join(partes)
+
+def medir(ast, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        SemanticAnalyzer(Reporter(QUIET)).analyze(ast)
+        AssemblyGenerator().generate(ast)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def com_tabela_antiga(funcao, *args):
+    atuais = {nome: ScopedTable.__dict__[nome] for nome in METODOS}
+    for nome in METODOS:
+        setattr(ScopedTable, nome, TabelaAntiga.__dict__[nome])
+    try:
+        return funcao(*args)
+    finally:
+        for nome, metodo in atuais.items():
+            setattr(ScopedTable, nome, metodo)
+
+def main():
+    maxima = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    profundidades = sorted({p for p in (maxima // 16, maxima // 4, maxima) if p > 0})
+    print(f"{'profundidade':>12} {'antes (lista de dicts)':>24} {'depois (O(1))':>16} {'ganho':>8}")
+    for profundidade in profundidades:
+        ast = Parser(lexico.TokenBuffer(programa_aninhado(profundidade))).parse_program()
+        antes = com_tabela_antiga(medir, ast)
+        depois = medir(ast)
+        print(f"{profundidade:>12} {antes:>22.3f} s {depois:>14.3f} s {antes / depois:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
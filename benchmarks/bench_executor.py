@@ -0,0 +1,127 @@
+# Benchmark do executor em closures (executor.py): executa programas dominados por
+# laços (os de bench_lacos.py) com o executor, com um interpretador ingênuo que percorre
+# a AST a cada execução (despacho por tipo de nó e variáveis em um dicionário) e com a
+# simulação do Assembly gerado (simulador_x86.py). Os três precisam dar o mesmo resultado.
+#
+# Uso: python benchmarks/bench_executor.py [tamanho_dos_lacos]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import compilar_ate_otimizacao, compilar_codigo
+from executor import ClosureCompiler
+from visitante import Visitor
+from relatorio import Reporter, QUIET
+from simulador_x86 import executar
+from bench_lacos import gerar_programas
+
+class Retorno(Exception):
+    def __init__(self, valor):
+        self.valor = valor
+
+def int32(valor):
+    return ((valor + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+class InterpretadorIngenuo(Visitor):
+    # Referência de comparação: avalia cada nó visitando-o novamente a cada execução.
+    def __init__(self):
+        self.variaveis = {}
+        self.saida = []
+
+    def executar(self, ast):
+        for funcao in ast:
+            if funcao.name == 'main':
+                try:
+                    self.visit(funcao.body)
+                except Retorno as retorno:
+                    return retorno.valor, self.saida
+        return None, self.saida
+
+    def visit_CompoundStatement(self, node):
+        for statement in node.statements:
+            self.visit(statement)
+
+    def visit_Declaration(self, node):
+        if node.initial_value is not None:
+            self.variaveis[node.symbol] = self.visit(node.initial_value)
+
+    def visit_Assignment(self, node):
+        self.variaveis[node.lhs.symbol] = self.visit(node.rhs)
+
+    def visit_Identifier(self, node):
+        return self.variaveis.get(node.symbol, 0)
+
+    def visit_Constant(self, node):
+        return int(node.value)
+
+    def visit_BinaryOperation(self, node):
+        a, b = self.visit(node.left), self.visit(node.right)
+        op = node.op
+        if op == '+': return int32(a + b)
+        if op == '-': return int32(a - b)
+        if op == '*': return int32(a * b)
+        if op == '/':
+            quociente = abs(a) // abs(b)
+            return int32(quociente if (a < 0) == (b < 0) else -quociente)
+        return {'<': a < b, '>': a > b, '<=': a <= b, '>=': a >= b, '==': a == b, '!=': a != b,
+                '&&': a and b, '||': a or b}[op]
+
+    def visit_IfStatement(self, node):
+        if self.visit(node.condition):
+            self.visit(node.true_body)
+        elif node.false_body is not None:
+            self.visit(node.false_body)
+
+    def visit_WhileStatement(self, node):
+        while self.visit(node.condition):
+            self.visit(node.body)
+
+    def visit_DoWhileStatement(self, node):
+        self.visit(node.body)
+        while self.visit(node.condition):
+            self.visit(node.body)
+
+    def visit_ForStatement(self, node):
+        if node.init:
+            self.visit(node.init)
+        while node.cond is None or self.visit(node.cond):
+            self.visit(node.body)
+            if node.incr:
+                self.visit(node.incr)
+
+    def visit_FunctionCall(self, node):
+        self.saida.append(node.args[0].value[1:-1])
+
+    def visit_ReturnStatement(self, node):
+        raise Retorno(self.visit(node.value) if node.value else None)
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    print(f"{'programa':<20} {'simulador':>12} {'ingênuo':>12} {'closures':>12} {'ganho':>16}")
+    for nome, codigo in gerar_programas(n).items():
+        # -O0: a AST e o Assembly executam exatamente as mesmas operações do programa.
+        opcoes = {'otimizacao': 0}
+        ast = compilar_ate_otimizacao(codigo, Reporter(QUIET), opcoes)
+        _, assembly = compilar_codigo(codigo, Reporter(QUIET), opcoes)
+        simulado, t_simulador = cronometrar(lambda: executar(assembly, max_passos=10 ** 9))
+        ingenuo, t_ingenuo = cronometrar(lambda: InterpretadorIngenuo().executar(ast))
+
+        def closures():
+            compilador = ClosureCompiler()
+            compilador.compile(ast)
+            return compilador.run(), compilador.output
+        obtido, t_closures = cronometrar(closures)
+        assert simulado == ingenuo == obtido, (nome, simulado, ingenuo, obtido)
+        print(f"{nome:<20} {t_simulador:>10.3f} s {t_ingenuo:>10.3f} s {t_closures:>10.3f} s "
+              f"{t_ingenuo / t_closures:5.1f}x / {t_simulador / t_closures:5.0f}x")
+
+if __name__ == '__main__':
+    main()
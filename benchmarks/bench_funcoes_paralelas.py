@@ -0,0 +1,46 @@
+# Benchmark da compilação por função (compilacao_por_funcao.py): compila os programas
+# sintéticos de gerador_carga.py serialmente e com 1, 2, ... processos, e confere que o
+# Assembly é idêntico ao da compilação do arquivo inteiro em todos os casos. O ganho
+# depende do número de CPUs; com uma só, mede apenas o custo do pré-passo e do pool.
+#
+# Uso: python benchmarks/bench_funcoes_paralelas.py [--tamanhos medio grande] [--processos 1 2 4] [--ir] [-O N]
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import compilar_codigo, NIVEL_OTIMIZACAO_PADRAO
+from relatorio import Reporter, QUIET
+from gerador_carga import TAMANHOS, gerar_tamanho
+
+def cronometrar(codigo, opcoes, processos=None):
+    inicio = time.perf_counter()
+    sucesso, assembly = compilar_codigo(codigo, Reporter(QUIET), opcoes, processos=processos)
+    assert sucesso, "o programa sintético deveria compilar sem erros"
+    return assembly, time.perf_counter() - inicio
+
+def main():
+    parser = argparse.ArgumentParser(description="Compilação serial x compilação por função em paralelo")
+    parser.add_argument("--tamanhos", nargs="+", choices=list(TAMANHOS), default=['medio'])
+    parser.add_argument("--processos", nargs="+", type=int, default=[1, 2, os.cpu_count() or 1])
+    parser.add_argument("--ir", action="store_true", help="Gera o Assembly pelo código intermediário")
+    parser.add_argument("-O", dest="otimizacao", type=int, choices=range(4), default=NIVEL_OTIMIZACAO_PADRAO)
+    args = parser.parse_args()
+    opcoes = {'ir': args.ir, 'otimizacao': args.otimizacao}
+
+    print(f"{os.cpu_count()} CPU(s)")
+    for tamanho in args.tamanhos:
+        codigo = gerar_tamanho(tamanho)
+        referencia, serial = cronometrar(codigo, opcoes)
+        print(f"\n{tamanho} ({TAMANHOS[tamanho]['funcoes']} funções, {len(codigo) / 1024:.0f} KiB)")
+        print(f"  {'serial':<14} {serial:8.2f} s")
+        for processos in sorted(set(args.processos)):
+            assembly, tempo = cronometrar(codigo, opcoes, processos)
+            assert assembly == referencia, f"Assembly diferente com {processos} processo(s)"
+            print(f"  {f'{processos} processo(s)':<14} {tempo:8.2f} s  ({serial / tempo:.2f}x, Assembly idêntico)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# Benchmark da compilação incremental (compilacao_por_funcao.FunctionCache): compila um
+# programa sintético de gerador_carga.py com o cache, altera uma única função e mede a
+# recompilação, que deve depender do tamanho da alteração e não do arquivo. O Assembly
+# e os diagnósticos de cada recompilação são comparados com os da compilação do arquivo
+# inteiro sem cache, inclusive quando muda a assinatura de uma função usada por outras.
+#
+# Uso: python benchmarks/bench_incremental.py [--tamanhos medio grande] [--edicoes 5] [--ir] [-O N]
+
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import analisar_codigo_c, compilar_codigo, NIVEL_OTIMIZACAO_PADRAO
+from cache_compilacao import CompilationCache
+from relatorio import Reporter, QUIET
+from gerador_carga import TAMANHOS, gerar_tamanho
+
+# Edições de um programa em que 'main' nunca muda de texto, mas depende das funções
+# anteriores: como só printf pode ser chamada, uma função é vista pelas outras pelo nome
+# (identificadores e redefinições). Cada passo reescreve o arquivo inteiro.
+DEPENDENCIAS = [
+    'int g() { return 1; }\nint main() { int x = 1; return x; }',
+    'int g() { return 1; }\nint main() { return g; }',
+    'int h() { return 1; }\nint main() { return g; }',
+    'int g() { return 1; }\nint main() { return g; }',
+    'int main() { return g; }\nint g() { return 1; }',
+    'int g() { return 1; }\nint main() { int g = 1; return g; }',
+    'int f() { return 1; }\nint main() { int x = 1; return x; }',
+    'int main() { int x = 1; return x; }\nint main() { int x = 1; return x; }',
+    'int f() { return 1; }\nint main() { int x = 1; return x; }',
+]
+
+def compilar(caminho, cache, opcoes):
+    reporter = Reporter(QUIET)
+    inicio = time.perf_counter()
+    sucesso = analisar_codigo_c(caminho, gerar_arquivo=False, reporter=reporter, cache=cache, opcoes=opcoes)
+    return sucesso, reporter.diagnostics, time.perf_counter() - inicio
+
+def conferir(caminho, cache, opcoes, codigo):
+    # Recompila com o cache e compara o Assembly e os diagnósticos com os da compilação
+    # do arquivo inteiro. O Assembly vem da última entrada gravada no cache.
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(codigo)
+    sucesso, diagnosticos, tempo = compilar(caminho, cache, opcoes)
+    reporter = Reporter(QUIET)
+    esperado, assembly = compilar_codigo(codigo, reporter, opcoes)
+    entrada = cache.get(cache.key(codigo, opcoes))
+    assert (sucesso, diagnosticos) == (esperado, reporter.diagnostics), (codigo, diagnosticos, reporter.diagnostics)
+    assert entrada['assembly'] == assembly, f"Assembly diferente da compilação do arquivo inteiro:\n{codigo}"
+    return tempo
+
+def editar(codigo, funcao, valor):
+    # Troca a constante da primeira declaração da função 'funcao' do programa sintético e
+    # acrescenta uma linha, deslocando as funções seguintes.
+    inicio = codigo.index(f"int funcao{funcao}()")
+    return codigo[:inicio] + re.sub(r"int a0 = \d+;", f"// edição\n    int a0 = {valor};", codigo[inicio:], count=1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compilação completa x recompilação incremental por função")
+    parser.add_argument("--tamanhos", nargs="+", choices=list(TAMANHOS), default=['medio'])
+    parser.add_argument("--edicoes", type=int, default=5, help="Número de recompilações após editar uma função")
+    parser.add_argument("--ir", action="store_true", help="Gera o Assembly pelo código intermediário")
+    parser.add_argument("-O", dest="otimizacao", type=int, choices=range(4), default=NIVEL_OTIMIZACAO_PADRAO)
+    args = parser.parse_args()
+    opcoes = {'ir': args.ir, 'otimizacao': args.otimizacao}
+
+    pasta = tempfile.mkdtemp()
+    try:
+        caminho = os.path.join(pasta, "programa.c")
+        cache = CompilationCache(os.path.join(pasta, "cache"))
+        for codigo in DEPENDENCIAS:
+            conferir(caminho, cache, opcoes, codigo)
+        print(f"dependências de assinatura: {len(DEPENDENCIAS)} edições, resultados idênticos")
+
+        for tamanho in args.tamanhos:
+            codigo = gerar_tamanho(tamanho)
+            funcoes = TAMANHOS[tamanho]['funcoes']
+            print(f"\n{tamanho} ({funcoes} funções, {codigo.count(chr(10))} linhas, {len(codigo) / 1024:.0f} KiB)")
+            with open(caminho, 'w', encoding='utf-8') as f:
+                f.write(codigo)
+            _, _, completa = compilar(caminho, None, opcoes)
+            print(f"  {'sem cache':<24} {completa:8.2f} s")
+            _, _, primeira = compilar(caminho, cache, opcoes)
+            print(f"  {'primeira, com cache':<24} {primeira:8.2f} s")
+            tempos = []
+            for edicao in range(args.edicoes):
+                codigo = editar(codigo, edicao * 7 % funcoes, 1000 + edicao)
+                tempos.append(conferir(caminho, cache, opcoes, codigo))
+            media = sum(tempos) / len(tempos)
+            print(f"  {'uma função editada':<24} {media:8.2f} s  ({completa / media:.1f}x, Assembly idêntico)")
+    finally:
+        shutil.rmtree(pasta)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# Benchmark das otimizações de laços: compila programas dominados por laços 'for'
+# contados (escritos para o parser sem precedência: 'a * b + n > i' e não
+# 'i < a * b + n') com -O0 a -O3, pelos dois geradores, e mostra o número de instruções do
+# Assembly, o número de instruções executadas (simulador_x86.py) e o tempo de
+# compilação. A saída simulada de todos os níveis precisa ser igual à do -O0.
+#
+# Uso: python benchmarks/bench_lacos.py [tamanho_dos_lacos]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import compilar_codigo
+from relatorio import Reporter, QUIET
+from simulador_x86 import executar
+
+def gerar_programas(n):
+    return {
+        # Expressões invariantes na condição e no corpo de laços aninhados.
+        "invariantes": f"""
+int main() {{
+    int total = 0; int a = 7; int b = 3; int i; int j;
+    for (i = 0; a * b + {n} > i; i = i + 1) {{
+        for (j = 0; a + b > j; j = j + 1) {{
+            total = a * b - b / 2 + total;
+        }}
+        total = a * 3 + total;
+    }}
+    return total;
+}}""",
+        # Multiplicações pela variável de indução.
+        "reducao de forca": f"""
+int main() {{
+    int soma = 0; int k = 5; int i;
+    for (i = 0; i < {n * 4}; i = i + 1) {{
+        soma = i * 12 + soma;
+        soma = i * k + soma;
+    }}
+    return soma;
+}}""",
+        # Laços internos pequenos com número constante de iterações.
+        "desenrolamento": f"""
+int main() {{
+    int soma = 0; int i; int j;
+    for (i = 0; i < {n}; i = i + 1) {{
+        for (j = 0; j < 4; j = j + 1) {{
+            soma = j * i + soma;
+        }}
+    }}
+    return soma;
+}}""",
+    }
+
+def medir(codigo, opcoes):
+    inicio = time.perf_counter()
+    sucesso, assembly = compilar_codigo(codigo, Reporter(QUIET), opcoes)
+    duracao = time.perf_counter() - inicio
+    assert sucesso
+    estatisticas = {}
+    resultado = executar(assembly, estatisticas=estatisticas)
+    estaticas = sum(1 for linha in assembly.split("\n") if linha.startswith("  ") and " db " not in linha)
+    return resultado, estaticas, estatisticas['instrucoes'], duracao
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    for nome, codigo in gerar_programas(n).items():
+        for gerador in ('ast', 'ir'):
+            print(f"{nome} ({gerador})")
+            referencia = None
+            base = None
+            for nivel in range(4):
+                opcoes = {'otimizacao': nivel, 'ir': gerador == 'ir'}
+                resultado, estaticas, executadas, duracao = medir(codigo, opcoes)
+                referencia = referencia or resultado
+                base = base or executadas
+                assert resultado == referencia, (nome, gerador, nivel, resultado, referencia)
+                print(f"  -O{nivel}: {estaticas:>5} instruções, {executadas:>9} executadas "
+                      f"({base / executadas:4.2f}x), compilação {duracao * 1000:7.2f} ms")
+
+if __name__ == '__main__':
+    main()
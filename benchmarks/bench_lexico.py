@@ -0,0 +1,102 @@
+# Benchmark da análise léxica: tokens por segundo e memória de pico,
+# comparando a implementação antiga (regex recompilada e lista de tuplas)
+# com o gerador pré-compilado de lexico.iter_tokens e o lexico.TokenBuffer
+# (colunas compactas consumidas pelo Parser).
+#
+# Uso: python benchmarks/bench_lexico.py [numero_de_funcoes]
+
+import os
+import re
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lexico
+
+def lexical_analyzer_antigo(code):
+    # Cópia da implementação anterior, mantida apenas como referência de comparação.
+    token_specification = [
+        ('COMMENT',      r'//.*|/\*[\s\S]*?\*/'),
+        ('STRING',       r'"([^"\\]|\\.)*"'),
+        ('NUMBER',       r'\b\d+(\.\d+)?\b'),
+        ('IDENTIFIER',   r'\b[a-zA-Z_][a-zA-Z_0-9]*\b'),
+        ('OPERATOR',     r'==|!=|<=|>=|&&|\|\||[+\-*/=<>!]'),
+        ('DELIMITER',    r'[(){};,]'),
+        ('NEWLINE',      r'\n'),
+        ('SKIP',         r'[ \t]+'),
+        ('MISMATCH',     r'.'),
+    ]
+    tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification)
+    tokens = []
+    for match in re.finditer(tok_regex, code):
+        kind = match.lastgroup
+        value = match.group()
+        if kind == 'IDENTIFIER' and value in lexico.KEYWORDS:
+            kind = 'KEYWORD'
+        elif kind in {'SKIP', 'COMMENT', 'NEWLINE'}:
+            continue
+        elif kind == 'MISMATCH':
+            raise RuntimeError(f'Token inválido: {value}')
+        tokens.append((kind, value))
+    return tokens
+
+def gerar_codigo(num_funcoes):
+    partes = []
+    for n in range(num_funcoes):
+        partes.append(f"""
+int funcao{n}() {{
+    int x = {n};
+    int y;
+    /* comentario
+       de bloco */
+    y = x + 5 * 2 - 1;
+    if (x > y) {{
+        printf("maior {n}");
+    }} else {{
+        y = y - 1; // comentario de linha
+    }}
+    for (int i = 0; i < 10; i = i + 1) {{
+        y = y + i;
+    }}
+    return y;
+}}
+""")
+    return "".join(partes)
+
+def contar(tokens):
+    # Consome um iterável sem guardar os itens.
+    ultimo = deque(enumerate(tokens, 1), maxlen=1)
+    return ultimo[0][0] if ultimo else 0
+
+def medir(nome, funcao, codigo, repeticoes=5):
+    # Tempo (melhor de N execuções) e memória são medidos separadamente,
+    # pois o tracemalloc distorce bastante o tempo.
+    duracao = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        total = funcao(codigo)
+        duracao = min(duracao, time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcao(codigo)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nome:<32} {total:>10} tokens  {duracao:8.3f} s  "
+          f"{total / duracao:>12,.0f} tokens/s  pico {pico / 1024 / 1024:8.2f} MiB"
+          f"  ({pico / total:6.1f} bytes/token)")
+
+def main():
+    num_funcoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    codigo = gerar_codigo(num_funcoes)
+    print(f"Entrada sintética: {len(codigo) / 1024 / 1024:.2f} MiB, {num_funcoes} funções\n")
+
+    medir("antes (lista, regex por chamada)", lambda c: len(lexical_analyzer_antigo(c)), codigo)
+    medir("depois (lista)", lambda c: len(lexico.lexical_analyzer(c)), codigo)
+    medir("depois (gerador)", lambda c: contar(lexico.iter_tokens(c)), codigo)
+    medir("depois (TokenBuffer)", lambda c: len(lexico.TokenBuffer(c)), codigo)
+
+if __name__ == '__main__':
+    main()
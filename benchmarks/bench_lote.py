@@ -0,0 +1,37 @@
+# Benchmark do modo lote: compila muitos arquivos pequenos com 1, 2, 4, ... processos
+# e mostra o ganho de cada configuração em relação à execução serial.
+#
+# Uso: python benchmarks/bench_lote.py [numero_de_arquivos]
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lote
+from bench_lexico import gerar_codigo
+
+def main():
+    num_arquivos = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    with tempfile.TemporaryDirectory() as pasta:
+        for n in range(num_arquivos):
+            with open(os.path.join(pasta, f"unidade{n}.c"), "w", encoding="utf-8") as f:
+                f.write(gerar_codigo(5))
+        caminhos = lote.expandir_entradas([pasta])
+
+        jobs = 1
+        serial = None
+        while jobs <= (os.cpu_count() or 1):
+            inicio = time.perf_counter()
+            resultados = lote.compilar_lote(caminhos, jobs)
+            duracao = time.perf_counter() - inicio
+            serial = serial or duracao
+            assert all(resultado[1] for resultado in resultados)
+            print(f"{jobs:>3} processo(s): {duracao:7.3f} s  ({num_arquivos / duracao:8.1f} arquivos/s, "
+                  f"ganho {serial / duracao:4.1f}x)")
+            jobs *= 2
+
+if __name__ == '__main__':
+    main()
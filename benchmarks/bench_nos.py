@@ -0,0 +1,69 @@
+# Benchmark de memória dos nós da AST: bytes por nó com as classes de nos.py
+# (__slots__ e span de código-fonte) comparadas a classes equivalentes com __dict__
+# por instância e sem span, como eram antes.
+#
+# Uso: python benchmarks/bench_nos.py [numero_de_funcoes]
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nos
+import lexico
+import analisador
+from bench_lexico import gerar_codigo
+
+CLASSES = [cls for cls in vars(nos).values() if isinstance(cls, type) and issubclass(cls, nos.Node) and cls is not nos.Node]
+
+def classes_com_dict():
+    # Mesmos construtores, mas em classes comuns (com __dict__ por instância).
+    return {cls.__name__: type(cls.__name__, (), {'__init__': cls.__init__}) for cls in CLASSES}
+
+def contar_nos(raiz):
+    total = 0
+    pilha = list(raiz)
+    while pilha:
+        no = pilha.pop()
+        if isinstance(no, list):
+            pilha.extend(no)
+            continue
+        total += 1
+        campos = no.__slots__ if hasattr(no, '__slots__') else list(vars(no))
+        for nome in campos:
+            filho = getattr(no, nome)
+            if filho is not None and not isinstance(filho, (str, int, bool)):
+                pilha.append(filho)
+    return total
+
+def medir(nome, codigo):
+    tokens = lexico.TokenBuffer(codigo)
+    len(tokens)
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    ast = analisador.Parser(tokens).parse_program()
+    duracao = time.perf_counter() - inicio
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total = contar_nos(ast)
+    print(f"{nome:<26} {total:>9} nós  {memoria / 1024 / 1024:8.2f} MiB  {memoria / total:6.1f} bytes/nó  "
+          f"(parser: {duracao:.3f} s)")
+
+def main():
+    num_funcoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    codigo = gerar_codigo(num_funcoes)
+
+    originais = {cls.__name__: cls for cls in CLASSES}
+    span = analisador.Parser.span
+    vars(analisador).update(classes_com_dict())
+    analisador.Parser.span = lambda self, node, first, last=None: node
+    medir("antes (__dict__)", codigo)
+    vars(analisador).update(originais)
+    medir("depois (__slots__)", codigo)
+    analisador.Parser.span = span
+    medir("depois (__slots__ + span)", codigo)
+
+if __name__ == '__main__':
+    main()
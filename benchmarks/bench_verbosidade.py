@@ -0,0 +1,38 @@
+# Benchmark do driver (main.analisar_codigo_c) em cada nível de verbosidade,
+# com a saída descartada em os.devnull, para medir o custo dos diagnósticos.
+#
+# Uso: python benchmarks/bench_verbosidade.py [numero_de_funcoes]
+
+import os
+import sys
+import time
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import analisar_codigo_c
+from relatorio import Reporter, LEVEL_NAMES
+from bench_lexico import gerar_codigo
+
+def main():
+    num_funcoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "entrada.c")
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write(gerar_codigo(num_funcoes))
+        print(f"Entrada sintética: {os.path.getsize(caminho) / 1024:.0f} KiB, {num_funcoes} funções\n")
+
+        tempos = {}
+        with open(os.devnull, "w") as devnull:
+            for nome, nivel in sorted(LEVEL_NAMES.items(), key=lambda item: -item[1]):
+                with contextlib.redirect_stdout(devnull):
+                    inicio = time.perf_counter()
+                    analisar_codigo_c(caminho, reporter=Reporter(nivel))
+                    tempos[nome] = time.perf_counter() - inicio
+                print(f"{nome:<12} {tempos[nome]:8.3f} s")
+
+        print(f"\nsilencioso é {tempos['completo'] / tempos['silencioso']:.1f}x mais rápido que completo")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# Benchmark do despacho dos visitantes: visitas por segundo das fases semântica e de
+# geração de código com a tabela de despacho por classe de visitante, comparadas ao
+# despacho antigo (nome montado com f-string e getattr a cada nó).
+#
+# Uso: python benchmarks/bench_visitante.py [numero_de_funcoes]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lexico
+import analisador
+import visitante
+from relatorio import Reporter, QUIET
+from semantico import SemanticAnalyzer
+from gerador_assembly import AssemblyGenerator
+from bench_lexico import gerar_codigo
+
+def visit_antigo(self, node):
+    # Cópia do dispatcher anterior, mantida apenas como referência de comparação.
+    method_name = f'visit_{type(node).__name__}'
+    visitor = getattr(self, method_name, self.generic_visit)
+    return visitor(node)
+
+def contar_visitas(ast):
+    # Conta as chamadas a 'visit' em uma execução de cada fase.
+    total = 0
+    visit = visitante.Visitor.visit
+    def contador(self, node):
+        nonlocal total
+        total += 1
+        return visit(self, node)
+    visitante.Visitor.visit = contador
+    try:
+        SemanticAnalyzer(Reporter(QUIET)).analyze(ast)
+        AssemblyGenerator().generate(ast)
+    finally:
+        visitante.Visitor.visit = visit
+    return total
+
+def medir(nome, ast, visitas, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        SemanticAnalyzer(Reporter(QUIET)).analyze(ast)
+        AssemblyGenerator().generate(ast)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    print(f"{nome:<28} {melhor:8.3f} s  {visitas / melhor:12,.0f} visitas/s")
+
+def main():
+    num_funcoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    ast = analisador.Parser(lexico.TokenBuffer(gerar_codigo(num_funcoes))).parse_program()
+    visitas = contar_visitas(ast)
+    print(f"{visitas} visitas por execução (semântica + geração)")
+
+    visit = visitante.Visitor.visit
+    visitante.Visitor.visit = visit_antigo
+    medir("antes (f-string + getattr)", ast, visitas)
+    visitante.Visitor.visit = visit
+    medir("depois (tabela de despacho)", ast, visitas)
+
+if __name__ == '__main__':
+    main()
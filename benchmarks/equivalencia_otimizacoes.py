@@ -0,0 +1,65 @@
+# Verificação de equivalência das otimizações sem o toolchain externo: executa cada
+# programa do corpus de equivalencia_peephole.py com o executor em closures
+# (executor.py) sobre a AST otimizada em -O0 a -O3 e compara o valor de retorno e as
+# mensagens do printf com as do -O0. Em cada nível, o Assembly dos dois geradores também
+# é simulado (simulador_x86.py) e precisa dar o mesmo resultado que o executor.
+#
+# Uso: python benchmarks/equivalencia_otimizacoes.py [numero_de_programas_sinteticos]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import compilar_ate_otimizacao, compilar_codigo
+from executor import executar_programa, ExecutionError
+from relatorio import Reporter, QUIET
+from simulador_x86 import executar, ErroSimulacao
+from equivalencia_peephole import TRECHOS, programa_sintetico
+
+def resultado(funcao, *args):
+    try:
+        return funcao(*args)
+    except (ExecutionError, ErroSimulacao) as erro:
+        return f"erro: {erro}"
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    pasta = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(pasta, "exemplo_valido.c"), encoding="utf-8") as f:
+        corpus = [("exemplo_valido.c", f.read())]
+    corpus += [(f"trecho {n}", trecho) for n, trecho in enumerate(TRECHOS)]
+    corpus += [(f"semente {n}", programa_sintetico(n)) for n in range(quantidade)]
+
+    falhas = 0
+    tempo_executor = tempo_simulador = 0.0
+    for nome, codigo in corpus:
+        referencia = None
+        falhas_antes = falhas
+        for nivel in range(4):
+            opcoes = {'otimizacao': nivel}
+            inicio = time.perf_counter()
+            obtido = resultado(executar_programa, compilar_ate_otimizacao(codigo, Reporter(QUIET), opcoes))
+            tempo_executor += time.perf_counter() - inicio
+            referencia = referencia or obtido
+            if obtido != referencia:
+                falhas += 1
+                print(f"DIVERGÊNCIA em {nome} (-O{nivel}): esperado {referencia}, obtido {obtido}")
+            for gerador in ('ast', 'ir'):
+                _, assembly = compilar_codigo(codigo, Reporter(QUIET), dict(opcoes, ir=gerador == 'ir'))
+                inicio = time.perf_counter()
+                simulado = resultado(executar, assembly)
+                tempo_simulador += time.perf_counter() - inicio
+                if simulado != obtido:
+                    falhas += 1
+                    print(f"DIVERGÊNCIA em {nome} (-O{nivel}, {gerador}): executor {obtido}, simulador {simulado}")
+        if falhas > falhas_antes:
+            print(codigo)
+
+    print(f"{len(corpus)} programa(s) x 4 níveis, {falhas} divergência(s)")
+    print(f"executor (compilação e execução): {tempo_executor:.2f} s; simulação do Assembly: {tempo_simulador:.2f} s")
+    return 1 if falhas else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
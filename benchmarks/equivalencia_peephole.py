@@ -0,0 +1,182 @@
+# Verificação de equivalência do otimizador peephole: compila um corpus determinístico
+# (exemplo_valido.c, trechos escritos à mão e programas sintéticos gerados a partir de
+# sementes fixas) pelos dois geradores (AST e código intermediário), simula o Assembly
+# antes e depois do peephole e compara o valor de retorno e as mensagens do printf.
+# Ao final mostra quantas vezes cada regra foi aplicada e a redução de instruções.
+#
+# Uso: python benchmarks/equivalencia_peephole.py [numero_de_programas_sinteticos]
+
+import os
+import sys
+import random
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lexico
+from analisador import Parser
+from semantico import SemanticAnalyzer
+from otimizador import ConstantFolder
+from gerador_assembly import AssemblyGenerator
+from gerador_intermediario import IRBuilder
+from backend_x86 import X86Backend
+from otimizador_peephole import PeepholeOptimizer
+from relatorio import Reporter, QUIET
+from simulador_x86 import executar, ErroSimulacao
+
+TRECHOS = [
+    # Todas as comparações como condição, com constantes e variáveis dos dois lados.
+    """int main() {
+        int a = 7; int b = 3; int c = 0;
+        if (a < b) { c = c + 1; }
+        if (a >= b) { c = c + 2; }
+        if (3 <= a) { c = c * 2; }
+        if (a > 7) { c = 0; }
+        if (a != b) { printf("diferentes"); }
+        if (c == 1) { printf("um"); } else { printf("outro"); }
+        return c;
+    }""",
+    # Divisão e expressões que esgotam os registradores temporários.
+    """int main() {
+        int x = 100; int y = 7; int z;
+        z = x / y + x / 3 - y * 2;
+        z = z * 3 + x / y * 2 - 1;
+        return z / 2;
+    }""",
+    # Laços aninhados com a variável de controle em registrador.
+    """int main() {
+        int total = 0; int i; int j;
+        for (i = 0; i < 5; i = i + 1) {
+            j = 0;
+            while (j <= i) { total = total + j; j = j + 1; }
+        }
+        return total;
+    }""",
+    # do-while com condições em memória e em registrador.
+    """int main() {
+        int a = 0; int b = 10; int c = 0;
+        do { a = a + 3; c = c + 1; } while (a < b);
+        do { b = b - 1; } while (b * 2 - 12 >= a);
+        return a + b + c;
+    }""",
+    # Desvios encadeados e código depois do return.
+    """int main() {
+        int n = 3;
+        while (n > 0) {
+            if (n == 2) { printf("dois"); } else { if (n == 1) { printf("um"); } }
+            n = n - 1;
+        }
+        return n;
+        printf("nunca");
+    }""",
+    # Operações neutras (o dobramento de constantes não toca em variáveis).
+    """int main() {
+        int k = 5; int m = 0;
+        m = k + m;
+        m = m * 1 - 0;
+        k = k + 0;
+        k = 0 + k * 1;
+        return m + k;
+    }""",
+]
+
+def programa_sintetico(semente):
+    # Todas as variáveis são declaradas no início de main, com valores pequenos, e os
+    # laços têm variáveis de controle próprias que o corpo não altera.
+    aleatorio = random.Random(semente)
+    variaveis = [f"v{n}" for n in range(aleatorio.randint(1, 6))]
+    contadores = []
+
+    def expressao(profundidade=0):
+        if profundidade > 2 or aleatorio.random() < 0.3:
+            return aleatorio.choice(variaveis) if aleatorio.random() < 0.6 else str(aleatorio.randint(0, 9))
+        operador = aleatorio.choice(['+', '-', '*', '/', '+', '-'])
+        if operador == '/':
+            return f"{expressao(profundidade + 1)} / {aleatorio.randint(1, 5)}"
+        # O parser é associativo à esquerda e sem parênteses: o lado direito é um termo.
+        return f"{expressao(profundidade + 1)} {operador} {expressao(99)}"
+
+    def condicao():
+        operador = aleatorio.choice(['<', '>', '<=', '>=', '==', '!='])
+        return f"{expressao(2)} {operador} {expressao(99)}"
+
+    def bloco(profundidade):
+        comandos = []
+        for _ in range(aleatorio.randint(1, 4)):
+            escolha = aleatorio.random()
+            if escolha < 0.45 or profundidade >= 3:
+                comandos.append(f"{aleatorio.choice(variaveis)} = {expressao()};")
+            elif escolha < 0.55:
+                comandos.append(f'printf("p{aleatorio.randint(0, 99)}");')
+            elif escolha < 0.75:
+                comando = f"if ({condicao()}) {{ {bloco(profundidade + 1)} }}"
+                if aleatorio.random() < 0.5:
+                    comando += f" else {{ {bloco(profundidade + 1)} }}"
+                comandos.append(comando)
+            elif escolha < 0.9:
+                contador = f"i{len(contadores)}"
+                contadores.append(contador)
+                comandos.append(f"for ({contador} = 0; {contador} < {aleatorio.randint(0, 4)}; "
+                                f"{contador} = {contador} + 1) {{ {bloco(profundidade + 1)} }}")
+            else:
+                contador = f"i{len(contadores)}"
+                contadores.append(contador)
+                comandos.append(f"{contador} = {aleatorio.randint(0, 4)}; while ({contador} > 0) "
+                                f"{{ {contador} = {contador} - 1; {bloco(profundidade + 1)} }}")
+        return " ".join(comandos)
+
+    corpo = bloco(0)
+    declaracoes = [f"int {nome} = {aleatorio.randint(0, 9)};" for nome in variaveis]
+    declaracoes += [f"int {nome};" for nome in contadores]
+    return f"int main() {{ {' '.join(declaracoes)} {corpo} return {expressao()}; }}"
+
+def gerar(codigo):
+    # Executa as fases até a geração e retorna o Assembly dos dois geradores, sem peephole.
+    ast = Parser(lexico.TokenBuffer(codigo)).parse_program()
+    ast = SemanticAnalyzer(Reporter(QUIET)).analyze(ast)
+    ast = ConstantFolder().optimize(ast)
+    return {'ast': AssemblyGenerator().generate(ast), 'ir': X86Backend().generate(IRBuilder().build(ast))}
+
+def instrucoes(assembly):
+    return sum(1 for linha in assembly.split("\n") if linha.startswith("  ") and " db " not in linha)
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    pasta = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(pasta, "exemplo_valido.c"), encoding="utf-8") as f:
+        corpus = [("exemplo_valido.c", f.read())]
+    corpus += [(f"trecho {n}", trecho) for n, trecho in enumerate(TRECHOS)]
+    corpus += [(f"semente {n}", programa_sintetico(n)) for n in range(quantidade)]
+
+    reescritas = Counter()
+    antes = Counter()
+    depois = Counter()
+    falhas = 0
+    for nome, codigo in corpus:
+        for gerador, assembly in gerar(codigo).items():
+            peephole = PeepholeOptimizer()
+            otimizado = peephole.optimize(assembly)
+            reescritas.update(peephole.rewrites)
+            antes[gerador] += instrucoes(assembly)
+            depois[gerador] += instrucoes(otimizado)
+            try:
+                esperado = executar(assembly)
+                obtido = executar(otimizado)
+            except ErroSimulacao as erro:
+                esperado, obtido = None, erro
+            if esperado != obtido:
+                falhas += 1
+                print(f"DIVERGÊNCIA em {nome} ({gerador}): esperado {esperado}, obtido {obtido}")
+                print(codigo)
+
+    print(f"{len(corpus)} programa(s) x 2 geradores, {falhas} divergência(s)\n")
+    for regra, total in reescritas.most_common():
+        print(f"  {regra:<30} {total:>8}")
+    print()
+    for gerador in ('ast', 'ir'):
+        print(f"  {gerador}: {antes[gerador]} -> {depois[gerador]} instruções "
+              f"({100 * (1 - depois[gerador] / antes[gerador]):.1f}% a menos)")
+    return 1 if falhas else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+# Suíte de benchmarks do compilador inteiro: compila os programas sintéticos de
+# gerador_carga.py em cada faixa de tamanho, mede cada fase (da análise léxica à
+# geração de código, com estatisticas.CompilationStats) e grava os resultados em JSON.
+# Com --baseline, compara com um resultado salvo e aponta as regressões; o código de
+# saída é 1 se houver alguma, para uso em CI.
+#
+# O tempo de cada fase é o menor entre as repetições, medido sem o tracemalloc; o pico
+# de memória vem de uma compilação adicional com o tracemalloc ligado.
+#
+# Uso: python benchmarks/executar_benchmarks.py [--tamanhos pequeno medio grande]
+#          [--saida resultados.json] [--baseline base.json] [--tolerancia 0.1]
+
+import os
+import sys
+import json
+import argparse
+import platform
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import compilar_codigo, NIVEL_OTIMIZACAO_PADRAO
+from estatisticas import CompilationStats
+from relatorio import Reporter, QUIET
+from gerador_carga import TAMANHOS, gerar_tamanho
+
+# Diferenças de tempo abaixo disso (em segundos) são tratadas como ruído.
+TEMPO_MINIMO = 0.005
+
+def compilar(codigo, opcoes, memoria):
+    estatisticas = CompilationStats(memory=memoria)
+    sucesso, _ = compilar_codigo(codigo, Reporter(QUIET), opcoes, estatisticas)
+    assert sucesso, "o programa sintético deveria compilar sem erros"
+    return estatisticas.as_dict()
+
+def medir(codigo, opcoes, repeticoes, memoria=True):
+    melhor = compilar(codigo, opcoes, False)
+    for _ in range(repeticoes - 1):
+        resultado = compilar(codigo, opcoes, False)
+        for nome, dados in resultado['fases'].items():
+            for chave in ('tempo', 'cpu'):
+                melhor['fases'][nome][chave] = min(melhor['fases'][nome][chave], dados[chave])
+    melhor['total'] = {chave: sum(dados[chave] for dados in melhor['fases'].values()) for chave in ('tempo', 'cpu')}
+    if memoria:
+        com_memoria = compilar(codigo, opcoes, True)
+        for nome, dados in com_memoria['fases'].items():
+            melhor['fases'][nome]['memoria_pico'] = dados['memoria_pico']
+        melhor['total']['memoria_pico'] = com_memoria['total']['memoria_pico']
+    return melhor
+
+def comparar(atual, base, tolerancia):
+    # Retorna as regressões como texto: tempo ou memória acima da tolerância e mais
+    # instruções emitidas (o código gerado piorou).
+    regressoes = []
+    for tamanho, resultado in atual['tamanhos'].items():
+        anterior = base['tamanhos'].get(tamanho)
+        if anterior is None:
+            continue
+        fases = list(resultado['fases'].items()) + [('total', resultado['total'])]
+        for nome, dados in fases:
+            antes = anterior['total'] if nome == 'total' else anterior['fases'].get(nome)
+            if antes is None:
+                continue
+            if (dados['tempo'] > antes['tempo'] * (1 + tolerancia)
+                    and dados['tempo'] - antes['tempo'] > TEMPO_MINIMO):
+                regressoes.append(f"{tamanho}/{nome}: tempo {antes['tempo'] * 1000:.1f} ms -> "
+                                  f"{dados['tempo'] * 1000:.1f} ms ({dados['tempo'] / antes['tempo']:.2f}x)")
+            if ('memoria_pico' in dados and 'memoria_pico' in antes
+                    and dados['memoria_pico'] > antes['memoria_pico'] * (1 + tolerancia)):
+                regressoes.append(f"{tamanho}/{nome}: memória {antes['memoria_pico'] / 1024:.0f} KiB -> "
+                                  f"{dados['memoria_pico'] / 1024:.0f} KiB")
+            if 'instrucoes' in dados and 'instrucoes' in antes and dados['instrucoes'] > antes['instrucoes']:
+                regressoes.append(f"{tamanho}/{nome}: {antes['instrucoes']} -> {dados['instrucoes']} instruções emitidas")
+    return regressoes
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do compilador sobre programas sintéticos")
+    parser.add_argument("--tamanhos", nargs="+", choices=list(TAMANHOS), default=['pequeno', 'medio'],
+                        help="Faixas de tamanho medidas (padrão: pequeno medio)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Compilações por faixa (padrão: 3)")
+    parser.add_argument("--semente", type=int, default=0, help="Semente do gerador de programas (padrão: 0)")
+    parser.add_argument("--sem-memoria", action="store_true", help="Não mede o pico de memória")
+    parser.add_argument("--ir", action="store_true", help="Gera o Assembly pelo código intermediário")
+    parser.add_argument("-O", dest="otimizacao", type=int, choices=range(4), default=NIVEL_OTIMIZACAO_PADRAO)
+    parser.add_argument("--saida", default="resultados_benchmarks.json",
+                        help="Arquivo JSON com os resultados (padrão: resultados_benchmarks.json)")
+    parser.add_argument("--baseline", help="Resultado salvo anteriormente para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="Aumento relativo aceito antes de apontar uma regressão (padrão: 0.10)")
+    args = parser.parse_args()
+
+    opcoes = {'ir': True} if args.ir else {}
+    if args.otimizacao != NIVEL_OTIMIZACAO_PADRAO:
+        opcoes['otimizacao'] = args.otimizacao
+    resultados = {
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'opcoes': opcoes,
+        'semente': args.semente,
+        'tamanhos': {},
+    }
+    for tamanho in args.tamanhos:
+        codigo = gerar_tamanho(tamanho, args.semente)
+        resultado = medir(codigo, opcoes, args.repeticoes, not args.sem_memoria)
+        resultado['bytes'] = len(codigo)
+        resultados['tamanhos'][tamanho] = resultado
+        print(f"\n{tamanho} ({len(codigo) / 1024:.0f} KiB)")
+        for nome, dados in list(resultado['fases'].items()) + [('total', resultado['total'])]:
+            memoria = f"{dados['memoria_pico'] / 1024:10.0f} KiB" if 'memoria_pico' in dados else ""
+            print(f"  {nome:<12} {dados['tempo'] * 1000:10.1f} ms {memoria}")
+
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"\nResultados salvos em '{args.saida}'.")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            base = json.load(f)
+        if base.get('opcoes') != opcoes or base.get('semente') != args.semente:
+            print("AVISO: a baseline foi gerada com outras opções ou semente; a comparação pode não ser válida.")
+        regressoes = comparar(resultados, base, args.tolerancia)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressão(ões) em relação a '{args.baseline}':")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            sys.exit(1)
+        print(f"Nenhuma regressão em relação a '{args.baseline}' (tolerância de {args.tolerancia:.0%}).")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# Gerador determinístico de programas grandes no subconjunto de C aceito pelo
+# compilador, usado como carga pelos benchmarks (executar_benchmarks.py). Cada função
+# combina as estruturas que pesam em fases diferentes:
+#
+# - expressões longas (parser, dobramento de constantes e geração de expressões);
+# - blocos aninhados com declarações em cada nível (tabela de escopos);
+# - laços 'for' contados, aninhados, e 'while' (otimizações de laços);
+# - muitas chamadas a printf com literais distintos (seção de dados do Assembly).
+#
+# A mesma semente e os mesmos parâmetros produzem sempre o mesmo código-fonte.
+#
+# Uso: python benchmarks/gerador_carga.py [pequeno|medio|grande] [semente] > programa.c
+
+import sys
+import random
+
+# Parâmetros de cada faixa de tamanho: número de funções, profundidade dos blocos
+# aninhados, operandos por expressão longa, limite dos laços e literais de printf por função.
+TAMANHOS = {
+    'pequeno': {'funcoes': 10, 'profundidade': 4, 'termos': 20, 'iteracoes': 100, 'literais': 4},
+    'medio': {'funcoes': 100, 'profundidade': 16, 'termos': 100, 'iteracoes': 1000, 'literais': 8},
+    'grande': {'funcoes': 250, 'profundidade': 48, 'termos': 300, 'iteracoes': 10000, 'literais': 16},
+}
+
+OPERADORES = ('+', '-', '*', '+', '-')
+COMPARACOES = ('<', '>', '<=', '>=', '!=')
+
+def expressao(rng, variaveis, termos):
+    # O parser é associativo à esquerda e sem parênteses: o operando direito é sempre
+    # um termo simples. Divisões usam apenas constantes diferentes de zero.
+    partes = [rng.choice(variaveis)]
+    for _ in range(termos - 1):
+        if rng.random() < 0.1:
+            partes.append(f"/ {rng.randint(1, 9)}")
+        elif rng.random() < 0.5:
+            partes.append(f"{rng.choice(OPERADORES)} {rng.choice(variaveis)}")
+        else:
+            partes.append(f"{rng.choice(OPERADORES)} {rng.randint(0, 99)}")
+    return " ".join(partes)
+
+def gerar_funcao(rng, indice, funcoes, profundidade, termos, iteracoes, literais):
+    nome = "main" if indice == funcoes - 1 else f"funcao{indice}"
+    linhas = [f"int {nome}() {{"]
+    variaveis = [f"a{k}" for k in range(4)]
+    for k, variavel in enumerate(variaveis):
+        linhas.append(f"    int {variavel} = {rng.randint(1, 50) + k};")
+    linhas.append("    int total = 0; int i; int j;")
+
+    # Expressão longa.
+    linhas.append(f"    total = {expressao(rng, variaveis, termos)};")
+
+    # Laço contado com um laço interno pequeno e multiplicações pela variável de indução.
+    linhas.append(f"    for (i = 0; i < {iteracoes}; i = i + 1) {{")
+    linhas.append(f"        total = i * {rng.randint(2, 9)} + total;")
+    linhas.append("        for (j = 0; j < 4; j = j + 1) {")
+    linhas.append(f"            total = {rng.choice(variaveis)} * j + total;")
+    linhas.append("        }")
+    linhas.append("    }")
+    linhas.append(f"    int w = {rng.randint(1, 20)};")
+    linhas.append(f"    while (w > 0) {{ total = total + w; w = w - 1; }}")
+
+    # Blocos aninhados: cada nível declara uma variável e lê a do nível anterior.
+    anterior = "total"
+    for nivel in range(profundidade):
+        linhas.append(f"    {'  ' * nivel}if ({anterior} {rng.choice(COMPARACOES)} {rng.randint(0, 999)}) {{")
+        linhas.append(f"    {'  ' * nivel}  int n{nivel} = {anterior} + {rng.choice(variaveis)};")
+        anterior = f"n{nivel}"
+    linhas.append(f"    {'  ' * profundidade}total = total + {anterior};")
+    for nivel in reversed(range(profundidade)):
+        linhas.append(f"    {'  ' * nivel}}}")
+
+    for k in range(literais):
+        linhas.append(f'    printf("funcao {indice}, mensagem {k}: {rng.randint(0, 10 ** 6)}");')
+    linhas.append("    return total;")
+    linhas.append("}")
+    return "\n".join(linhas)
+
+def gerar_programa(funcoes, profundidade, termos, iteracoes, literais, semente=0):
+    # A última função é 'main'.
+    rng = random.Random(semente)
+    return "\n\n".join(gerar_funcao(rng, indice, funcoes, profundidade, termos, iteracoes, literais)
+                       for indice in range(funcoes)) + "\n"
+
+def gerar_tamanho(tamanho, semente=0):
+    return gerar_programa(semente=semente, **TAMANHOS[tamanho])
+
+def main():
+    tamanho = sys.argv[1] if len(sys.argv) > 1 else 'pequeno'
+    semente = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    sys.stdout.write(gerar_tamanho(tamanho, semente))
+
+if __name__ == '__main__':
+    main()
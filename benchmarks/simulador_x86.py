@@ -0,0 +1,200 @@
+# Simulador do subconjunto de Assembly NASM (x86 32 bits) emitido pelo compilador,
+# usado para comparar o comportamento de duas versões do mesmo programa. Executa a
+# partir de 'main' e retorna (valor de retorno, mensagens do printf).
+#
+# As flags são modeladas como o par de valores comparado pela última instrução que
+# as altera: 'cmp' guarda (a, b) e as operações aritméticas guardam (resultado, 0),
+# de modo que um desvio que dependa das flags de outra instrução é detectado.
+# Chamadas a printf destroem eax, ecx, edx e as flags, como no cdecl, e exigem esp
+# alinhado em 16 bytes (o 'main' é chamado com a pilha alinhada). Com um dicionário
+# em 'estatisticas', o número de instruções executadas é guardado em 'instrucoes'.
+
+import re
+
+REGISTERS = ('eax', 'ebx', 'ecx', 'edx', 'esi', 'edi', 'ebp', 'esp')
+LOW_BYTE = {'al': 'eax', 'bl': 'ebx', 'cl': 'ecx', 'dl': 'edx'}
+CALLEE_SAVED = ('ebx', 'esi', 'edi', 'ebp')
+CONDITIONS = {
+    'l': lambda a, b: a < b, 'g': lambda a, b: a > b,
+    'le': lambda a, b: a <= b, 'ge': lambda a, b: a >= b,
+    'e': lambda a, b: a == b, 'ne': lambda a, b: a != b,
+    'z': lambda a, b: a == b, 'nz': lambda a, b: a != b,
+}
+RETURN_ADDRESS = -1
+
+_OPERANDS = re.compile(r',(?![^\[]*\])')
+_ADDRESS = re.compile(r'(\w+)(?:([+-])(\d+))?$')
+_STRING = re.compile(r'([\w.]+)\s+db\s+"(.*?)"')
+
+class ErroSimulacao(Exception):
+    pass
+
+def int32(valor):
+    valor &= 0xFFFFFFFF
+    return valor - (1 << 32) if valor & 0x80000000 else valor
+
+def carregar(assembly):
+    # Separa as instruções, a posição de cada rótulo e as strings da seção .data.
+    # Rótulos iniciados por '.' são locais à função, como no NASM: ficam registrados
+    # com o nome do último rótulo global à frente ('main.Lwhile0'), e os desvios são
+    # resolvidos da mesma forma.
+    instrucoes, rotulos, strings = [], {}, {}
+    secao = None
+    funcao = ''
+    for linha in assembly.split("\n"):
+        linha = linha.split(';', 1)[0].strip()
+        if not linha:
+            continue
+        if linha.startswith('section'):
+            secao = linha.split()[1]
+        elif secao == '.data':
+            nome, texto = _STRING.match(linha).groups()
+            strings[nome] = texto
+        elif linha.startswith(('global', 'extern')):
+            continue
+        elif linha.endswith(':'):
+            nome = linha[:-1]
+            if nome.startswith('.'):
+                nome = funcao + nome
+            else:
+                funcao = nome
+            rotulos[nome] = len(instrucoes)
+        else:
+            op, _, resto = linha.partition(' ')
+            operandos = [o.strip() for o in _OPERANDS.split(resto)] if resto else []
+            if op[0] == 'j' and operandos[0].startswith('.'):
+                operandos[0] = funcao + operandos[0]
+            instrucoes.append((op, operandos))
+    return instrucoes, rotulos, strings
+
+def executar(assembly, entrada='main', max_passos=10_000_000, estatisticas=None):
+    instrucoes, rotulos, strings = carregar(assembly)
+    reg = dict.fromkeys(REGISTERS, 0)
+    reg.update(ebx=0x0B, esi=0x51, edi=0xD1, ebp=0xB9)
+    memoria = {}
+    saida = []
+    flags = (0, 0)
+
+    reg['esp'] = 0x100000 - 4
+    memoria[reg['esp']] = RETURN_ADDRESS
+    salvos = {nome: reg[nome] for nome in CALLEE_SAVED}
+
+    def endereco(operando):
+        texto = operando.replace('dword', '').replace(' ', '')[1:-1]
+        base, sinal, deslocamento = _ADDRESS.match(texto).groups()
+        valor = reg[base]
+        if deslocamento:
+            valor += int(deslocamento) if sinal == '+' else -int(deslocamento)
+        return valor
+
+    def ler(operando):
+        if operando.startswith('dword'):
+            operando = operando[5:].strip()
+        if operando in reg:
+            return reg[operando]
+        if operando in LOW_BYTE:
+            return reg[LOW_BYTE[operando]] & 0xFF
+        if operando.startswith('['):
+            return memoria.get(endereco(operando), 0)
+        if operando in strings:
+            return operando
+        return int(operando)
+
+    def escrever(operando, valor):
+        valor = int32(valor) if isinstance(valor, int) else valor
+        if operando.startswith('dword'):
+            operando = operando[5:].strip()
+        if operando in reg:
+            reg[operando] = valor
+        elif operando.startswith('['):
+            memoria[endereco(operando)] = valor
+        else:
+            raise ErroSimulacao(f"Destino inválido: {operando}")
+
+    def aritmetica(destino, valor):
+        nonlocal flags
+        escrever(destino, valor)
+        flags = (int32(valor), 0)
+
+    pc = rotulos[entrada]
+    for passo in range(1, max_passos + 1):
+        op, args = instrucoes[pc]
+        pc += 1
+        if op in ('mov', 'movzx'):
+            escrever(args[0], ler(args[1]))
+        elif op == 'lea':
+            escrever(args[0], endereco(args[1]))
+        elif op == 'add':
+            aritmetica(args[0], ler(args[0]) + ler(args[1]))
+        elif op == 'sub':
+            aritmetica(args[0], ler(args[0]) - ler(args[1]))
+        elif op == 'imul':
+            if len(args) == 3:
+                aritmetica(args[0], ler(args[1]) * ler(args[2]))
+            else:
+                aritmetica(args[0], ler(args[0]) * ler(args[1]))
+        elif op == 'xor':
+            aritmetica(args[0], ler(args[0]) ^ ler(args[1]))
+        elif op == 'neg':
+            aritmetica(args[0], -ler(args[0]))
+        elif op == 'inc':
+            aritmetica(args[0], ler(args[0]) + 1)
+        elif op == 'dec':
+            aritmetica(args[0], ler(args[0]) - 1)
+        elif op == 'shl':
+            aritmetica(args[0], ler(args[0]) << ler(args[1]))
+        elif op == 'sar':
+            aritmetica(args[0], ler(args[0]) >> ler(args[1]))
+        elif op == 'cmp':
+            flags = (ler(args[0]), ler(args[1]))
+        elif op == 'test':
+            flags = (ler(args[0]) & ler(args[1]), 0)
+        elif op.startswith('set'):
+            nome = LOW_BYTE[args[0]]
+            reg[nome] = (reg[nome] & ~0xFF) | int(CONDITIONS[op[3:]](*flags))
+        elif op == 'jmp':
+            pc = rotulos[args[0]]
+        elif op[0] == 'j':
+            if CONDITIONS[op[1:]](*flags):
+                pc = rotulos[args[0]]
+        elif op == 'push':
+            valor = ler(args[0])
+            reg['esp'] -= 4
+            memoria[reg['esp']] = valor
+        elif op == 'pop':
+            escrever(args[0], memoria[reg['esp']])
+            reg['esp'] += 4
+        elif op == 'cdq':
+            reg['edx'] = -1 if reg['eax'] < 0 else 0
+        elif op == 'idiv':
+            divisor = ler(args[0])
+            if divisor == 0:
+                raise ErroSimulacao("Divisão por zero")
+            dividendo = reg['eax']
+            quociente = abs(dividendo) // abs(divisor)
+            if (dividendo < 0) != (divisor < 0):
+                quociente = -quociente
+            reg['eax'] = int32(quociente)
+            reg['edx'] = int32(dividendo - quociente * divisor)
+        elif op == 'call':
+            if args[0] != 'printf':
+                raise ErroSimulacao(f"Chamada não suportada: {args[0]}")
+            if reg['esp'] % 16:
+                raise ErroSimulacao("Pilha desalinhada na chamada ao printf")
+            saida.append(strings[memoria[reg['esp']]])
+            reg.update(eax=len(saida[-1]), ecx=0x7EADBEEF, edx=0x7EADBEEF)
+            flags = (0x7EADBEEF, 0)
+        elif op == 'ret':
+            retorno = memoria[reg['esp']]
+            reg['esp'] += 4
+            if retorno == RETURN_ADDRESS:
+                for nome, valor in salvos.items():
+                    if reg[nome] != valor:
+                        raise ErroSimulacao(f"Registrador {nome} não foi preservado")
+                if estatisticas is not None:
+                    estatisticas['instrucoes'] = passo
+                return reg['eax'], saida
+            pc = retorno
+        else:
+            raise ErroSimulacao(f"Instrução não suportada: {op}")
+    raise ErroSimulacao(f"Limite de {max_passos} instruções excedido")
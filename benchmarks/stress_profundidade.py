@@ -0,0 +1,66 @@
+# Teste de estresse para programas profundamente aninhados: blocos if/while/for
+# aninhados e expressões longas (cadeias de BinaryOperation) com 100 mil níveis,
+# passando por parser, análise semântica, geração de código e impressor da AST.
+#
+# Uso: python benchmarks/stress_profundidade.py [profundidade]
+
+import os
+import sys
+import time
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lexico
+from analisador import Parser
+from semantico import SemanticAnalyzer, SemanticError
+from gerador_assembly import AssemblyGenerator
+from impressor import print_custom_ast
+from relatorio import Reporter, QUIET
+
+def blocos_aninhados(profundidade):
+    # Cada nível declara a variável usada na sua condição, para que o custo medido seja
+    # o da travessia e não o da busca de nomes em escopos distantes.
+    abre = ["int v{n} = 1; if (v{n} > 0) {{", "int v{n} = 1; while (v{n} > 0) {{",
+            "for (int v{n} = 0; v{n} < 1; v{n} = v{n} + 1) {{"]
+    partes = ["int main() {", "int x = 1;"]
+    partes.extend(abre[n % 3].format(n=n) for n in range(profundidade))
+    partes.append("x = x - 1;")
+    partes.extend("}" for _ in range(profundidade))
+    partes.append("return x; }")
+    return "\n".join(partes)
+
+def expressao_longa(tamanho):
+    return "int main() { int x = 1; x = " + " + ".join(["x"] * tamanho) + "; return x; }"
+
+def compilar(nome, codigo, imprimir=True):
+    inicio = time.perf_counter()
+    ast = Parser(lexico.TokenBuffer(codigo)).parse_program()
+    SemanticAnalyzer(Reporter(QUIET)).analyze(ast)
+    assembly = AssemblyGenerator().generate(ast)
+    if imprimir:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            print_custom_ast(ast)
+    print(f"{nome:<46} {time.perf_counter() - inicio:7.2f} s  ({assembly.count(chr(10)) + 1} linhas de Assembly)")
+    return ast
+
+def main():
+    profundidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"Limite de recursão do Python: {sys.getrecursionlimit()}\n")
+
+    compilar(f"blocos aninhados ({profundidade})", blocos_aninhados(profundidade), imprimir=False)
+    compilar(f"expressão com {profundidade} operandos", expressao_longa(profundidade), imprimir=False)
+    # Os prefixos do impressor crescem com a profundidade, então a saída é quadrática;
+    # ele é exercitado com uma profundidade menor (ainda muito acima do limite de recursão).
+    compilar("blocos aninhados (5000, com impressor)", blocos_aninhados(5000))
+    compilar("expressão com 5000 operandos (com impressor)", expressao_longa(5000))
+
+    # Erros no fundo da árvore devem subir normalmente pela pilha explícita.
+    codigo = blocos_aninhados(profundidade).replace("x = x - 1;", "x = y;")
+    try:
+        compilar("erro semântico no nível mais profundo", codigo, imprimir=False)
+    except SemanticError as e:
+        print(f"{'erro semântico no nível mais profundo':<46} detectado: {e}")
+
+if __name__ == '__main__':
+    main()
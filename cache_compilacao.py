@@ -0,0 +1,132 @@
+import os
+import glob
+import json
+import hashlib
+import tempfile
+
+VERSAO_COMPILADOR = "1.0"
+
+def impressao_digital_compilador():
+    # Hash da versão e do código-fonte dos módulos do compilador: qualquer alteração
+    # no compilador invalida as entradas antigas do cache.
+    h = hashlib.sha256(VERSAO_COMPILADOR.encode())
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    for caminho in sorted(glob.glob(os.path.join(pasta, '*.py'))):
+        with open(caminho, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+class CompilationCache:
+    """
+    Cache em disco endereçado por conteúdo: a chave é o hash do código-fonte, da versão
+    do compilador e das opções de compilação. Cada entrada guarda o Assembly gerado, o
+    status e os diagnósticos. O tamanho total é limitado, removendo primeiro as entradas
+    usadas há mais tempo (LRU pela data de modificação, atualizada a cada acerto).
+    """
+    def __init__(self, directory='.cache_compilador', max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._fingerprint = None
+        self._size = None
+
+    def key(self, source, options=None):
+        if self._fingerprint is None:
+            self._fingerprint = impressao_digital_compilador()
+        h = hashlib.sha256(self._fingerprint.encode())
+        h.update(json.dumps(options or {}, sort_keys=True).encode())
+        h.update(source.encode('utf-8'))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def get(self, key):
+        # Retorna a entrada {'sucesso', 'assembly', 'diagnosticos'} ou None.
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(entry).encode('utf-8')
+        # Escrita atômica: vários processos do modo lote podem gravar ao mesmo tempo.
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _functions_key(self, path, options):
+        return self.key(f"funcoes:{os.path.abspath(path)}", options)
+
+    def load_functions(self, path, options=None):
+        # Entradas da compilação por função anterior do arquivo 'path' (ver
+        # compilacao_por_funcao.FunctionCache), ou None. Não conta como acerto ou falha:
+        # a entrada é indexada pelo caminho, não pelo conteúdo do arquivo.
+        try:
+            with open(self._path(self._functions_key(path, options)), 'r', encoding='utf-8') as f:
+                return json.load(f)['funcoes']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store_functions(self, path, options, entries):
+        self.put(self._functions_key(path, options), {'funcoes': entries})
+
+    def _entries(self):
+        # Lista (data de uso, tamanho, caminho) de todas as entradas.
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for subdir in os.scandir(self.directory):
+            if not subdir.is_dir():
+                continue
+            for entry in os.scandir(subdir.path):
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+            self.evictions += 1
+
+    def clear(self):
+        for _, _, path in self._entries():
+            os.remove(path)
+        self._size = 0
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            'acertos': self.hits,
+            'falhas': self.misses,
+            'remocoes': self.evictions,
+            'entradas': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
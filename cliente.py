@@ -0,0 +1,70 @@
+# Cliente do servidor de compilação (servidor.py). Importa apenas a biblioteca padrão,
+# para que cada chamada custe pouco mais que a própria compilação no servidor.
+import os
+import sys
+import json
+import socket
+import argparse
+import tempfile
+
+def caminho_socket_padrao():
+    return os.path.join(tempfile.gettempdir(), f"compilador-c-{os.getuid()}.sock")
+
+def enviar(requisicoes, caminho_socket):
+    # Envia as requisições por uma única conexão e retorna as respostas na mesma ordem.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conexao:
+        conexao.connect(caminho_socket)
+        arquivo = conexao.makefile('rwb')
+        respostas = []
+        for requisicao in requisicoes:
+            arquivo.write(json.dumps(requisicao).encode('utf-8') + b'\n')
+            arquivo.flush()
+            respostas.append(json.loads(arquivo.readline()))
+        return respostas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cliente do servidor de compilação")
+    parser.add_argument("arquivos", nargs="*", help="Arquivos .c para compilar")
+    parser.add_argument("--socket", default=caminho_socket_padrao(), help="Caminho do socket Unix do servidor")
+    parser.add_argument("--verbosidade", choices=['silencioso', 'resumo', 'completo'], default="silencioso",
+                        help="Nível de diagnóstico pedido ao servidor (padrão: silencioso)")
+    parser.add_argument("--sem-cache", action="store_true", help="Pede ao servidor para ignorar o cache")
+    parser.add_argument("--ir", action="store_true", help="Gera o Assembly a partir do código intermediário")
+    parser.add_argument("-O", dest="otimizacao", type=int, choices=range(4), default=None,
+                        help="Nível de otimização de 0 a 3 (padrão do servidor: 1)")
+    parser.add_argument("--max-erros", type=int, default=None,
+                        help="Número de erros após o qual a análise é interrompida")
+    parser.add_argument("--stdout", action="store_true", help="Imprime o Assembly em vez de gravar o .asm")
+    parser.add_argument("--parar", action="store_true", help="Encerra o servidor")
+    args = parser.parse_args()
+
+    opcoes = {'ir': True} if args.ir else {}
+    if args.otimizacao is not None:
+        opcoes['otimizacao'] = args.otimizacao
+    if args.max_erros is not None:
+        opcoes['max_erros'] = args.max_erros
+    requisicoes = [{'caminho': os.path.abspath(caminho), 'verbosidade': args.verbosidade, 'sem_cache': args.sem_cache,
+                    'opcoes': opcoes}
+                   for caminho in args.arquivos]
+    if args.parar:
+        requisicoes.append({'comando': 'parar'})
+
+    try:
+        respostas = enviar(requisicoes, args.socket)
+    except OSError as e:
+        print(f"ERRO: Não foi possível conectar ao servidor em '{args.socket}': {e.strerror}", file=sys.stderr)
+        sys.exit(2)
+
+    falhas = 0
+    for caminho, resposta in zip(args.arquivos, respostas):
+        if resposta['saida']:
+            sys.stdout.write(resposta['saida'])
+        if resposta['assembly'] is not None:
+            if args.stdout:
+                print(resposta['assembly'])
+            else:
+                with open(os.path.splitext(caminho)[0] + ".asm", "w") as f:
+                    f.write(resposta['assembly'])
+        if not resposta['sucesso']:
+            falhas += 1
+    sys.exit(1 if falhas else 0)
@@ -0,0 +1,283 @@
+# Compilação de um arquivo função por função (opção --jobs-funcoes do main.py).
+#
+# Um pré-passo global percorre os tokens do arquivo e separa as definições de função do
+# nível mais externo, guardando a assinatura de cada uma. Cada função passa então, de
+# forma independente, por todas as fases (da análise léxica ao peephole) em um pool de
+# processos: a análise semântica recebe as assinaturas das funções anteriores, como se
+# as tivesse visitado, e os rótulos e strings do Assembly são numerados por função
+# (gerador_assembly.string_label), então nenhuma tarefa depende do resultado de outra.
+# Os resultados são juntados na ordem do código-fonte, e o Assembly é o mesmo da
+# compilação do arquivo inteiro para qualquer número de processos.
+#
+# Como o resultado de cada função só depende do seu texto e das assinaturas que ela usa,
+# as funções inalteradas desde a compilação anterior são reaproveitadas de um
+# FunctionCache (compilação incremental), sem passar por nenhuma fase.
+
+import os
+import re
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import lexico
+from lexico import KEYWORD, IDENTIFIER, DELIMITER
+from analisador import SyntaxErrors
+from semantico import SemanticError, SemanticErrors
+from gerador_assembly import assemble
+from relatorio import Reporter, QUIET
+
+# Tokens do cabeçalho de uma definição de função: 'tipo nome ( )'.
+CABECALHO = (KEYWORD, IDENTIFIER, DELIMITER, DELIMITER)
+
+# Chaves, comentários e strings (com os mesmos padrões de lexico.py): as chaves dentro de
+# comentários e strings não delimitam funções. O restante do código não é tokenizado.
+_ESTRUTURA = re.compile(r'//.*|/\*[\s\S]*?\*/|"(?:[^"\\]|\\.)*"|[{}]')
+
+def dividir_funcoes(codigo):
+    """
+    Pré-passo global: separa o código nas definições de função do nível mais externo
+    ('tipo nome() { ... }') e retorna uma lista de (nome, tipo de retorno, início, fim,
+    linha, coluna), com os offsets do trecho de cada função e a posição do seu início.
+    Os corpos não são tokenizados (apenas as chaves, comentários e strings são
+    localizados), então o custo é pequeno perto da compilação; só o texto entre as
+    funções passa pelo analisador léxico, para validar os cabeçalhos.
+
+    Retorna None se o código não tiver essa forma (chaves desbalanceadas, tokens fora de
+    funções ou erro léxico entre elas): nesses casos os erros são relatados pela
+    compilação do arquivo inteiro.
+    """
+    funcoes = []
+    profundidade = 0
+    fim = 0
+    try:
+        for match in _ESTRUTURA.finditer(codigo):
+            chave = match.group()
+            if chave == '{':
+                if profundidade == 0:
+                    cabecalho = list(lexico.scan(codigo[fim:match.start()]))
+                    if (tuple(token[0] for token in cabecalho) != CABECALHO
+                            or (cabecalho[2][1], cabecalho[3][1]) != ('(', ')')):
+                        return None
+                    funcoes.append([cabecalho[1][1], cabecalho[0][1], fim + cabecalho[0][2], None])
+                profundidade += 1
+            elif chave == '}':
+                if profundidade == 0:
+                    return None
+                profundidade -= 1
+                if profundidade == 0:
+                    fim = funcoes[-1][3] = match.end()
+        if profundidade or any(True for _ in lexico.scan(codigo[fim:])):
+            return None
+    except lexico.LexicalError:
+        return None
+
+    resultado = []
+    linha, anterior = 1, 0
+    for nome, tipo, inicio, fim in funcoes:
+        linha += codigo.count('\n', anterior, inicio)
+        anterior = inicio
+        coluna = inicio - codigo.rfind('\n', 0, inicio)
+        resultado.append((nome, tipo, inicio, fim, linha, coluna))
+    return resultado
+
+def compilar_funcao(trecho, linha, coluna, assinaturas, opcoes=None):
+    """
+    Compila uma função isolada: 'trecho' é a sua definição, que começa na linha e coluna
+    dadas do arquivo, e 'assinaturas' lista (nome, tipo de retorno) das funções
+    anteriores. Retorna (fase com erro, erros, avisos, código, identificadores): a fase é
+    None, 'lexica', 'sintaxe', 'semantica' ou 'geracao'; o código é o par (linhas da
+    seção de dados, texto) de gerador_assembly, ou None se houve erro; e os
+    identificadores usados pela função indicam de quais assinaturas ela depende.
+    """
+    from main import fase_sintatica, fase_semantica, fase_otimizacao, gerar_funcoes, max_erros
+
+    # Os avisos ficam em reporter.diagnostics e são relatados pelo processo principal.
+    reporter = Reporter(QUIET)
+    # A mensagem de limite de erros é refeita sobre os erros de todas as funções.
+    limite = max_erros(opcoes)
+    try:
+        tokens = lexico.TokenBuffer(trecho, linha, coluna)
+        ast = fase_sintatica(tokens, reporter, opcoes)
+        ast, analyzer = fase_semantica(ast, reporter, tokens, opcoes, assinaturas)
+        ast = fase_otimizacao(ast, reporter, opcoes, analyzer.dead_stores)
+    except SyntaxErrors as e:
+        return 'sintaxe', e.errors[:limite], [], None, None
+    except SemanticErrors as e:
+        return 'semantica', e.errors[:limite], reporter.diagnostics, None, None
+    except SyntaxError as e:
+        return 'sintaxe', [str(e)], [], None, None
+    except SemanticError as e:
+        return 'semantica', [str(e)], reporter.diagnostics, None, None
+    except lexico.LexicalError as e:
+        # Token inválido no corpo (o pré-passo não tokeniza os corpos).
+        return 'lexica', [str(e)], [], None, None
+
+    try:
+        codigo, = gerar_funcoes(ast, reporter, opcoes)
+    except Exception as gen_error:
+        return 'geracao', [str(gen_error)], reporter.diagnostics, None, None
+    identificadores = sorted({valor for tipo, valor in zip(tokens.kinds, tokens.values) if tipo == IDENTIFIER})
+    return None, [], reporter.diagnostics, codigo, identificadores
+
+class FunctionCache:
+    """
+    Resultados das funções compiladas com sucesso em um arquivo, reaproveitados na
+    compilação seguinte do mesmo arquivo (compilação incremental). A chave é o hash do
+    texto da função, então funções que só mudaram de posição também são reaproveitadas
+    (os erros, que trazem a posição no arquivo, não são guardados).
+
+    O resultado de uma função depende ainda das assinaturas das funções anteriores que
+    ela usa. Cada entrada guarda, para cada identificador da função, o tipo de retorno
+    da função anterior com esse nome no momento da compilação (ou None), e só é
+    reaproveitada se todos continuarem iguais: alterar o tipo de uma função, removê-la
+    ou movê-la para depois de quem a usa recompila quem depende dela.
+
+    'entries' acumula as entradas da compilação atual, no formato guardado pelo
+    CompilationCache: {hash: [[[nome, tipo], ...], avisos, código]}.
+    """
+    def __init__(self, previous=None):
+        self.previous = previous or {}
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, key, visible):
+        # 'visible(nome)' dá o tipo da assinatura que a função vê com esse nome, ou None.
+        entry = self.previous.get(key)
+        if entry is None or any(visible(name) != return_type for name, return_type in entry[0]):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries[key] = entry
+        return entry
+
+    def put(self, key, dependencies, warnings, code):
+        self.entries[key] = [dependencies, warnings, code]
+
+# Assinaturas e opções do arquivo, enviadas uma única vez a cada processo do pool (e não
+# junto de cada tarefa, o que repetiria a tabela inteira para cada função).
+_assinaturas = []
+_opcoes = None
+
+def _iniciar_processo(assinaturas, opcoes):
+    global _assinaturas, _opcoes
+    _assinaturas, _opcoes = assinaturas, opcoes
+
+def _compilar_tarefa(tarefa):
+    indice, trecho, linha, coluna = tarefa
+    return compilar_funcao(trecho, linha, coluna, _assinaturas[:indice], _opcoes)
+
+def compilar_por_funcao(codigo, reporter, opcoes=None, processos=0, cache_funcoes=None):
+    """
+    Compila 'codigo' função por função com 'processos' processos (0: número de CPUs) e
+    retorna (sucesso, assembly_code), como main.compilar_codigo, ou None quando o código
+    não pôde ser dividido em funções. Com um FunctionCache em 'cache_funcoes', só as
+    funções alteradas (ou cujas dependências mudaram) são compiladas.
+
+    Os erros seguem a ordem das fases da compilação do arquivo inteiro: havendo erros
+    de sintaxe em alguma função, só eles são relatados; senão, os erros semânticos de
+    todas as funções, até o limite de --max-erros.
+    """
+    funcoes = dividir_funcoes(codigo)
+    if not funcoes:
+        return None
+    from main import max_erros, relatar_assembly
+
+    assinaturas = [(nome, tipo) for nome, tipo, *_ in funcoes]
+    # Primeira definição de cada nome: é a que as funções seguintes veem.
+    primeiras = {}
+    for indice, (nome, tipo) in enumerate(assinaturas):
+        primeiras.setdefault(nome, (indice, tipo))
+
+    def visivel(nome, indice):
+        primeira = primeiras.get(nome)
+        return primeira[1] if primeira is not None and primeira[0] < indice else None
+
+    resultados = [None] * len(funcoes)
+    tarefas = []
+    chaves = {}
+    for indice, (_, _, inicio, fim, linha, coluna) in enumerate(funcoes):
+        trecho = codigo[inicio:fim]
+        if cache_funcoes is not None:
+            chave = chaves[indice] = FunctionCache.fingerprint(trecho)
+            entrada = cache_funcoes.get(chave, lambda nome: visivel(nome, indice))
+            if entrada is not None:
+                resultados[indice] = (None, [], entrada[1], entrada[2], None)
+                continue
+        tarefas.append((indice, trecho, linha, coluna))
+
+    processos = processos or os.cpu_count() or 1
+    reporter.phase("FASES 1 A 5: Compilação por Função")
+    if reporter.summary:
+        reporter.info(f"{len(tarefas)} função(ões) compilada(s) em {max(1, min(processos, len(tarefas)))} processo(s).")
+        if cache_funcoes is not None:
+            reporter.info(f"{cache_funcoes.hits} função(ões) inalterada(s) reaproveitada(s) da compilação anterior.")
+    if processos == 1 or len(tarefas) <= 1:
+        compiladas = [compilar_funcao(trecho, linha, coluna, assinaturas[:indice], opcoes)
+                      for indice, trecho, linha, coluna in tarefas]
+    else:
+        # Blocos de várias funções por tarefa reduzem o custo de comunicação, como no lote.
+        chunksize = max(1, len(tarefas) // (processos * 4))
+        with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                                 initargs=(assinaturas, opcoes)) as executor:
+            # map devolve os resultados na ordem das tarefas, qualquer que seja o processo.
+            compiladas = list(executor.map(_compilar_tarefa, tarefas, chunksize=chunksize))
+    for (indice, *_), resultado in zip(tarefas, compiladas):
+        resultados[indice] = resultado
+        fase, _, avisos, codigo_funcao, identificadores = resultado
+        if fase == 'lexica':
+            # O erro é relatado pela compilação do arquivo inteiro, como quando o arquivo
+            # não pode ser dividido.
+            return None
+        if fase is None and cache_funcoes is not None:
+            dependencias = [(nome, visivel(nome, indice)) for nome in identificadores]
+            cache_funcoes.put(chaves[indice], dependencias, avisos, codigo_funcao)
+
+    limite = max_erros(opcoes)
+    for fase, prefixo in (('sintaxe', "\nERRO DE SINTAXE: "), ('semantica', "\nERRO SEMÂNTICO: ")):
+        erros = [erro for resultado in resultados if resultado[0] == fase for erro in resultado[1]]
+        if not erros:
+            continue
+        if fase == 'semantica':
+            if limite is not None and len(erros) >= limite:
+                resultados = parar_no_limite(resultados, funcoes, codigo, assinaturas, opcoes, limite)
+            relatar_avisos(resultados, reporter)
+        if limite is not None and len(erros) >= limite:
+            erros = erros[:limite] + [f"Limite de {limite} erro(s) atingido; análise interrompida."]
+        for erro in erros:
+            reporter.error(f"{prefixo}{erro}")
+        return False, None
+
+    relatar_avisos(resultados, reporter)
+    for fase, erros, *_ in resultados:
+        if fase == 'geracao':
+            reporter.error(f"ERRO DURANTE A GERAÇÃO DE CÓDIGO: {erros[0]}")
+            return False, None
+    assembly_code = assemble([resultado[3] for resultado in resultados])
+    relatar_assembly(assembly_code, reporter)
+    return True, assembly_code
+
+def parar_no_limite(resultados, funcoes, codigo, assinaturas, opcoes, limite):
+    # Na compilação do arquivo inteiro, a análise semântica para ao atingir o limite de
+    # erros e os avisos seguintes não são emitidos. As funções depois daquela em que o
+    # limite é atingido são descartadas, e ela é analisada de novo com o limite
+    # restante, para que os seus avisos parem no mesmo ponto.
+    anteriores = 0
+    for indice, (fase, erros, *_) in enumerate(resultados):
+        if fase != 'semantica':
+            continue
+        if anteriores + len(erros) >= limite:
+            _, _, inicio, fim, linha, coluna = funcoes[indice]
+            restante = dict(opcoes or {}, max_erros=limite - anteriores)
+            return resultados[:indice] + [compilar_funcao(codigo[inicio:fim], linha, coluna,
+                                                          assinaturas[:indice], restante)]
+        anteriores += len(erros)
+    return resultados
+
+def relatar_avisos(resultados, reporter):
+    for _, _, avisos, *_ in resultados:
+        for _, mensagem in avisos:
+            reporter.warning(mensagem)
@@ -0,0 +1,44 @@
+class ScopedTable:
+    """
+    Tabela de nomes com escopos aninhados, compartilhada pela análise semântica e pelos
+    geradores de código. Cada nome tem uma pilha com as suas definições visíveis (a do
+    escopo mais interno no topo), e um registro de desfazer guarda os nomes definidos em
+    cada escopo aberto. Consultar e definir custam O(1) independentemente da
+    profundidade; fechar um escopo custa o número de nomes definidos nele, ou seja, O(1)
+    amortizado por definição.
+    """
+    def __init__(self):
+        # nome -> [(profundidade do escopo, valor), ...]
+        self.bindings = {}
+        # Nomes definidos, na ordem, e o início de cada escopo aberto nessa lista.
+        self.undo_log = []
+        self.marks = []
+
+    def push_scope(self):
+        self.marks.append(len(self.undo_log))
+
+    def pop_scope(self):
+        """Fecha o escopo mais interno e retorna os valores definidos nele, em ordem."""
+        mark = self.marks.pop()
+        bindings = self.bindings
+        undo_log = self.undo_log
+        values = [bindings[name].pop()[1] for name in reversed(undo_log[mark:])]
+        del undo_log[mark:]
+        values.reverse()
+        return values
+
+    def define(self, name, value):
+        stack = self.bindings.get(name)
+        if stack is None:
+            stack = self.bindings[name] = []
+        stack.append((len(self.marks), value))
+        self.undo_log.append(name)
+
+    def defined_in_scope(self, name):
+        """Indica se o nome já foi definido no escopo mais interno."""
+        stack = self.bindings.get(name)
+        return bool(stack) and stack[-1][0] == len(self.marks)
+
+    def lookup(self, name):
+        stack = self.bindings.get(name)
+        return stack[-1][1] if stack else None
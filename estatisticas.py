@@ -0,0 +1,123 @@
+import io
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+from nos import Node
+
+# Fases medidas pelo driver, na ordem em que são executadas.
+FASES = ('lexica', 'sintatica', 'semantica', 'otimizacao', 'geracao')
+
+def contar_nos(ast):
+    # Número de nós da AST (percurso com pilha explícita pelos __slots__ de cada nó).
+    total = 0
+    pendentes = list(ast)
+    while pendentes:
+        node = pendentes.pop()
+        if isinstance(node, list):
+            pendentes.extend(node)
+            continue
+        total += 1
+        for classe in type(node).__mro__:
+            for campo in getattr(classe, '__slots__', ()):
+                valor = getattr(node, campo, None)
+                if isinstance(valor, (Node, list)):
+                    pendentes.append(valor)
+    return total
+
+def contar_instrucoes(assembly_code):
+    # Linhas de instrução do Assembly: sem rótulos, diretivas e dados das strings.
+    return sum(1 for linha in assembly_code.split("\n") if linha.startswith("  ") and " db " not in linha)
+
+class CompilationStats:
+    """
+    Instrumentação das fases do compilador (opções --stats e --profile).
+
+    Cada fase executada dentro de 'phase(nome)' registra o tempo de relógio, o tempo de
+    CPU e o pico de memória alocada durante a fase (medido com tracemalloc, que deixa a
+    compilação mais lenta: os tempos servem para comparar fases e versões entre si, não
+    como o tempo de uma compilação normal). 'count' acrescenta contadores a uma fase,
+    como o número de tokens ou de instruções emitidas.
+
+    Com 'profile' (o nome de uma fase ou 'todas'), as fases escolhidas também são
+    executadas sob o cProfile.
+    """
+    def __init__(self, memory=True, profile=None):
+        self.memory = memory
+        self.profile = profile
+        self.profiler = cProfile.Profile() if profile else None
+        # nome da fase -> {'tempo': s, 'cpu': s, 'memoria_pico': bytes, contadores...}
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        dados = self.phases[name] = {}
+        iniciou_memoria = self.memory and not tracemalloc.is_tracing()
+        if iniciou_memoria:
+            tracemalloc.start()
+        elif self.memory:
+            tracemalloc.reset_peak()
+        perfilar = self.profiler is not None and self.profile in (name, 'todas')
+        if perfilar:
+            self.profiler.enable()
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield dados
+        finally:
+            dados['tempo'] = time.perf_counter() - inicio
+            dados['cpu'] = time.process_time() - inicio_cpu
+            if perfilar:
+                self.profiler.disable()
+            if self.memory:
+                dados['memoria_pico'] = tracemalloc.get_traced_memory()[1]
+                if iniciou_memoria:
+                    tracemalloc.stop()
+
+    def count(self, phase, name, value):
+        self.phases[phase][name] = value
+
+    def as_dict(self):
+        fases = {nome: self.phases[nome] for nome in FASES if nome in self.phases}
+        total = {
+            'tempo': sum(dados['tempo'] for dados in fases.values()),
+            'cpu': sum(dados['cpu'] for dados in fases.values()),
+        }
+        if self.memory and fases:
+            total['memoria_pico'] = max(dados['memoria_pico'] for dados in fases.values())
+        return {'fases': fases, 'total': total}
+
+    def format(self):
+        linhas = [f"{'fase':<12} {'tempo (ms)':>11} {'cpu (ms)':>10} {'memória (KiB)':>14}  contadores"]
+        resultado = self.as_dict()
+        for nome, dados in list(resultado['fases'].items()) + [('total', resultado['total'])]:
+            memoria = f"{dados['memoria_pico'] / 1024:14.1f}" if 'memoria_pico' in dados else f"{'-':>14}"
+            contadores = ", ".join(f"{chave}={valor}" for chave, valor in dados.items()
+                                   if chave not in ('tempo', 'cpu', 'memoria_pico'))
+            linhas.append(f"{nome:<12} {dados['tempo'] * 1000:11.2f} {dados['cpu'] * 1000:10.2f} {memoria}  {contadores}")
+        return "\n".join(linhas)
+
+    def has_profile(self):
+        # Verdadeiro se alguma fase perfilada chegou a ser executada (um erro interrompe
+        # a compilação antes das fases seguintes).
+        if self.profile == 'todas':
+            return bool(self.phases)
+        return self.profile in self.phases
+
+    def dump_profile(self, caminho, limite=20):
+        """Grava o perfil no formato do pstats e retorna as funções de maior tempo acumulado."""
+        self.profiler.dump_stats(caminho)
+        saida = io.StringIO()
+        pstats.Stats(self.profiler, stream=saida).sort_stats('cumulative').print_stats(limite)
+        return saida.getvalue()
+
+def salvar_json(resultados, caminho):
+    # '-' escreve na saída padrão.
+    texto = json.dumps(resultados, indent=2, ensure_ascii=False)
+    if caminho == '-':
+        print(texto)
+    else:
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write(texto + "\n")
@@ -0,0 +1,445 @@
+import sys
+
+from nos import *
+from visitante import Visitor
+
+class ExecutionError(Exception):
+    """Erros durante a execução de um programa (divisão por zero, chamada não suportada...)."""
+    pass
+
+# Aritmética de inteiros de 32 bits com sinal, como no Assembly gerado:
+# ((v + _MEIO) & _MASCARA) - _MEIO reduz v ao intervalo [-2^31, 2^31).
+_MEIO = 0x80000000
+_MASCARA = 0xFFFFFFFF
+
+# Valor devolvido por 'return;' em funções void. As instruções devolvem None quando a
+# execução segue para a próxima e o valor de retorno quando um 'return' foi executado.
+_VAZIO = object()
+
+def _dividir(a, b):
+    # Divisão com truncamento em direção a zero (idiv).
+    if b == 0:
+        raise ExecutionError("Divisão por zero")
+    quociente = abs(a) // abs(b)
+    if (a < 0) != (b < 0):
+        quociente = -quociente
+    return ((quociente + _MEIO) & _MASCARA) - _MEIO
+
+# Limites de um int de 32 bits com sinal.
+_MINIMO, _MAXIMO = -_MEIO, _MEIO - 1
+
+def _nada(f):
+    return None
+
+def _escritas(node):
+    # Símbolos escritos dentro da subárvore (percurso com pilha explícita).
+    symbols = set()
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if type(node) is list:
+            pending.extend(node)
+            continue
+        kind = type(node)
+        if kind is Assignment:
+            symbols.add(node.lhs.symbol)
+        elif kind is Declaration:
+            symbols.add(node.symbol)
+        for field in kind.__slots__:
+            value = getattr(node, field)
+            if isinstance(value, (Node, list)):
+                pending.append(value)
+    return symbols
+
+def _binaria(op, esquerda, direita):
+    if op == '+':
+        def no(f): return ((esquerda(f) + direita(f) + _MEIO) & _MASCARA) - _MEIO
+    elif op == '-':
+        def no(f): return ((esquerda(f) - direita(f) + _MEIO) & _MASCARA) - _MEIO
+    elif op == '*':
+        def no(f): return ((esquerda(f) * direita(f) + _MEIO) & _MASCARA) - _MEIO
+    elif op == '/':
+        def no(f): return _dividir(esquerda(f), direita(f))
+    elif op == '<':
+        def no(f): return esquerda(f) < direita(f)
+    elif op == '>':
+        def no(f): return esquerda(f) > direita(f)
+    elif op == '<=':
+        def no(f): return esquerda(f) <= direita(f)
+    elif op == '>=':
+        def no(f): return esquerda(f) >= direita(f)
+    elif op == '==':
+        def no(f): return esquerda(f) == direita(f)
+    elif op == '!=':
+        def no(f): return esquerda(f) != direita(f)
+    elif op == '&&':
+        def no(f): return esquerda(f) and direita(f)
+    elif op == '||':
+        def no(f): return esquerda(f) or direita(f)
+    else:
+        raise ExecutionError(f"Operador binário não suportado: {op}")
+    return no
+
+def _variavel_constante(op, i, c):
+    # Especialização de 'variável op constante' ('i < 100', 'i + 1'), o caso mais comum
+    # nas condições e incrementos de laços: o operando é lido direto do quadro.
+    if op == '+':
+        def no(f): return ((f[i] + c + _MEIO) & _MASCARA) - _MEIO
+    elif op == '-':
+        def no(f): return ((f[i] - c + _MEIO) & _MASCARA) - _MEIO
+    elif op == '*':
+        def no(f): return ((f[i] * c + _MEIO) & _MASCARA) - _MEIO
+    elif op == '/':
+        def no(f): return _dividir(f[i], c)
+    elif op == '<':
+        def no(f): return f[i] < c
+    elif op == '>':
+        def no(f): return f[i] > c
+    elif op == '<=':
+        def no(f): return f[i] <= c
+    elif op == '>=':
+        def no(f): return f[i] >= c
+    elif op == '==':
+        def no(f): return f[i] == c
+    elif op == '!=':
+        def no(f): return f[i] != c
+    else:
+        return None
+    return no
+
+def _variavel_variavel(op, i, j):
+    # Especialização de 'variável op variável'.
+    if op == '+':
+        def no(f): return ((f[i] + f[j] + _MEIO) & _MASCARA) - _MEIO
+    elif op == '-':
+        def no(f): return ((f[i] - f[j] + _MEIO) & _MASCARA) - _MEIO
+    elif op == '*':
+        def no(f): return ((f[i] * f[j] + _MEIO) & _MASCARA) - _MEIO
+    elif op == '/':
+        def no(f): return _dividir(f[i], f[j])
+    elif op == '<':
+        def no(f): return f[i] < f[j]
+    elif op == '>':
+        def no(f): return f[i] > f[j]
+    elif op == '<=':
+        def no(f): return f[i] <= f[j]
+    elif op == '>=':
+        def no(f): return f[i] >= f[j]
+    elif op == '==':
+        def no(f): return f[i] == f[j]
+    elif op == '!=':
+        def no(f): return f[i] != f[j]
+    else:
+        return None
+    return no
+
+class ClosureCompiler(Visitor):
+    """
+    Compila a AST anotada pela análise semântica em closures Python aninhadas, que
+    executam o programa sem o toolchain externo (NASM, linker e bibliotecas de 32 bits).
+
+    Cada nó vira uma função f(quadro) criada uma única vez: durante a execução não há
+    despacho por tipo de nó nem busca de nomes. As variáveis de uma função ocupam
+    posições fixas de uma lista (o quadro), atribuídas aos símbolos na compilação, e a
+    aritmética segue a do Assembly gerado (32 bits com sinal, divisão truncada). As
+    mensagens do printf são guardadas em 'output', como no benchmarks/simulador_x86.py,
+    para que as duas execuções possam ser comparadas.
+
+    Instruções que nunca executam 'return' ficam em 'no_return', para que os blocos e
+    laços formados só por elas não precisem testar o resultado de cada instrução. Laços
+    'for' contados (incremento constante, limite que o corpo não altera) são executados
+    com um range do Python.
+
+    A compilação usa a travessia com pilha explícita de visitante.py; a execução é
+    recursiva em Python, com um nível de chamada por bloco aninhado.
+    """
+    def __init__(self):
+        self.functions = {}
+        self.output = []
+        self.slots = {}
+        self.no_return = set()
+
+    def compile(self, ast_root):
+        self.traverse(ast_root)
+        return self.functions
+
+    def run(self, entry='main'):
+        """Executa a função 'entry' e retorna o seu valor de retorno (None para void)."""
+        if entry not in self.functions:
+            raise ExecutionError(f"Função '{entry}' não encontrada")
+        try:
+            return self.functions[entry]()
+        except RecursionError:
+            raise ExecutionError("Aninhamento profundo demais para a execução recursiva") from None
+
+    def generic_visit(self, node):
+        raise ExecutionError(f"Nó não suportado pelo executor: {type(node).__name__}")
+
+    def slot(self, symbol):
+        slots = self.slots
+        index = slots.get(symbol)
+        if index is None:
+            index = slots[symbol] = len(slots)
+        return index
+
+    def visit_list(self, node_list):
+        for node in node_list:
+            yield self.visit(node)
+
+    def visit_FunctionDefinition(self, node):
+        self.slots = {}
+        corpo = yield self.visit(node.body)
+        tamanho = len(self.slots)
+
+        def funcao():
+            resultado = corpo([0] * tamanho)
+            return None if resultado is _VAZIO else resultado
+        self.functions[node.name] = funcao
+
+    def visit_CompoundStatement(self, node):
+        instrucoes = []
+        for statement in node.statements:
+            instrucoes.append((yield self.visit(statement)))
+        if not instrucoes:
+            return self.simple(_nada)
+        if len(instrucoes) == 1:
+            return instrucoes[0]
+        instrucoes = tuple(instrucoes)
+        if self.no_return.issuperset(instrucoes):
+            def sequencia(f):
+                for instrucao in instrucoes:
+                    instrucao(f)
+            return self.simple(sequencia)
+
+        def bloco(f):
+            for instrucao in instrucoes:
+                resultado = instrucao(f)
+                if resultado is not None:
+                    return resultado
+        return bloco
+
+    def simple(self, closure):
+        # Registra uma instrução que nunca executa 'return'.
+        self.no_return.add(closure)
+        return closure
+
+    def visit_Declaration(self, node):
+        if node.initial_value is None:
+            # Sem inicializador a variável mantém o valor que já estava na sua posição.
+            self.slot(node.symbol)
+            return self.simple(_nada)
+        return self.store(self.slot(node.symbol), (yield self.visit(node.initial_value)))
+
+    def visit_Assignment(self, node):
+        return self.store(self.slot(node.lhs.symbol), (yield self.visit(node.rhs)))
+
+    def store(self, i, valor):
+        def atribuicao(f):
+            f[i] = valor(f)
+        return self.simple(atribuicao)
+
+    def visit_BinaryOperation(self, node):
+        left, right = node.left, node.right
+        if type(left) is Identifier:
+            especializada = None
+            if type(right) is Constant and right.const_type == 'int':
+                especializada = _variavel_constante(node.op, self.slot(left.symbol), int(right.value))
+            elif type(right) is Identifier:
+                especializada = _variavel_variavel(node.op, self.slot(left.symbol), self.slot(right.symbol))
+            if especializada is not None:
+                return especializada
+        esquerda = yield self.visit(node.left)
+        direita = yield self.visit(right)
+        return _binaria(node.op, esquerda, direita)
+
+    def visit_Identifier(self, node):
+        i = self.slot(node.symbol)
+
+        def variavel(f):
+            return f[i]
+        return variavel
+
+    def visit_Constant(self, node):
+        # Constantes bool aparecem depois do dobramento de condições ('1' ou '0').
+        valor = int(node.value) if node.const_type == 'int' else bool(int(node.value))
+
+        def constante(f):
+            return valor
+        return constante
+
+    def visit_IfStatement(self, node):
+        condicao = yield self.visit(node.condition)
+        verdadeiro = yield self.visit(node.true_body)
+        if node.false_body is None:
+            def se(f):
+                if condicao(f):
+                    return verdadeiro(f)
+            return self.simple(se) if verdadeiro in self.no_return else se
+        falso = yield self.visit(node.false_body)
+
+        def se_senao(f):
+            if condicao(f):
+                return verdadeiro(f)
+            return falso(f)
+        return self.simple(se_senao) if self.no_return.issuperset((verdadeiro, falso)) else se_senao
+
+    def visit_WhileStatement(self, node):
+        condicao = yield self.visit(node.condition)
+        corpo = yield self.visit(node.body)
+        if corpo in self.no_return:
+            def enquanto_simples(f):
+                while condicao(f):
+                    corpo(f)
+            return self.simple(enquanto_simples)
+
+        def enquanto(f):
+            while condicao(f):
+                resultado = corpo(f)
+                if resultado is not None:
+                    return resultado
+        return enquanto
+
+    def visit_DoWhileStatement(self, node):
+        corpo = yield self.visit(node.body)
+        condicao = yield self.visit(node.condition)
+
+        def faca_enquanto(f):
+            while True:
+                resultado = corpo(f)
+                if resultado is not None:
+                    return resultado
+                if not condicao(f):
+                    return None
+        return self.simple(faca_enquanto) if corpo in self.no_return else faca_enquanto
+
+    def visit_ForStatement(self, node):
+        inicio = (yield self.visit(node.init)) if node.init else _nada
+        condicao = (yield self.visit(node.cond)) if node.cond else None
+        incremento = (yield self.visit(node.incr)) if node.incr else _nada
+        corpo = yield self.visit(node.body)
+        if condicao is None:
+            def para_sempre(f):
+                inicio(f)
+                while True:
+                    resultado = corpo(f)
+                    if resultado is not None:
+                        return resultado
+                    incremento(f)
+            return para_sempre
+
+        def laco(f):
+            while condicao(f):
+                resultado = corpo(f)
+                if resultado is not None:
+                    return resultado
+                incremento(f)
+
+        contado = self.counted(node)
+        if contado is None:
+            def para(f):
+                inicio(f)
+                return laco(f)
+            return self.simple(para) if corpo in self.no_return else para
+
+        i, passo, op, limite = contado
+        # Último valor alcançado pela variável: 'i < n' para em n, 'i <= n' em n + 1.
+        ajuste = 0 if op in ('<', '>') else (1 if passo > 0 else -1)
+
+        def para_contado(f):
+            inicio(f)
+            fim = limite(f)
+            if not _MINIMO <= fim + passo <= _MAXIMO:
+                # Perto dos limites de 32 bits a variável daria a volta: laço comum.
+                return laco(f)
+            valores = range(f[i], fim + ajuste, passo)
+            for valor in valores:
+                f[i] = valor
+                resultado = corpo(f)
+                if resultado is not None:
+                    return resultado
+            if valores:
+                # Ao sair do laço a variável tem o primeiro valor que falha na condição.
+                f[i] = valores[-1] + passo
+        return self.simple(para_contado) if corpo in self.no_return else para_contado
+
+    def counted(self, node):
+        # 'for (...; i op limite; i = i + passo)' em que o corpo não escreve em 'i' nem
+        # no limite: retorna (posição de i, passo, op, closure do limite).
+        cond, incr = node.cond, node.incr
+        if type(incr) is not Assignment or type(cond) is not BinaryOperation or cond.op not in ('<', '<=', '>', '>='):
+            return None
+        symbol, rhs = incr.lhs.symbol, incr.rhs
+        if (type(rhs) is not BinaryOperation or rhs.op not in '+-' or type(rhs.left) is not Identifier
+                or rhs.left.symbol is not symbol or type(rhs.right) is not Constant or rhs.right.const_type != 'int'):
+            return None
+        passo = int(rhs.right.value) if rhs.op == '+' else -int(rhs.right.value)
+        if passo == 0 or (passo > 0) != (cond.op in ('<', '<=')):
+            return None
+        if type(cond.left) is not Identifier or cond.left.symbol is not symbol:
+            return None
+        escritas = _escritas(node.body)
+        bound = cond.right
+        if symbol in escritas:
+            return None
+        if type(bound) is Constant and bound.const_type == 'int':
+            valor = int(bound.value)
+            limite = lambda f: valor
+        elif type(bound) is Identifier and bound.symbol is not symbol and bound.symbol not in escritas:
+            j = self.slot(bound.symbol)
+            limite = lambda f: f[j]
+        else:
+            return None
+        return self.slot(symbol), passo, cond.op, limite
+
+    def visit_FunctionCall(self, node):
+        if node.name.name != 'printf':
+            raise ExecutionError(f"Chamada não suportada: {node.name.name}")
+        # Como no Assembly gerado, o literal é passado ao printf sem argumentos.
+        texto = node.args[0].value[1:-1]
+        saida = self.output
+
+        def printf(f):
+            saida.append(texto)
+        return self.simple(printf)
+
+    def visit_ReturnStatement(self, node):
+        if node.value is None:
+            def retorno_vazio(f):
+                return _VAZIO
+            return retorno_vazio
+        valor = yield self.visit(node.value)
+
+        def retorno(f):
+            return valor(f)
+        return retorno
+
+def executar_programa(ast, entrada='main'):
+    """Compila e executa a AST anotada; retorna (valor de retorno, mensagens do printf)."""
+    compilador = ClosureCompiler()
+    compilador.compile(ast)
+    return compilador.run(entrada), compilador.output
+
+if __name__ == '__main__':
+    # Uso: python executor.py programa.c [-O N]
+    import argparse
+    from main import compilar_ate_otimizacao, NIVEL_OTIMIZACAO_PADRAO
+    from relatorio import Reporter, QUIET
+
+    parser = argparse.ArgumentParser(description="Executa um programa do subconjunto de C sem gerar Assembly")
+    parser.add_argument("arquivo")
+    parser.add_argument("-O", dest="otimizacao", type=int, choices=range(4), default=NIVEL_OTIMIZACAO_PADRAO,
+                        help="Nível das otimizações sobre a AST aplicadas antes da execução (padrão: 1)")
+    args = parser.parse_args()
+    with open(args.arquivo, encoding='utf-8') as f:
+        codigo = f.read()
+    ast = compilar_ate_otimizacao(codigo, Reporter(QUIET), {'otimizacao': args.otimizacao})
+    if ast is None:
+        sys.exit(1)
+    try:
+        retorno, mensagens = executar_programa(ast)
+    except ExecutionError as e:
+        print(f"ERRO DE EXECUÇÃO: {e}")
+        sys.exit(1)
+    for mensagem in mensagens:
+        print(mensagem)
+    print(f"[retorno de main: {retorno}]")
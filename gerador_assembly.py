@@ -1,116 +1,296 @@
 from nos import *
-from semantico import SymbolTable 
+from visitante import Visitor
+from registradores import TEMPORARIES, allocate_locals, frame_size
+from intermediario import NEGATED
 
-class AssemblyGenerator:
+# Instruções de cada operador binário: aritméticos (registrador, operando) e
+# comparações (sufixo do setcc).
+ARITHMETIC = {'+': 'add', '-': 'sub', '*': 'imul'}
+COMPARISONS = {'<': 'l', '>': 'g', '<=': 'le', '>=': 'ge', '==': 'e', '!=': 'ne'}
+LOW_BYTE = {'eax': 'al', 'ecx': 'cl', 'edx': 'dl'}
+
+def string_label(function, number):
+    # Rótulo da n-ésima string da função na seção de dados. Os rótulos dos desvios
+    # começam com '.' e são locais à função no NASM; os das strings são globais, então
+    # levam o nome da função ('main.S0'), que nenhum outro rótulo usa.
+    return f"{function}.S{number}"
+
+def assemble(functions):
+    """Junta o Assembly das funções, na ordem, em um programa NASM com as seções de dados e de código."""
+    data = [line for data_section, _ in functions for line in data_section]
+    return "\n".join(["section .data"] + data + ["\nsection .text", "extern printf"] + [text for _, text in functions])
+
+class AssemblyGenerator(Visitor):
+    """
+    Traduz a AST para Assembly x86 (NASM).
+
+    As expressões são avaliadas em registradores: a numeração de Sethi-Ullman decide
+    a ordem de avaliação dos operandos para usar o mínimo de temporários (eax, ecx,
+    edx), e a pilha só é usada quando eles acabam. As variáveis locais recebem os
+    registradores esi, edi e ebx pela varredura linear de registradores.py; as demais
+    ficam na pilha, em [ebp-N], reservadas com um único 'sub esp' no prólogo. A
+    localização fica no Symbol anotado pela análise semântica em cada Identifier, então
+    a geração não resolve nomes.
+    """
     def __init__(self): 
-        self.code = []
+        self.functions = []
         self.text_section = []
         self.data_section = []
+        self.function_name = None
         self.string_counter = 0
-        self.variable_offsets_stack = [{}]
-        self.current_offset = 0
         self.label_counter = 0
-
-    def push_scope(self):
-        self.variable_offsets_stack.append({})
-
-    def pop_scope(self):
-        self.variable_offsets_stack.pop()
-
-    def add_variable(self, name):
-        self.current_offset -= 4
-        self.variable_offsets_stack[-1][name] = self.current_offset
-
-    def get_variable_offset(self, name):
-        for scope in reversed(self.variable_offsets_stack):
-            if name in scope:
-                return scope[name]
-        # Este erro não deve ocorrer se o analisador semântico fez seu trabalho
-        raise NameError(f"Erro de Geração: Offset para a variável '{name}' não encontrado.")
+        self.saved_registers = []
+        self.calls = False
+        self.needs = {}
 
     def generate(self, ast_root):
-        header = ["section .data"]
-        header.extend(self.data_section)
-        header.append("\nsection .text")
-        header.append("extern printf")
-        self.text_section = header
-        
-        self.visit(ast_root)
-        return "\n".join(self.text_section)
+        return assemble(self.generate_functions(ast_root))
 
-    def visit(self, node):
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name,self.generic_visit)
-        return visitor(node)
-
-    def generic_visit(self, node):
-        raise Exception(f"Nenhum método visit_{type(node).__name__} encontrado")
+    def generate_functions(self, ast_root):
+        # Assembly de cada função, na ordem da AST, como (linhas da seção de dados, texto).
+        self.functions = []
+        self.traverse(ast_root)
+        return self.functions
 
     def visit_list(self, node_list):
         for node in node_list:
-            self.visit(node)
+            yield self.visit(node)
 
     def visit_FunctionDefinition(self, node):
+        # Rótulos e strings são numerados por função: o código de uma função não depende
+        # das demais, o que permite gerá-las em paralelo (compilacao_por_funcao.py).
+        self.text_section = []
+        self.data_section = []
+        self.function_name = node.name
+        self.string_counter = 0
+        self.label_counter = 0
+        self.saved_registers, locals_size = allocate_locals(node)
+        self.calls = False
+        self.needs = {}
+
         self.text_section.append(f"global {node.name}")
         self.text_section.append(f"\n{node.name}:")
         self.text_section.append("  push ebp")
         self.text_section.append("  mov ebp, esp")
-        self.visit(node.body)
+        for register in self.saved_registers:
+            self.text_section.append(f"  push {register}")
+        # O tamanho do quadro só é conhecido depois do corpo (alinhamento das chamadas).
+        frame_line = len(self.text_section)
+        self.text_section.append(None)
+        yield self.visit(node.body)
+        size = frame_size(locals_size, len(self.saved_registers), self.calls)
+        if size:
+            self.text_section[frame_line] = f"  sub esp, {size}"
+        else:
+            del self.text_section[frame_line]
+        self.functions.append((self.data_section, "\n".join(self.text_section)))
     
     def visit_CompoundStatement(self, node):
-        self.push_scope()
         for statement in node.statements:
-            self.visit(statement)
-        self.pop_scope()
+            yield self.visit(statement)
     
     def visit_Declaration(self, node):
-        self.add_variable(node.name)
-        self.code.append(f"  sub esp, 4 ; Aloca espaço para '{node.name}'")  #no offset {self.get_variable_offset(node.name)}")
         if node.initial_value:
-            self.visit(Assignment(Identifier(node.name), node.initial_value))
+            yield self.visit(Assignment(Identifier(node.name, node.symbol), node.initial_value))
     
     def visit_Assignment(self, node):
-        self.visit(node.rhs) # Resultado do lado direito vai para EAX
-        
-        offset = self.get_variable_offset(node.lhs.name)
-        self.code.append(f"  mov [ebp{offset}], eax") # Atribui a 'node.lhs.name'
-    
-    def visit_BinaryOperation(self, node):
-        self.visit(node.right)
-        self.text_section.append("  push eax")
-        self.visit(node.left)
-        self.text_section.append("  pop ebx")
-        op_map = {'+': 'add', '-': 'sub', '*': 'imul', '<': 'jl', '>': 'jg', '==': 'je', '!=': 'jne'}
-        if node.op in ['+', '-', '*', '/']:
-            if node.op == '/':
-                self.text_section.append("  cdq")
-                self.text_section.append("  idiv ebx")
+        symbol = node.lhs.symbol
+        location = symbol.offset
+        rhs = node.rhs
+        if location[0] == '[':
+            if type(rhs) is Constant:
+                self.text_section.append(f"  mov dword {location}, {rhs.value}")
             else:
-                self.text_section.append(f"  {op_map[node.op]} eax, ebx")
-        elif node.op in op_map: # Para operadores de comparação
-            true_label = f".Ltrue{self.label_counter}"
-            end_label = f".Lend_cmp{self.label_counter}"
-            self.label_counter += 1
-            self.text_section.append("  cmp eax, ebx")
-            self.text_section.append(f"  {op_map[node.op]} {true_label}")
-            self.text_section.append("  mov eax, 0 ; False")
-            self.text_section.append(f"  jmp {end_label}")
-            self.text_section.append(f"{true_label}:")
-            self.text_section.append("  mov eax, 1 ; True")
-            self.text_section.append(f"{end_label}:")
-        
+                yield self.expression(rhs, TEMPORARIES)
+                self.text_section.append(f"  mov {location}, eax")
+            return
+
+        if (type(rhs) is BinaryOperation and rhs.op in ARITHMETIC and self.is_operand(rhs.right)
+                and type(rhs.left) is Identifier and rhs.left.symbol is symbol):
+            # x = x op y: opera diretamente no registrador da variável.
+            self.text_section.append(f"  {ARITHMETIC[rhs.op]} {location}, {self.operand(rhs.right)}")
+        elif (type(rhs) is BinaryOperation and rhs.op in '+*' and self.is_operand(rhs.left)
+                and type(rhs.right) is Identifier and rhs.right.symbol is symbol):
+            # x = y op x com op comutativo (forma produzida pela otimização de laços).
+            self.text_section.append(f"  {ARITHMETIC[rhs.op]} {location}, {self.operand(rhs.left)}")
+        elif not (type(rhs) is BinaryOperation and rhs.op in COMPARISONS) and not self.references(rhs, location):
+            yield self.expression(rhs, (location,) + TEMPORARIES)
+        else:
+            yield self.expression(rhs, TEMPORARIES)
+            self.text_section.append(f"  mov {location}, eax")
+
+    def visit_BinaryOperation(self, node):
+        return self.expression(node, TEMPORARIES)
+
     def visit_Identifier(self, node):
-        offset = self.get_variable_offset(node.name)
-        self.code.append(f"  mov eax, [ebp{offset}]") # ; Carrega '{node.name}'
+        return self.expression(node, TEMPORARIES)
 
     def visit_Constant(self, node):
-        # Carrega um valor constante para EAX
-        self.code.append(f"  mov eax, {node.value}")
+        return self.expression(node, TEMPORARIES)
+
+    def is_operand(self, node):
+        # Folhas usadas diretamente como operando de uma instrução.
+        return type(node) is Identifier or (type(node) is Constant and node.const_type != 'string')
+
+    def operand(self, node):
+        if type(node) is Identifier:
+            return node.symbol.offset
+        return node.value
+
+    def references(self, node, location):
+        # Indica se a expressão lê alguma variável guardada em 'location'. Variáveis
+        # diferentes podem dividir o registrador quando uma deixa de ser usada exatamente
+        # onde a outra recebe o primeiro valor, como em 't = v + w + v' com as últimas
+        # leituras de 'v': calcular a expressão direto no registrador de 't' destruiria
+        # 'v' antes da segunda leitura.
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            if type(node) is BinaryOperation:
+                pending.append(node.left)
+                pending.append(node.right)
+            elif type(node) is Identifier and node.symbol.offset == location:
+                return True
+        return False
+
+    def label_needs(self, root):
+        # Numeração de Sethi-Ullman: quantos registradores cada subárvore exige para ser
+        # avaliada sem usar a pilha. Um operando direito folha não ocupa registrador.
+        needs = self.needs
+        pending = [root]
+        while pending:
+            node = pending[-1]
+            if type(node) is BinaryOperation:
+                children = [child for child in (node.left, node.right) if child not in needs]
+                if children:
+                    pending.extend(children)
+                    continue
+                left = needs[node.left]
+                right = 0 if self.is_operand(node.right) else needs[node.right]
+                needs[node] = left + 1 if left == right else max(left, right)
+            else:
+                needs[node] = 1
+            pending.pop()
+
+    def expression(self, node, registers):
+        """
+        Avalia a expressão no primeiro registrador de 'registers', podendo usar os
+        demais. Os registradores temporários fora da lista guardam valores vivos.
+        """
+        target = registers[0]
+        if type(node) is not BinaryOperation:
+            operand = self.operand(node)
+            if operand != target:
+                self.text_section.append(f"  mov {target}, {operand}")
+            return target
+
+        target, operand, on_stack = yield self.operands(node, registers)
+        self.operation(node.op, target, operand, registers, on_stack)
+        return target
+
+    def operands(self, node, registers):
+        """
+        Avalia os operandos da operação binária e retorna (target, operand, on_stack):
+        o operando esquerdo fica em target (o primeiro de 'registers') e o direito é uma
+        folha, outro registrador ou, com on_stack, o topo da pilha.
+        """
+        target = registers[0]
+        if node not in self.needs:
+            self.label_needs(node)
+        left, right = node.left, node.right
+        if self.is_operand(right):
+            yield self.expression(left, registers)
+            return target, self.operand(right), False
+
+        left_needs, right_needs = self.needs[left], self.needs[right]
+        if min(left_needs, right_needs) < len(registers):
+            # A subárvore mais exigente é avaliada primeiro, com todos os registradores.
+            if left_needs >= right_needs:
+                yield self.expression(left, registers)
+                yield self.expression(right, registers[1:])
+            else:
+                yield self.expression(right, (registers[1], target) + tuple(registers[2:]))
+                yield self.expression(left, (target,) + tuple(registers[2:]))
+            return target, registers[1], False
+        # Sem registradores suficientes: o operando direito fica na pilha.
+        yield self.expression(right, registers)
+        self.text_section.append(f"  push {target}")
+        yield self.expression(left, registers)
+        return target, "dword [esp]", True
+
+    def condition(self, node, label, when=False):
+        """
+        Desvia para 'label' quando a condição de um comando de controle tem o valor
+        'when'. Uma comparação vira um único cmp seguido do desvio condicional, sem
+        materializar 0 ou 1 em um registrador; os demais valores são comparados com 0.
+        """
+        if type(node) is not BinaryOperation or node.op not in COMPARISONS:
+            yield self.expression(node, TEMPORARIES)
+            self.text_section.append("  cmp eax, 0")
+            self.text_section.append(f"  {'jne' if when else 'je'} {label}")
+            return
+
+        left = self.operand(node.left) if type(node.left) is Identifier else None
+        right = self.operand(node.right) if self.is_operand(node.right) else None
+        if left is not None and right is not None and not (left[0] == '[' and right[0] == '['):
+            # Variável comparada com uma folha: nenhum registrador temporário é usado.
+            if left[0] == '[' and type(node.right) is Constant:
+                left = f"dword {left}"
+            self.text_section.append(f"  cmp {left}, {right}")
+        elif left is not None and left[0] != '[' and right is None:
+            # Variável em registrador comparada com uma expressão.
+            yield self.expression(node.right, TEMPORARIES)
+            self.text_section.append(f"  cmp {left}, eax")
+        else:
+            target, operand, on_stack = yield self.operands(node, TEMPORARIES)
+            self.text_section.append(f"  cmp {target}, {operand}")
+            if on_stack:
+                # lea libera o operando da pilha sem alterar as flags do cmp.
+                self.text_section.append("  lea esp, [esp+4]")
+        op = node.op if when else NEGATED[node.op]
+        self.text_section.append(f"  j{COMPARISONS[op]} {label}")
+
+    def operation(self, op, target, operand, registers, on_stack=False):
+        # target = target op operand. Com on_stack, o operando está no topo da pilha.
+        if op == '/':
+            self.division(target, operand, registers, on_stack)
+            return
+        if op in ARITHMETIC:
+            self.text_section.append(f"  {ARITHMETIC[op]} {target}, {operand}")
+        else:
+            self.text_section.append(f"  cmp {target}, {operand}")
+            self.text_section.append(f"  set{COMPARISONS[op]} {LOW_BYTE[target]}")
+            self.text_section.append(f"  movzx {target}, {LOW_BYTE[target]}")
+        if on_stack:
+            self.text_section.append("  add esp, 4")
+
+    def division(self, target, divisor, registers, on_stack):
+        # O idiv usa edx:eax como dividendo; o divisor vai para a pilha e eax/edx são
+        # preservados quando guardam valores vivos de outra subexpressão.
+        if not on_stack:
+            self.text_section.append(f"  push {'dword ' if divisor[0] == '[' else ''}{divisor}")
+        saved = [register for register in ('eax', 'edx') if register != target and register not in registers]
+        for register in saved:
+            self.text_section.append(f"  push {register}")
+        if target != 'eax':
+            self.text_section.append(f"  mov eax, {target}")
+        self.text_section.append("  cdq")
+        self.text_section.append(f"  idiv dword [esp{'+' + str(4 * len(saved)) if saved else ''}]")
+        if target != 'eax':
+            self.text_section.append(f"  mov {target}, eax")
+        for register in reversed(saved):
+            self.text_section.append(f"  pop {register}")
+        self.text_section.append("  add esp, 4")
     
     def visit_ReturnStatement(self, node):
         if node.value:
-            self.visit(node.value)
-        self.text_section.append("  mov esp, ebp")
+            yield self.visit(node.value)
+        if self.saved_registers:
+            self.text_section.append(f"  lea esp, [ebp-{4 * len(self.saved_registers)}]")
+            for register in reversed(self.saved_registers):
+                self.text_section.append(f"  pop {register}")
+        else:
+            self.text_section.append("  mov esp, ebp")
         self.text_section.append("  pop ebp")
         self.text_section.append("  ret")
         
@@ -118,14 +298,12 @@ class AssemblyGenerator:
         else_label = f".Lelse{self.label_counter}"
         end_label = f".Lend_if{self.label_counter}"
         self.label_counter += 1
-        self.visit(node.condition)
-        self.text_section.append("  cmp eax, 0")
-        self.text_section.append(f"  je {else_label if node.false_body else end_label}")
-        self.visit(node.true_body)
+        yield self.condition(node.condition, else_label if node.false_body else end_label)
+        yield self.visit(node.true_body)
         if node.false_body:
             self.text_section.append(f"  jmp {end_label}")
             self.text_section.append(f"{else_label}:")
-            self.visit(node.false_body)
+            yield self.visit(node.false_body)
         self.text_section.append(f"{end_label}:")
         
     def visit_WhileStatement(self, node):
@@ -133,36 +311,41 @@ class AssemblyGenerator:
         label_end = f".Lend_while{self.label_counter}"
         self.label_counter += 1
 
-        self.code.append(f"{label_start}:")
-        self.visit(node.condition)
-        self.code.append("  cmp eax, 0")
-        self.code.append(f"  je {label_end}")
-        self.visit(node.body)
-        self.code.append(f"  jmp {label_start}")
-        self.code.append(f"{label_end}:")
+        self.text_section.append(f"{label_start}:")
+        yield self.condition(node.condition, label_end)
+        yield self.visit(node.body)
+        self.text_section.append(f"  jmp {label_start}")
+        self.text_section.append(f"{label_end}:")
 
     def visit_ForStatement(self, node):
         start_label = f".Lfor_start{self.label_counter}"
         end_label = f".Lfor_end{self.label_counter}"
         self.label_counter += 1
-        if node.init: self.visit(node.init)
+        if node.init: yield self.visit(node.init)
         self.text_section.append(f"{start_label}:")
         if node.cond:
-            self.visit(node.cond)
-            self.text_section.append("  cmp eax, 0")
-            self.text_section.append(f"  je {end_label}")
-        self.visit(node.body)
-        if node.incr: self.visit(node.incr)
+            yield self.condition(node.cond, end_label)
+        yield self.visit(node.body)
+        if node.incr: yield self.visit(node.incr)
         self.text_section.append(f"  jmp {start_label}")
         self.text_section.append(f"{end_label}:")
 
+    def visit_DoWhileStatement(self, node):
+        label_start = f".Ldo{self.label_counter}"
+        self.label_counter += 1
+
+        self.text_section.append(f"{label_start}:")
+        yield self.visit(node.body)
+        yield self.condition(node.condition, label_start, when=True)
+
     def visit_FunctionCall(self, node):
         if node.name.name == 'printf':
-            string_label = f'S{self.string_counter}'
+            label = string_label(self.function_name, self.string_counter)
             self.string_counter += 1
             # Adiciona a string na seção de dados
-            self.data_section.append(f'  {string_label} db {node.args[0].value}, 10, 0')
+            self.data_section.append(f'  {label} db {node.args[0].value}, 10, 0')
             # Gera o código da chamada
-            self.text_section.append(f"  push {string_label}")
+            self.calls = True
+            self.text_section.append(f"  push {label}")
             self.text_section.append("  call printf")
             self.text_section.append("  add esp, 4")
\ No newline at end of file
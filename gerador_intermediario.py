@@ -0,0 +1,192 @@
+from nos import *
+from visitante import Visitor
+from intermediario import Var, Copy, BinOp, Print, Jump, CondJump, Return, BasicBlock, Function, NEGATED
+
+class IRBuilder(Visitor):
+    """
+    Traduz a AST validada para a representação intermediária de intermediario.py:
+    uma Function por FunctionDefinition, com as expressões decompostas em instruções
+    de três endereços sobre temporários e os comandos de controle em blocos básicos.
+
+    As variáveis locais viram objetos Var distintos por declaração (nomes repetidos
+    por sombreamento recebem um sufixo), de modo que a IR não depende mais de escopos.
+    Os identificadores chegam resolvidos pela análise semântica: cada Symbol aponta
+    para a Var da sua declaração mais recente.
+    """
+    def __init__(self):
+        self.functions = []
+        self.function = None
+        self.block = None
+        self.variables = {}
+        self.names = {}
+        self.temp_counter = 0
+        self.block_counter = 0
+
+    def build(self, ast_root):
+        self.traverse(ast_root)
+        return self.functions
+
+    def new_block(self):
+        block = BasicBlock(f"B{self.block_counter}")
+        self.block_counter += 1
+        return block
+
+    def start(self, block):
+        # Passa a emitir no bloco; o bloco anterior já deve ter terminado em um desvio.
+        self.function.blocks.append(block)
+        self.block = block
+
+    def emit(self, instruction):
+        self.block.instructions.append(instruction)
+
+    def new_temp(self):
+        temp = Var(f"t{self.temp_counter}", temp=True)
+        self.temp_counter += 1
+        self.function.variables.append(temp)
+        return temp
+
+    def new_variable(self, symbol):
+        name = symbol.name
+        count = self.names.get(name, 0)
+        self.names[name] = count + 1
+        variable = Var(name if count == 0 else f"{name}.{count}")
+        self.function.variables.append(variable)
+        self.variables[symbol] = variable
+        return variable
+
+    def lookup(self, identifier):
+        return self.variables[identifier.symbol]
+
+    def expression(self, node):
+        # Retorna o operando com o valor da expressão: constante, variável ou temporário.
+        if type(node) is Constant:
+            return int(node.value)
+        if type(node) is Identifier:
+            return self.lookup(node)
+        left = yield self.expression(node.left)
+        right = yield self.expression(node.right)
+        temp = self.new_temp()
+        self.emit(BinOp(temp, node.op, left, right))
+        return temp
+
+    def assign(self, variable, node):
+        # Uma operação binária escreve direto na variável, sem temporário intermediário.
+        if type(node) is BinaryOperation:
+            left = yield self.expression(node.left)
+            right = yield self.expression(node.right)
+            self.emit(BinOp(variable, node.op, left, right))
+        else:
+            self.emit(Copy(variable, (yield self.expression(node))))
+
+    def condition(self, node, true_block, false_block):
+        # Comparações viram um único desvio condicional; outros valores são testados contra 0.
+        if type(node) is BinaryOperation and node.op in NEGATED:
+            left = yield self.expression(node.left)
+            right = yield self.expression(node.right)
+            self.emit(CondJump(node.op, left, right, true_block, false_block))
+        else:
+            value = yield self.expression(node)
+            self.emit(CondJump('!=', value, 0, true_block, false_block))
+
+    def visit_list(self, node_list):
+        for node in node_list:
+            yield self.visit(node)
+
+    def visit_FunctionDefinition(self, node):
+        self.function = Function(node.name)
+        self.variables = {}
+        self.names = {}
+        self.temp_counter = 0
+        self.block_counter = 0
+        self.start(self.new_block())
+        yield self.visit(node.body)
+        # Funções que chegam ao fim sem 'return' (o bloco é descartado se for inalcançável).
+        self.emit(Return())
+        self.function.build_cfg()
+        self.functions.append(self.function)
+
+    def visit_CompoundStatement(self, node):
+        for statement in node.statements:
+            yield self.visit(statement)
+
+    def visit_Declaration(self, node):
+        variable = self.new_variable(node.symbol)
+        if node.initial_value:
+            yield self.assign(variable, node.initial_value)
+
+    def visit_Assignment(self, node):
+        yield self.assign(self.lookup(node.lhs), node.rhs)
+
+    def visit_UnaryOperation(self, node):
+        variable = self.lookup(node.operand)
+        self.emit(BinOp(variable, '+' if node.op == '++' else '-', variable, 1))
+
+    def visit_FunctionCall(self, node):
+        if node.name.name == 'printf':
+            self.emit(Print(node.args[0].value))
+
+    def visit_ReturnStatement(self, node):
+        value = (yield self.expression(node.value)) if node.value else None
+        self.emit(Return(value))
+        # O que vier depois do 'return' vai para um bloco inalcançável.
+        self.start(self.new_block())
+
+    def visit_IfStatement(self, node):
+        then_block = self.new_block()
+        end_block = self.new_block()
+        else_block = self.new_block() if node.false_body else end_block
+        yield self.condition(node.condition, then_block, else_block)
+        self.start(then_block)
+        yield self.visit(node.true_body)
+        self.emit(Jump(end_block))
+        if node.false_body:
+            self.start(else_block)
+            yield self.visit(node.false_body)
+            self.emit(Jump(end_block))
+        self.start(end_block)
+
+    def visit_WhileStatement(self, node):
+        header = self.new_block()
+        body = self.new_block()
+        exit_block = self.new_block()
+        self.emit(Jump(header))
+        self.start(header)
+        yield self.condition(node.condition, body, exit_block)
+        self.start(body)
+        yield self.visit(node.body)
+        self.emit(Jump(header))
+        self.start(exit_block)
+
+    def visit_ForStatement(self, node):
+        if node.init:
+            yield self.visit(node.init)
+        header = self.new_block()
+        body = self.new_block()
+        increment = self.new_block()
+        exit_block = self.new_block()
+        self.emit(Jump(header))
+        self.start(header)
+        if node.cond:
+            yield self.condition(node.cond, body, exit_block)
+        else:
+            self.emit(Jump(body))
+        self.start(body)
+        yield self.visit(node.body)
+        self.emit(Jump(increment))
+        self.start(increment)
+        if node.incr:
+            yield self.visit(node.incr)
+        self.emit(Jump(header))
+        self.start(exit_block)
+
+    def visit_DoWhileStatement(self, node):
+        body = self.new_block()
+        test = self.new_block()
+        exit_block = self.new_block()
+        self.emit(Jump(body))
+        self.start(body)
+        yield self.visit(node.body)
+        self.emit(Jump(test))
+        self.start(test)
+        yield self.condition(node.condition, body, exit_block)
+        self.start(exit_block)
@@ -0,0 +1,202 @@
+# Representação intermediária (IR) de três endereços, organizada em blocos básicos
+# ligados por um grafo de fluxo de controle (CFG).
+#
+# Os operandos são variáveis (Var: variáveis locais do programa e temporários criados
+# na tradução das expressões) ou constantes inteiras (int do Python). Cada bloco básico
+# termina em exatamente uma instrução de desvio: Jump, CondJump ou Return.
+
+# Negação de cada comparação, usada ao inverter um desvio condicional.
+NEGATED = {'<': '>=', '>=': '<', '>': '<=', '<=': '>', '==': '!=', '!=': '=='}
+
+class Var:
+    __slots__ = ('name', 'temp')
+    def __init__(self, name, temp=False):
+        self.name = name
+        self.temp = temp
+
+    def __repr__(self):
+        return self.name
+
+class Instruction:
+    __slots__ = ()
+    # Variáveis lidas e escrita pela instrução (para as análises de fluxo de dados).
+    def uses(self):
+        return [operand for operand in self.operands() if type(operand) is Var]
+
+    def operands(self):
+        return ()
+
+    def defines(self):
+        return None
+
+# dest = src
+class Copy(Instruction):
+    __slots__ = ('dest', 'src')
+    def __init__(self, dest, src):
+        self.dest = dest
+        self.src = src
+
+    def operands(self):
+        return (self.src,)
+
+    def defines(self):
+        return self.dest
+
+    def __str__(self):
+        return f"{self.dest} = {self.src}"
+
+# dest = left op right (aritméticos e comparações, que produzem 0 ou 1)
+class BinOp(Instruction):
+    __slots__ = ('dest', 'op', 'left', 'right')
+    def __init__(self, dest, op, left, right):
+        self.dest = dest
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def operands(self):
+        return (self.left, self.right)
+
+    def defines(self):
+        return self.dest
+
+    def __str__(self):
+        return f"{self.dest} = {self.left} {self.op} {self.right}"
+
+# printf(string)
+class Print(Instruction):
+    __slots__ = ('string',)
+    def __init__(self, string):
+        self.string = string
+
+    def __str__(self):
+        return f"printf({self.string})"
+
+# goto target
+class Jump(Instruction):
+    __slots__ = ('target',)
+    def __init__(self, target):
+        self.target = target
+
+    def successors(self):
+        return (self.target,)
+
+    def __str__(self):
+        return f"goto {self.target.label}"
+
+# if left op right goto true_target else goto false_target
+class CondJump(Instruction):
+    __slots__ = ('op', 'left', 'right', 'true_target', 'false_target')
+    def __init__(self, op, left, right, true_target, false_target):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.true_target = true_target
+        self.false_target = false_target
+
+    def operands(self):
+        return (self.left, self.right)
+
+    def successors(self):
+        return (self.true_target, self.false_target)
+
+    def __str__(self):
+        return f"if {self.left} {self.op} {self.right} goto {self.true_target.label} else goto {self.false_target.label}"
+
+# return value (value é None em funções que terminam sem 'return')
+class Return(Instruction):
+    __slots__ = ('value',)
+    def __init__(self, value=None):
+        self.value = value
+
+    def operands(self):
+        return () if self.value is None else (self.value,)
+
+    def successors(self):
+        return ()
+
+    def __str__(self):
+        return "return" if self.value is None else f"return {self.value}"
+
+class BasicBlock:
+    __slots__ = ('label', 'instructions', 'successors', 'predecessors')
+    def __init__(self, label):
+        self.label = label
+        self.instructions = []
+        self.successors = []
+        self.predecessors = []
+
+    @property
+    def terminator(self):
+        return self.instructions[-1] if self.instructions else None
+
+class Function:
+    """
+    Uma função em IR: lista de blocos básicos (o primeiro é a entrada) e as variáveis
+    locais e temporários que ela usa. 'build_cfg' liga os blocos pelos seus desvios e
+    descarta os blocos inalcançáveis a partir da entrada.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.blocks = []
+        self.variables = []
+
+    def build_cfg(self):
+        for block in self.blocks:
+            block.successors = []
+            block.predecessors = []
+
+        reachable = set()
+        pending = [self.blocks[0]]
+        while pending:
+            block = pending.pop()
+            if block in reachable:
+                continue
+            reachable.add(block)
+            block.successors = list(block.terminator.successors())
+            pending.extend(block.successors)
+
+        self.blocks = [block for block in self.blocks if block in reachable]
+        for block in self.blocks:
+            for successor in block.successors:
+                successor.predecessors.append(block)
+
+    def liveness(self):
+        """
+        Análise de variáveis vivas (fluxo de dados para trás, iterada até o ponto fixo).
+        Retorna (live_in, live_out): para cada bloco, os conjuntos de variáveis vivas na
+        entrada e na saída.
+        """
+        use = {}
+        define = {}
+        for block in self.blocks:
+            used, defined = set(), set()
+            for instruction in block.instructions:
+                used.update(var for var in instruction.uses() if var not in defined)
+                dest = instruction.defines()
+                if dest is not None:
+                    defined.add(dest)
+            use[block], define[block] = used, defined
+
+        live_in = {block: set() for block in self.blocks}
+        live_out = {block: set() for block in self.blocks}
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(self.blocks):
+                out = set()
+                for successor in block.successors:
+                    out |= live_in[successor]
+                new_in = use[block] | (out - define[block])
+                if new_in != live_in[block] or out != live_out[block]:
+                    live_in[block], live_out[block] = new_in, out
+                    changed = True
+        return live_in, live_out
+
+    def format(self):
+        lines = [f"{self.name}:"]
+        for block in self.blocks:
+            predecessors = ", ".join(pred.label for pred in block.predecessors)
+            lines.append(f"  {block.label}:" + (f"  ; predecessores: {predecessors}" if predecessors else ""))
+            lines.extend(f"    {instruction}" for instruction in block.instructions)
+        return "\n".join(lines)
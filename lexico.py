@@ -1,5 +1,8 @@
 import re
-from tabulate import tabulate
+import sys
+import bisect
+import itertools
+from array import array
 
 # Palavras-chave
 KEYWORDS = {
@@ -10,40 +13,154 @@ KEYWORDS = {
     'unsigned', 'void', 'volatile', 'while', 'printf', 'scanf'
 }
 
-def lexical_analyzer(code):
-    # Realiza a análise léxica do código C e retorna uma lista de tokens.
-    token_specification = [
-        ('COMMENT',      r'//.*|/\*[\s\S]*?\*/'),
-        ('STRING',       r'"([^"\\]|\\.)*"'),
-        ('NUMBER',       r'\b\d+(\.\d+)?\b'),
-        ('IDENTIFIER',   r'\b[a-zA-Z_][a-zA-Z_0-9]*\b'),
-        ('OPERATOR',     r'==|!=|<=|>=|&&|\|\||[+\-*/=<>!]'),
-        ('DELIMITER',    r'[(){};,]'),
-        ('NEWLINE',      r'\n'),
-        ('SKIP',         r'[ \t]+'),
-        ('MISMATCH',     r'.'),
-    ]
-
-    tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification)
-    tokens = []
-    
-    for match in re.finditer(tok_regex, code):
-        kind = match.lastgroup
-        value = match.group()
+TOKEN_SPECIFICATION = [
+    ('COMMENT',      r'//.*|/\*[\s\S]*?\*/'),
+    ('STRING',       r'"([^"\\]|\\.)*"'),
+    ('NUMBER',       r'\b\d+(\.\d+)?\b'),
+    ('IDENTIFIER',   r'\b[a-zA-Z_][a-zA-Z_0-9]*\b'),
+    ('OPERATOR',     r'==|!=|<=|>=|&&|\|\||[+\-*/=<>!]'),
+    ('DELIMITER',    r'[(){};,]'),
+    ('SKIP',         r'[ \t\n]+'),
+    ('MISMATCH',     r'.'),
+]
+
+# O padrão combinado é compilado uma única vez, na importação do módulo.
+TOKEN_REGEX = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPECIFICATION))
+
+# Códigos numéricos dos tipos de token (comparados como inteiros pelo parser).
+IDENTIFIER, KEYWORD, NUMBER, STRING, OPERATOR, DELIMITER = range(6)
+KIND_NAMES = ('IDENTIFIER', 'KEYWORD', 'NUMBER', 'STRING', 'OPERATOR', 'DELIMITER')
+EOF = -1
+
+_KIND_CODES = {'IDENTIFIER': IDENTIFIER, 'NUMBER': NUMBER, 'STRING': STRING,
+               'OPERATOR': OPERATOR, 'DELIMITER': DELIMITER}
 
-        if kind == 'IDENTIFIER' and value in KEYWORDS:
-            kind = 'KEYWORD'
-        elif kind in {'SKIP', 'COMMENT', 'NEWLINE'}:
+class LexicalError(Exception):
+    """Erro léxico (caractere que não inicia nenhum token), com a sua linha e coluna."""
+    def __init__(self, message, line, column):
+        super().__init__(f"{message} (linha {line}, coluna {column})")
+        self.line = line
+        self.column = column
+
+def scan(code, line=1, column=1):
+    # Gera os tokens do código C sob demanda como tuplas (código do tipo, valor, início, fim),
+    # onde início e fim são offsets no código-fonte. 'line' e 'column' são a posição do
+    # início de 'code' no arquivo (ver TokenBuffer), usada na mensagem de LexicalError.
+    intern = sys.intern
+    for match in TOKEN_REGEX.finditer(code):
+        kind = match.lastgroup
+        if kind == 'SKIP' or kind == 'COMMENT':
             continue
+
+        value = match.group()
+        if kind == 'IDENTIFIER':
+            value = intern(value)
+            yield (KEYWORD if value in KEYWORDS else IDENTIFIER), value, match.start(), match.end()
+        elif kind == 'STRING':
+            yield STRING, value, match.start(), match.end()
         elif kind == 'MISMATCH':
-            raise RuntimeError(f'Token inválido: {value}')
-        
-        tokens.append((kind, value))
-    
-    return tokens
+            start = match.start()
+            line_start = code.rfind('\n', 0, start)
+            error_column = start - line_start
+            if line_start == -1:
+                error_column += column - 1
+            raise LexicalError(f'Token inválido: {value}', line + code.count('\n', 0, start), error_column)
+        else:
+            yield _KIND_CODES[kind], intern(value), match.start(), match.end()
+
+class TokenBuffer:
+    """
+    Armazena os tokens em colunas paralelas compactas: códigos de tipo (array de bytes),
+    valores internados e offsets de início/fim no código-fonte (arrays de inteiros).
+    O buffer é preenchido sob demanda, à medida que o parser avança.
+
+    Quando 'code' é um trecho de um arquivo maior, 'line' e 'column' indicam onde ele
+    começa no arquivo, e as posições dos tokens são relatadas em relação ao arquivo.
+    """
+    # Quantidade de tokens lidos de uma vez quando o consumidor alcança o fim do buffer.
+    CHUNK = 4096
+
+    def __init__(self, code, line=1, column=1):
+        self.code = code
+        self.line = line
+        self.column = column
+        self.kinds = array('B')
+        self.values = []
+        self.starts = array('I')
+        self.ends = array('I')
+        self._scanner = scan(code, line, column)
+        self._line_starts = None
+
+    def fill(self, count=None):
+        """Lê tokens até haver pelo menos 'count' no buffer (todos, se None) e retorna o total disponível."""
+        if self._scanner is not None:
+            missing = None if count is None else count - len(self.kinds)
+            if missing is None or missing > 0:
+                kinds, values, starts, ends = self.kinds.append, self.values.append, self.starts.append, self.ends.append
+                read = 0
+                for kind, value, start, end in itertools.islice(self._scanner, missing):
+                    kinds(kind)
+                    values(value)
+                    starts(start)
+                    ends(end)
+                    read += 1
+                if missing is None or read < missing:
+                    self._scanner = None
+        return len(self.kinds)
+
+    def __len__(self):
+        return self.fill()
+
+    def line_column(self, offset):
+        """Retorna (linha, coluna), a partir de 1, de um offset do código-fonte."""
+        if self._line_starts is None:
+            self._line_starts = array('I', [0])
+            self._line_starts.extend(match.end() for match in re.finditer('\n', self.code))
+        line = bisect.bisect_right(self._line_starts, offset)
+        column = offset - self._line_starts[line - 1] + 1
+        if line == 1:
+            column += self.column - 1
+        return line + self.line - 1, column
+
+    def position(self, index):
+        """Retorna (linha, coluna), a partir de 1, do início do token 'index'."""
+        return self.line_column(self.starts[index])
+
+    def __getitem__(self, index):
+        # Forma legível do token: (tipo, valor, linha, coluna).
+        if index < 0:
+            index += len(self)
+        elif index >= len(self.kinds):
+            self.fill(index + 1)
+        line, column = self.position(index)
+        return (KIND_NAMES[self.kinds[index]], self.values[index], line, column)
+
+    def __iter__(self):
+        index = 0
+        while index < len(self.kinds) or index < self.fill(index + self.CHUNK):
+            yield self[index]
+            index += 1
+
+def iter_tokens(code):
+    # Gera os tokens do código C sob demanda, sem montar a lista completa.
+    # Cada token é uma tupla (tipo, valor, linha, coluna), com linha e coluna a partir de 1.
+    line = 1
+    line_start = 0
+    for kind, value, start, end in scan(code):
+        newline = code.rfind('\n', line_start, start)
+        if newline != -1:
+            line += code.count('\n', line_start, newline + 1)
+            line_start = newline + 1
+        yield (KIND_NAMES[kind], value, line, start - line_start + 1)
+
+def lexical_analyzer(code):
+    # Realiza a análise léxica do código C e retorna uma lista de tokens.
+    return list(iter_tokens(code))
 
 # Exemplo de uso
 if __name__ == '__main__':
+    from tabulate import tabulate
+
     c_code = '''
     int main() {
         int x = 10;
@@ -62,4 +179,4 @@ if __name__ == '__main__':
     }
     '''
     tokens = lexical_analyzer(c_code)
-    print(tabulate(tokens, headers=["Tipo", "Token"]))
+    print(tabulate(tokens, headers=["Tipo", "Token", "Linha", "Coluna"]))
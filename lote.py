@@ -0,0 +1,102 @@
+import io
+import os
+import glob
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+from relatorio import Reporter, QUIET
+
+def expandir_entradas(entradas):
+    # Converte arquivos, diretórios (busca recursiva por .c) e padrões glob em uma lista
+    # ordenada e sem repetições de caminhos de arquivos .c.
+    caminhos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            for raiz, _, arquivos in os.walk(entrada):
+                caminhos.extend(os.path.join(raiz, nome) for nome in arquivos if nome.endswith('.c'))
+        elif glob.has_magic(entrada):
+            caminhos.extend(glob.glob(entrada, recursive=True))
+        else:
+            # Arquivos inexistentes são mantidos para que o erro apareça no relatório.
+            caminhos.append(entrada)
+    return sorted(set(caminhos))
+
+def compilar_arquivo(caminho, nivel=QUIET, cache=None, opcoes=None, medir=False, profile=None, processos=None):
+    # Executado em cada processo do lote: roda as fases do compilador sobre um arquivo e
+    # retorna (caminho, sucesso, diagnósticos capturados, acerto no cache, estatísticas).
+    # As estatísticas das fases (um dicionário, ou None se 'medir' e 'profile' não
+    # foram pedidos) voltam ao processo principal junto com o resultado. Com 'processos'
+    # (--jobs-funcoes), as funções do arquivo são compiladas em um pool próprio.
+    from main import analisar_codigo_c
+    from estatisticas import CompilationStats
+
+    saida = io.StringIO()
+    acertos = cache.hits if cache is not None else 0
+    estatisticas = CompilationStats(profile=profile) if medir or profile else None
+    with contextlib.redirect_stdout(saida):
+        try:
+            sucesso = analisar_codigo_c(caminho, reporter=Reporter(nivel), cache=cache, opcoes=opcoes,
+                                        estatisticas=estatisticas, processos=processos)
+        except Exception as e:
+            sucesso = False
+            print(f"ERRO: {type(e).__name__}: {e}")
+    acerto = cache is not None and cache.hits > acertos
+    return caminho, sucesso, saida.getvalue(), acerto, estatisticas and estatisticas.as_dict()
+
+def compilar_lote(caminhos, jobs=None, nivel=QUIET, cache=None, opcoes=None, medir=False, profile=None,
+                  processos=None):
+    # Distribui os arquivos entre 'jobs' processos e retorna os resultados na ordem de entrada.
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(caminhos) <= 1:
+        return [compilar_arquivo(caminho, nivel, cache, opcoes, medir, profile, processos) for caminho in caminhos]
+
+    # Blocos de vários arquivos por tarefa reduzem o custo de comunicação entre processos
+    # quando o lote tem milhares de arquivos pequenos.
+    chunksize = max(1, len(caminhos) // (jobs * 4))
+    n = len(caminhos)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(compilar_arquivo, caminhos, [nivel] * n, [cache] * n, [opcoes] * n,
+                                 [medir] * n, [profile] * n, [processos] * n, chunksize=chunksize))
+
+def main(entradas, jobs=None, nivel=QUIET, cache=None, mostrar_estatisticas_cache=False, opcoes=None,
+         mostrar_estatisticas=False, stats_json=None, profile=None, processos=None):
+    # Compila o lote e imprime o resultado de cada arquivo. Retorna o código de saída do processo.
+    caminhos = expandir_entradas(entradas)
+    if not caminhos:
+        print("ERRO: Nenhum arquivo .c encontrado.")
+        return 1
+
+    from main import registro_estatisticas
+
+    falhas = 0
+    acertos_cache = 0
+    registros = []
+    medir = mostrar_estatisticas or stats_json is not None
+    for caminho, sucesso, saida, acerto, dados in compilar_lote(caminhos, jobs, nivel, cache, opcoes, medir, profile,
+                                                                    processos):
+        acertos_cache += acerto
+        if not sucesso:
+            falhas += 1
+        print(f"[{'OK' if sucesso else 'ERRO'}] {caminho}")
+        if saida.strip() and (not sucesso or nivel > QUIET or profile):
+            print(saida.rstrip())
+        if dados is not None:
+            registros.append(registro_estatisticas(caminho, sucesso, opcoes, dados))
+
+    print(f"\n{len(caminhos)} arquivo(s) processado(s): {len(caminhos) - falhas} com sucesso, {falhas} com erro.")
+    if cache is not None and mostrar_estatisticas_cache:
+        # Os contadores de cada processo ficam nos workers; o total é reconstruído aqui.
+        from main import formatar_estatisticas_cache
+        stats = cache.stats()
+        stats['acertos'], stats['falhas'] = acertos_cache, len(caminhos) - acertos_cache
+        print(formatar_estatisticas_cache(stats))
+    if mostrar_estatisticas:
+        print(f"\n{'arquivo':<40} {'tempo (ms)':>11} {'cpu (ms)':>10} {'memória (KiB)':>14}")
+        for registro in registros:
+            total = registro['total']
+            print(f"{registro['arquivo']:<40} {total['tempo'] * 1000:11.2f} {total['cpu'] * 1000:10.2f} "
+                  f"{total.get('memoria_pico', 0) / 1024:14.1f}")
+    if stats_json is not None:
+        from estatisticas import salvar_json
+        salvar_json(registros, stats_json)
+    return 1 if falhas else 0
@@ -1,88 +1,364 @@
 import os
+import sys
 import traceback
 import argparse
+import contextlib
 
 import lexico
-from tabulate import tabulate
 from nos import *
-from analisador import Parser
+from analisador import Parser, SyntaxErrors
 from impressor import print_custom_ast
-from semantico import SemanticAnalyzer, SemanticError
-from gerador_assembly import AssemblyGenerator
-
-def fase_lexica(codigo):
-    print("\n--- FASE 1: Análise Léxica ---")
-    tokens = lexico.lexical_analyzer(codigo)
-    print("Tokens encontrados:")
-    print(tabulate(tokens, headers=["Tipo", "Valor"])) 
+from semantico import SemanticAnalyzer, SemanticError, SemanticErrors
+from otimizador import ConstantFolder
+from otimizador_codigo_morto import DeadCodeEliminator
+from otimizador_lacos import LoopOptimizer, LoopUnroller
+from gerador_assembly import AssemblyGenerator, assemble
+from gerador_intermediario import IRBuilder
+from backend_x86 import X86Backend
+from otimizador_peephole import PeepholeOptimizer
+from relatorio import Reporter, LEVEL_NAMES
+from cache_compilacao import CompilationCache
+from estatisticas import CompilationStats, FASES, contar_nos, contar_instrucoes, salvar_json
+from compilacao_por_funcao import compilar_por_funcao, FunctionCache
+
+def fase_lexica(codigo, reporter):
+    reporter.phase("FASE 1: Análise Léxica")
+    tokens = lexico.TokenBuffer(codigo)
+    if reporter.full:
+        # O tabulate só é importado quando a listagem completa é pedida.
+        from tabulate import tabulate
+        reporter.detail("Tokens encontrados:")
+        reporter.detail(tabulate(tokens, headers=["Tipo", "Valor", "Linha", "Coluna"]))
     return tokens
 
-def fase_sintatica(tokens):
-    print("\n--- FASE 2: Análise Sintática ---")
-    parser = Parser(tokens)
+# Número de erros após o qual as análises sintática e semântica desistem do arquivo.
+MAX_ERROS_PADRAO = 20
+
+def max_erros(opcoes):
+    return (opcoes or {}).get('max_erros', MAX_ERROS_PADRAO)
+
+def fase_sintatica(tokens, reporter, opcoes=None):
+    reporter.phase("FASE 2: Análise Sintática")
+    parser = Parser(tokens, max_erros(opcoes))
     ast = parser.parse_program()
-    print("Árvore Sintática Abstrata (AST) gerada:")
-    print_custom_ast(ast) 
+    if reporter.full:
+        reporter.detail("Árvore Sintática Abstrata (AST) gerada:")
+        print_custom_ast(ast)
+    elif reporter.summary:
+        reporter.info(f"{len(tokens)} tokens, {len(ast)} função(ões) analisada(s).")
     return ast
 
-def fase_semantica(ast):
-    print("\n--- FASE 3: Análise Semântica ---")
-    analyzer = SemanticAnalyzer()
-    return analyzer.analyze(ast) 
-
-def fase_geracao_codigo(ast):
-    print("\n--- FASE 4: Geração de Código Assembly ---")
-    gerador = AssemblyGenerator()
-    return gerador.generate(ast)
-
-def analisar_codigo_c(caminho_arquivo, gerar_arquivo=True):
-    print(f"\n--- Analisando o arquivo '{caminho_arquivo}' ---")
-    ast = None
-    assembly_code = None
-    
+def fase_semantica(ast, reporter, tokens=None, opcoes=None, assinaturas=()):
+    reporter.phase("FASE 3: Análise Semântica")
+    analyzer = SemanticAnalyzer(reporter, tokens, max_erros(opcoes), assinaturas)
+    return analyzer.analyze(ast), analyzer
+
+# Nível de otimização usado quando as opções não definem 'otimizacao' (-O1).
+NIVEL_OTIMIZACAO_PADRAO = 1
+
+def nivel_otimizacao(opcoes):
+    return (opcoes or {}).get('otimizacao', NIVEL_OTIMIZACAO_PADRAO)
+
+def fase_otimizacao(ast, reporter, opcoes=None, dead_stores=()):
+    # -O0: nenhuma otimização; -O1: dobramento de constantes, eliminação de código
+    # morto ('dead_stores' vem da análise semântica) e peephole; -O2: também
+    # movimentação de código invariante e redução de força nos laços; -O3: também
+    # desenrola laços pequenos com número constante de iterações.
+    reporter.phase("FASE 4: Otimização")
+    nivel = nivel_otimizacao(opcoes)
+    if nivel == 0:
+        reporter.info("Otimizações desativadas (-O0).")
+        return ast
+    otimizador = ConstantFolder()
+    ast = otimizador.optimize(ast)
+    eliminador = DeadCodeEliminator(dead_stores)
+    ast = eliminador.optimize(ast)
+    if nivel >= 3:
+        desenrolador = LoopUnroller()
+        ast = desenrolador.optimize(ast)
+        if desenrolador.unrolled:
+            # As cópias do corpo têm a variável do laço trocada por constantes.
+            ast = otimizador.optimize(ast)
+        if reporter.summary:
+            reporter.info(f"{desenrolador.unrolled} laço(s) desenrolado(s).")
+    if reporter.summary:
+        reporter.info(f"{otimizador.folded} expressão(ões) constante(s) dobrada(s), "
+                      f"{otimizador.simplified} simplificação(ões) algébrica(s), "
+                      f"{otimizador.pruned} desvio(s) com condição constante removido(s).")
+        reporter.info(f"{eliminador.declarations} variável(is) nunca lida(s) removida(s), "
+                      f"{eliminador.stores} atribuição(ões) morta(s) removida(s), "
+                      f"{eliminador.unreachable} instrução(ões) inalcançável(is) removida(s).")
+    if nivel >= 2:
+        lacos = LoopOptimizer()
+        ast = lacos.optimize(ast)
+        if reporter.summary:
+            reporter.info(f"{lacos.hoisted} expressão(ões) invariante(s) movida(s) para fora de laços, "
+                          f"{lacos.reduced} multiplicação(ões) pela variável de indução reduzida(s) a somas.")
+    return ast
+
+def fase_geracao_codigo(ast, reporter, opcoes=None):
+    reporter.phase("FASE 5: Geração de Código Assembly")
+    return assemble(gerar_funcoes(ast, reporter, opcoes))
+
+def gerar_funcoes(ast, reporter, opcoes=None):
+    # Assembly de cada função da AST como (linhas da seção de dados, texto), já com o
+    # peephole; gerador_assembly.assemble junta as funções no programa final.
+    if opcoes and opcoes.get('ir'):
+        # AST -> código de três endereços em blocos básicos -> Assembly.
+        funcoes = IRBuilder().build(ast)
+        if reporter.full:
+            reporter.detail("Código intermediário (blocos básicos):")
+            for funcao in funcoes:
+                reporter.detail(funcao.format())
+        elif reporter.summary:
+            reporter.info(f"{sum(len(funcao.blocks) for funcao in funcoes)} bloco(s) básico(s) no código intermediário.")
+        funcoes = X86Backend().generate_functions(funcoes)
+    else:
+        funcoes = AssemblyGenerator().generate_functions(ast)
+    if nivel_otimizacao(opcoes) == 0:
+        return funcoes
+    return otimizar_assembly(funcoes, reporter)
+
+def otimizar_assembly(funcoes, reporter):
+    # Otimização peephole sobre o texto de cada função, repetida até o ponto fixo. Os
+    # rótulos dos desvios são locais à função e se repetem entre funções, então cada
+    # uma é otimizada separadamente.
+    peephole = PeepholeOptimizer()
+    funcoes = [(dados, peephole.optimize(texto)) for dados, texto in funcoes]
+    if reporter.full and peephole.rewrites:
+        reporter.detail("Reescritas do otimizador peephole:")
+        for nome, quantidade in sorted(peephole.rewrites.items()):
+            reporter.detail(f"  {nome}: {quantidade}")
+    if reporter.summary:
+        reporter.info(f"{sum(peephole.rewrites.values())} reescrita(s) peephole aplicada(s).")
+    return funcoes
+
+def registro_estatisticas(caminho_arquivo, sucesso, opcoes, dados):
+    # Entrada de um arquivo na saída JSON de --stats-json ('dados' vem de CompilationStats.as_dict).
+    return {'arquivo': caminho_arquivo, 'sucesso': sucesso, 'opcoes': opcoes or {}, **dados}
+
+def formatar_estatisticas_cache(stats):
+    return (f"[CACHE] {stats['acertos']} acerto(s), {stats['falhas']} falha(s), {stats['remocoes']} remoção(ões); "
+            f"{stats['entradas']} entrada(s), {stats['bytes'] / 1024:.1f} KiB em disco")
+
+def salvar_assembly(caminho_arquivo, assembly_code, reporter):
+    output_filename = os.path.splitext(caminho_arquivo)[0] + ".asm"
+    with open(output_filename, "w") as f:
+        f.write(assembly_code)
+    if reporter.summary:
+        reporter.info(f"Código Assembly salvo em: '{output_filename}'")
+
+def reutilizar_do_cache(caminho_arquivo, entrada, gerar_arquivo, reporter):
+    # Reproduz o resultado guardado no cache sem executar nenhuma fase.
+    reporter.info("[CACHE] Código-fonte inalterado; resultado reutilizado.")
+    for tipo, mensagem in entrada['diagnosticos']:
+        if tipo == 'erro':
+            reporter.error(mensagem)
+        else:
+            reporter.warning(mensagem)
+    if entrada['assembly'] is not None and gerar_arquivo:
+        salvar_assembly(caminho_arquivo, entrada['assembly'], reporter)
+    return entrada['sucesso']
+
+def _sem_medicao(fase):
+    return contextlib.nullcontext()
+
+def compilar_ate_otimizacao(codigo, reporter, opcoes=None, estatisticas=None):
+    # Executa as fases 1 a 4 e retorna a AST anotada e otimizada, ou None se houve erros
+    # (já relatados). 'opcoes' é um dicionário de opções de compilação (ex: {'ir': True,
+    # 'otimizacao': 2, 'max_erros': 5}). Com um CompilationStats em 'estatisticas', cada
+    # fase é medida e os contadores são registrados fora do tempo das fases.
+    medir = estatisticas.phase if estatisticas is not None else _sem_medicao
+    try:
+        with medir('lexica'):
+            tokens = fase_lexica(codigo, reporter)
+            if estatisticas is not None:
+                # Os tokens são lidos sob demanda pelo parser; aqui todos são lidos de uma
+                # vez para que a análise léxica não seja contada na fase sintática.
+                tokens.fill()
+        with medir('sintatica'):
+            ast = fase_sintatica(tokens, reporter, opcoes)
+        if estatisticas is not None:
+            estatisticas.count('lexica', 'tokens', len(tokens))
+            estatisticas.count('sintatica', 'nos', contar_nos(ast))
+        with medir('semantica'):
+            ast, analyzer = fase_semantica(ast, reporter, tokens, opcoes)
+        if estatisticas is not None:
+            estatisticas.count('semantica', 'simbolos', analyzer.symbol_table.declared)
+        with medir('otimizacao'):
+            ast = fase_otimizacao(ast, reporter, opcoes, analyzer.dead_stores)
+        if estatisticas is not None:
+            estatisticas.count('otimizacao', 'nos', contar_nos(ast))
+        return ast
+
+    except lexico.LexicalError as e:
+        reporter.error(f"\nERRO LÉXICO: {e}")
+    except SyntaxErrors as e:
+        for erro in e.errors:
+            reporter.error(f"\nERRO DE SINTAXE: {erro}")
+    except SemanticErrors as e:
+        for erro in e.errors:
+            reporter.error(f"\nERRO SEMÂNTICO: {erro}")
+    except SyntaxError as e:
+        reporter.error(f"\nERRO DE SINTAXE: {e}")
+    except SemanticError as e:
+        reporter.error(f"\nERRO SEMÂNTICO: {e}")
+    return None
+
+def relatar_assembly(assembly_code, reporter):
+    if reporter.full:
+        reporter.detail("Código Assembly gerado:")
+        reporter.detail("="*40)
+        reporter.detail(assembly_code)
+        reporter.detail("="*40)
+    elif reporter.summary:
+        reporter.info(f"{assembly_code.count(chr(10)) + 1} linhas de Assembly geradas.")
+
+def compilar_codigo(codigo, reporter, opcoes=None, estatisticas=None, processos=None, cache_funcoes=None):
+    # Executa as fases sobre o código-fonte e retorna (sucesso, assembly_code). Com
+    # 'processos', cada função passa pelas fases em um processo separado (0 usa todas
+    # as CPUs; ver compilacao_por_funcao.py), e com um FunctionCache em 'cache_funcoes'
+    # só as funções alteradas desde a compilação anterior são compiladas; as medições
+    # de 'estatisticas' exigem as fases sobre o arquivo inteiro, assim como um código
+    # que não pôde ser dividido.
+    if (processos is not None or cache_funcoes is not None) and estatisticas is None:
+        resultado = compilar_por_funcao(codigo, reporter, opcoes, 1 if processos is None else processos,
+                                        cache_funcoes)
+        if resultado is not None:
+            return resultado
+
+    ast = compilar_ate_otimizacao(codigo, reporter, opcoes, estatisticas)
+    # A geração usa as anotações da análise semântica (símbolos e localizações),
+    # então só roda quando as fases anteriores terminaram sem erros (um arquivo sem
+    # funções, vazio ou só com comentários, é válido e gera um Assembly vazio).
+    if ast is None:
+        return False, None
+
+    medir = estatisticas.phase if estatisticas is not None else _sem_medicao
+    try:
+        with medir('geracao'):
+            assembly_code = fase_geracao_codigo(ast, reporter, opcoes)
+        if estatisticas is not None:
+            estatisticas.count('geracao', 'instrucoes', contar_instrucoes(assembly_code))
+        relatar_assembly(assembly_code, reporter)
+    except Exception as gen_error:
+        reporter.error(f"ERRO DURANTE A GERAÇÃO DE CÓDIGO: {gen_error}")
+        return False, None
+    return True, assembly_code
+
+def analisar_codigo_c(caminho_arquivo, gerar_arquivo=True, reporter=None, cache=None, opcoes=None, estatisticas=None,
+                      processos=None):
+    # Retorna True se o arquivo foi compilado sem erros. 'processos' é repassado a compilar_codigo.
+    # Com um CompilationCache, fontes já compilados reutilizam o Assembly guardado; no
+    # nível de verbosidade completo, ou quando as fases são medidas ('estatisticas'), o
+    # cache é apenas atualizado, pois as listagens e as medições exigem a execução das fases.
+    # Se o arquivo mudou, as funções inalteradas desde a última compilação dele são
+    # reaproveitadas do cache (compilação incremental, ver FunctionCache).
+    reporter = reporter if reporter else Reporter()
+    if reporter.summary:
+        reporter.info(f"\n--- Analisando o arquivo '{caminho_arquivo}' ---")
+    primeiro_diagnostico = len(reporter.diagnostics)
+
     try:
         with open(caminho_arquivo, 'r', encoding='utf-8') as f:
             codigo = f.read()
+    except FileNotFoundError:
+        reporter.error(f"ERRO: Arquivo '{caminho_arquivo}' não encontrado.")
+        return False
 
-        # Fases do compilador
-        tokens = fase_lexica(codigo)
-        ast = fase_sintatica(tokens)
-        ast = fase_semantica(ast) 
+    chave = None
+    cache_funcoes = None
+    if cache is not None:
+        chave = cache.key(codigo, opcoes)
+        entrada = cache.get(chave) if not reporter.full and estatisticas is None else None
+        if entrada is not None:
+            return reutilizar_do_cache(caminho_arquivo, entrada, gerar_arquivo, reporter)
+        if not reporter.full and estatisticas is None:
+            cache_funcoes = FunctionCache(cache.load_functions(caminho_arquivo, opcoes))
 
-    except FileNotFoundError:
-        print(f"ERRO: Arquivo '{caminho_arquivo}' não encontrado.")
-    except SyntaxError as e:
-        print(f"\nERRO DE SINTAXE: {e}")
-    except SemanticError as e:
-        print(f"\nERRO SEMÂNTICO: {e}") 
-    
-    finally:
-        if ast:
-            print("\n--- FASE 4: Geração de Código Assembly ---")
-            
-            try:
-                assembly_code = fase_geracao_codigo(ast)
-                print("Código Assembly gerado:")
-                print("="*40)
-                print(assembly_code)
-                print("="*40)
-
-                if gerar_arquivo:
-                    output_filename = os.path.splitext(caminho_arquivo)[0] + ".asm"
-                    with open(output_filename, "w") as f:
-                        f.write(assembly_code)
-                    print(f"Código Assembly salvo em: '{output_filename}'")
-
-            except Exception as gen_error:
-                print(f"ERRO DURANTE A GERAÇÃO DE CÓDIGO: {gen_error}")
+    sucesso, assembly_code = compilar_codigo(codigo, reporter, opcoes, estatisticas, processos, cache_funcoes)
+    if assembly_code is not None and gerar_arquivo:
+        salvar_assembly(caminho_arquivo, assembly_code, reporter)
+    if estatisticas is not None and estatisticas.profiler is not None:
+        if estatisticas.has_profile():
+            caminho_perfil = os.path.splitext(caminho_arquivo)[0] + f".{estatisticas.profile}.prof"
+            reporter.write(f"\n--- Perfil da fase '{estatisticas.profile}' salvo em '{caminho_perfil}' ---")
+            reporter.write(estatisticas.dump_profile(caminho_perfil).rstrip())
+        else:
+            reporter.write(f"\n--- Fase '{estatisticas.profile}' não executada; nenhum perfil gravado ---")
+
+    if chave is not None:
+        cache.put(chave, {
+            'sucesso': sucesso,
+            'assembly': assembly_code,
+            'diagnosticos': reporter.diagnostics[primeiro_diagnostico:],
+        })
+    if cache_funcoes is not None and cache_funcoes.hits + cache_funcoes.misses:
+        cache.store_functions(caminho_arquivo, opcoes, cache_funcoes.entries)
+
+    return sucesso
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Compilador Simples para C subset")
-    parser.add_argument("arquivo", nargs="?", help="Arquivo .c para compilar (ex: programa.c)")
+    parser.add_argument("arquivos", nargs="*",
+                        help="Arquivos .c, diretórios ou padrões glob para compilar (ex: programa.c src/ 'testes/*.c')")
+    parser.add_argument("--verbosidade", choices=list(LEVEL_NAMES), default="completo",
+                        help="Nível de diagnóstico exibido (padrão: completo)")
+    parser.add_argument("-q", "--silencioso", action="store_const", dest="verbosidade", const="silencioso",
+                        help="Não exibe diagnósticos; apenas gera o arquivo .asm")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Compila os arquivos em lote com N processos (padrão: número de CPUs)")
+    parser.add_argument("--jobs-funcoes", type=int, default=None, metavar="N",
+                        help="Compila as funções de um arquivo em paralelo com N processos (0: número de CPUs)")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="Ignora o cache de compilação e executa todas as fases")
+    parser.add_argument("--cache-dir", default=".cache_compilador",
+                        help="Diretório do cache de compilação (padrão: .cache_compilador)")
+    parser.add_argument("--cache-max-mb", type=float, default=256,
+                        help="Tamanho máximo do cache em MiB (padrão: 256)")
+    parser.add_argument("--cache-stats", action="store_true",
+                        help="Exibe as estatísticas do cache ao final")
+    parser.add_argument("--ir", action="store_true",
+                        help="Gera o Assembly a partir do código intermediário em blocos básicos")
+    parser.add_argument("-O", dest="otimizacao", type=int, choices=range(4), default=NIVEL_OTIMIZACAO_PADRAO,
+                        help="Nível de otimização de 0 a 3 (padrão: 1; -O2 otimiza laços, -O3 também os desenrola)")
+    parser.add_argument("--max-erros", type=int, default=MAX_ERROS_PADRAO,
+                        help="Número de erros sintáticos ou semânticos após o qual a análise é interrompida (padrão: 20)")
+    parser.add_argument("--stats", action="store_true",
+                        help="Exibe tempo, tempo de CPU, pico de memória e contadores de cada fase (ignora o cache)")
+    parser.add_argument("--stats-json", metavar="ARQUIVO",
+                        help="Grava as estatísticas das fases em JSON no arquivo ('-' para a saída padrão)")
+    parser.add_argument("--profile", choices=FASES + ('todas',),
+                        help="Executa a fase sob o cProfile, grava o perfil em <arquivo>.<fase>.prof e exibe as funções mais custosas")
     args = parser.parse_args()
+    opcoes = {'ir': True} if args.ir else {}
+    if args.otimizacao != NIVEL_OTIMIZACAO_PADRAO:
+        opcoes['otimizacao'] = args.otimizacao
+    if args.max_erros != MAX_ERROS_PADRAO:
+        opcoes['max_erros'] = args.max_erros
+    reporter = Reporter(LEVEL_NAMES[args.verbosidade])
+    cache = None
+    if not args.sem_cache:
+        cache = CompilationCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024))
 
-    if args.arquivo:
-        analisar_codigo_c(args.arquivo)
+    if args.jobs is not None or len(args.arquivos) > 1 or any(not os.path.isfile(a) for a in args.arquivos):
+        # Modo lote: vários arquivos, diretórios ou padrões glob.
+        import lote
+        sys.exit(lote.main(args.arquivos, args.jobs, LEVEL_NAMES[args.verbosidade], cache, args.cache_stats, opcoes,
+                           args.stats, args.stats_json, args.profile, args.jobs_funcoes))
+    elif args.arquivos:
+        estatisticas = None
+        if args.stats or args.stats_json or args.profile:
+            estatisticas = CompilationStats(profile=args.profile)
+        sucesso = analisar_codigo_c(args.arquivos[0], reporter=reporter, cache=cache, opcoes=opcoes,
+                                    estatisticas=estatisticas, processos=args.jobs_funcoes)
+        if cache is not None and args.cache_stats:
+            print(formatar_estatisticas_cache(cache.stats()))
+        if args.stats:
+            print(f"\n--- Estatísticas das fases ---\n{estatisticas.format()}")
+        if args.stats_json:
+            salvar_json([registro_estatisticas(args.arquivos[0], sucesso, opcoes, estatisticas.as_dict())], args.stats_json)
+        sys.exit(0 if sucesso else 1)
     else:
         exemplo_valido = "exemplo_valido.c"
         exemplo_invalido = "exemplo_invalido.c"
@@ -107,9 +383,9 @@ int main() {
 """
         with open(exemplo_valido, "w", encoding="utf-8") as f:
             f.write(c_code_valid)
-        analisar_codigo_c(exemplo_valido)
+        analisar_codigo_c(exemplo_valido, reporter=reporter)
 
-        print("\n" + "="*60 + "\n")
+        reporter.info("\n" + "="*60 + "\n")
 
         c_code_invalid = """
 int minhaFuncao() {
@@ -118,4 +394,4 @@ int minhaFuncao() {
 """
         with open(exemplo_invalido, "w", encoding="utf-8") as f:
             f.write(c_code_invalid)
-        analisar_codigo_c(exemplo_invalido)
+        analisar_codigo_c(exemplo_invalido, reporter=reporter)
@@ -1,90 +1,134 @@
 # nó generico, garante as subclasses sejam tratadas
+# Todos os nós usam __slots__ (sem __dict__ por instância), pois programas grandes
+# geram milhões de nós. 'span' guarda os offsets de início e fim do trecho do
+# código-fonte que originou o nó em um único inteiro (início << 32 | fim), preenchido
+# pelo parser; nós criados pelos passes de otimização ficam com span None.
+# A análise semântica anota as declarações e os identificadores com o Symbol
+# resolvido ('symbol'), usado pelos passes seguintes no lugar dos nomes.
 class Node:
-    pass
+    __slots__ = ('span',)
+
+    @property
+    def start(self):
+        return None if self.span is None else self.span >> 32
+
+    @property
+    def end(self):
+        return None if self.span is None else self.span & 0xFFFFFFFF
 
 # definição de função
 class FunctionDefinition(Node):
+    __slots__ = ('name', 'return_type', 'body')
     def __init__(self, name, return_type, body):
         self.name = name
         self.return_type = return_type
         self.body = body
+        self.span = None
 
 # declaração de variável
 class Declaration(Node):
-    def __init__(self, var_type, name, initial_value=None):
+    __slots__ = ('var_type', 'name', 'initial_value', 'symbol')
+    def __init__(self, var_type, name, initial_value=None, symbol=None):
         self.var_type = var_type
         self.name = name
         self.initial_value = initial_value
+        self.symbol = symbol
+        self.span = None
 
 # atribuição de valor
 class Assignment(Node):
+    __slots__ = ('lhs', 'rhs')
     def __init__(self, lhs, rhs):
         self.lhs = lhs
         self.rhs = rhs
+        self.span = None
 
 # operação binaria
 class BinaryOperation(Node):
+    __slots__ = ('op', 'left', 'right')
     def __init__(self, op, left, right):
         self.op = op
         self.left = left
         self.right = right
+        self.span = None
 
 class UnaryOperation(Node):
+    __slots__ = ('op', 'operand', 'is_postfix')
     def __init__(self, op, operand, is_postfix=True):
         self.op = op
         self.operand = operand
         self.is_postfix = is_postfix
+        self.span = None
 
 # condicional IF
 class IfStatement(Node):
+    __slots__ = ('condition', 'true_body', 'false_body')
     def __init__(self, condition, true_body, false_body=None):
         self.condition = condition
         self.true_body = true_body
         self.false_body = false_body
+        self.span = None
 
 # loop FOR
 class ForStatement(Node):
+    __slots__ = ('init', 'cond', 'incr', 'body')
     def __init__(self, init, cond, incr, body):
         self.init = init
         self.cond = cond
         self.incr = incr
         self.body = body
+        self.span = None
 
 # loop WHILE
 class WhileStatement(Node):
+    __slots__ = ('condition', 'body')
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
+        self.span = None
 
 # loop DO ... WHILE
 class DoWhileStatement(Node):
+    __slots__ = ('body', 'condition')
     def __init__(self, body, condition):
         self.body = body
         self.condition = condition
+        self.span = None
 
 # chamada de função
 class FunctionCall(Node):
+    __slots__ = ('name', 'args')
     def __init__(self, name, args):
         self.name = name
         self.args = args
+        self.span = None
 
 # retorno de função
 class ReturnStatement(Node):
+    __slots__ = ('value',)
     def __init__(self, value):
         self.value = value
+        self.span = None
 
 # bloco de código
 class CompoundStatement(Node):
+    __slots__ = ('statements',)
     def __init__(self, statements):
         self.statements = statements
+        self.span = None
 
 # identificador
 class Identifier(Node):
-    def __init__(self, name):
+    __slots__ = ('name', 'symbol')
+    def __init__(self, name, symbol=None):
         self.name = name
+        self.symbol = symbol
+        self.span = None
 
 # constante
 class Constant(Node):
+    __slots__ = ('value', 'const_type')
     def __init__(self, value, const_type):
         self.value = value
-        self.const_type = const_type
\ No newline at end of file
+        self.const_type = const_type
+        self.span = None
\ No newline at end of file
@@ -0,0 +1,178 @@
+import operator
+
+from nos import *
+from visitante import Visitor
+
+def _int32(valor):
+    # Reduz o resultado à aritmética de 32 bits com sinal do Assembly gerado.
+    valor &= 0xFFFFFFFF
+    return valor - (1 << 32) if valor & 0x80000000 else valor
+
+def _divisao(a, b):
+    # Divisão inteira do C (trunca em direção a zero), como o 'idiv'.
+    quociente = abs(a) // abs(b)
+    return quociente if (a < 0) == (b < 0) else -quociente
+
+ARITMETICOS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': _divisao}
+COMPARACOES = {'<': operator.lt, '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+               '==': operator.eq, '!=': operator.ne}
+
+def valor_constante(node):
+    # Retorna o valor inteiro de uma constante 'int' ou 'bool', ou None se o nó não for uma.
+    if type(node) is Constant and node.const_type != 'string':
+        try:
+            return int(node.value)
+        except ValueError:
+            return None
+    return None
+
+class ConstantFolder(Visitor):
+    """
+    Passo de otimização entre a análise semântica e a geração de código.
+
+    - Dobra operações aritméticas e comparações entre constantes ('2 * 3' vira '6').
+    - Simplifica identidades algébricas: 'x + 0', 'x - 0', 'x * 1', 'x / 1', 'x * 0'
+      e reagrupa constantes em cadeias como 'x + 1 + 2'.
+    - Remove desvios com condição constante: o 'if' é substituído pelo ramo escolhido,
+      'while' e 'for' com condição falsa são eliminados e o 'do-while' vira o corpo.
+
+    As expressões da linguagem não têm efeitos colaterais, então descartar um operando
+    (como em 'x * 0') não altera o comportamento do programa. Cada método retorna o nó
+    que substitui o visitado, ou None quando a instrução é removida.
+    """
+    def __init__(self):
+        self.folded = 0
+        self.simplified = 0
+        self.pruned = 0
+
+    def optimize(self, ast_root):
+        return self.traverse(ast_root)
+
+    def generic_visit(self, node):
+        # Nós sem subexpressões a otimizar (identificadores, constantes, chamadas).
+        return node
+
+    def fold(self, node, valor, const_type):
+        self.folded += 1
+        folded = Constant(str(_int32(valor)) if const_type == 'int' else str(int(valor)), const_type)
+        folded.span = node.span
+        return folded
+
+    def visit_list(self, node_list):
+        result = []
+        for node in node_list:
+            result.append((yield self.visit(node)))
+        return result
+
+    def visit_FunctionDefinition(self, node):
+        node.body = yield self.visit(node.body)
+        return node
+
+    def visit_CompoundStatement(self, node):
+        statements = []
+        for statement in node.statements:
+            statement = yield self.visit(statement)
+            if statement is not None:
+                statements.append(statement)
+        node.statements = statements
+        return node
+
+    def visit_Declaration(self, node):
+        if node.initial_value:
+            node.initial_value = yield self.visit(node.initial_value)
+        return node
+
+    def visit_Assignment(self, node):
+        node.rhs = yield self.visit(node.rhs)
+        return node
+
+    def visit_ReturnStatement(self, node):
+        if node.value:
+            node.value = yield self.visit(node.value)
+        return node
+
+    def visit_BinaryOperation(self, node):
+        left = node.left = yield self.visit(node.left)
+        right = node.right = yield self.visit(node.right)
+        op = node.op
+        a = valor_constante(left)
+        b = valor_constante(right)
+
+        if a is not None and b is not None:
+            if op in COMPARACOES:
+                return self.fold(node, COMPARACOES[op](a, b), 'bool')
+            if op in ARITMETICOS and not (op == '/' and b == 0):
+                return self.fold(node, ARITMETICOS[op](a, b), 'int')
+            return node
+
+        if op not in ARITMETICOS:
+            return node
+        if (b == 0 and op in '+-') or (b == 1 and op in '*/'):
+            self.simplified += 1
+            return left
+        if (a == 0 and op == '+') or (a == 1 and op == '*'):
+            self.simplified += 1
+            return right
+        if op == '*' and (a == 0 or b == 0):
+            self.simplified += 1
+            return self.fold(node, 0, 'int')
+
+        # (x + c1) + c2  ->  x + (c1 + c2), incluindo as combinações com '-'.
+        if b is not None and op in '+-' and type(left) is BinaryOperation and left.op in '+-':
+            c = valor_constante(left.right)
+            if c is not None:
+                self.simplified += 1
+                total = _int32((c if left.op == '+' else -c) + (b if op == '+' else -b))
+                if total == 0:
+                    return left.left
+                node.left = left.left
+                node.op = '+'
+                node.right = Constant(str(total), 'int')
+        return node
+
+    def visit_IfStatement(self, node):
+        node.condition = yield self.visit(node.condition)
+        valor = valor_constante(node.condition)
+        if valor is None:
+            node.true_body = yield self.visit(node.true_body)
+            if node.false_body:
+                node.false_body = yield self.visit(node.false_body)
+            return node
+
+        self.pruned += 1
+        branch = node.true_body if valor else node.false_body
+        return (yield self.visit(branch)) if branch else None
+
+    def visit_WhileStatement(self, node):
+        node.condition = yield self.visit(node.condition)
+        if valor_constante(node.condition) == 0:
+            self.pruned += 1
+            return None
+        node.body = yield self.visit(node.body)
+        return node
+
+    def visit_ForStatement(self, node):
+        if node.init:
+            node.init = yield self.visit(node.init)
+        if node.cond:
+            node.cond = yield self.visit(node.cond)
+            if valor_constante(node.cond) == 0:
+                # Só a inicialização é executada; o bloco preserva o escopo da declaração.
+                self.pruned += 1
+                if not node.init:
+                    return None
+                block = CompoundStatement([node.init])
+                block.span = node.span
+                return block
+        if node.incr:
+            node.incr = yield self.visit(node.incr)
+        node.body = yield self.visit(node.body)
+        return node
+
+    def visit_DoWhileStatement(self, node):
+        node.body = yield self.visit(node.body)
+        node.condition = yield self.visit(node.condition)
+        if valor_constante(node.condition) == 0:
+            self.pruned += 1
+            return node.body
+        return node
@@ -0,0 +1,149 @@
+from nos import *
+from visitante import Visitor
+
+def _leituras(expressao):
+    # Nomes das variáveis lidas por uma expressão (percurso com pilha explícita).
+    nomes = set()
+    pendentes = [expressao]
+    while pendentes:
+        node = pendentes.pop()
+        kind = type(node)
+        if kind is Identifier:
+            nomes.add(node.name)
+        elif kind is BinaryOperation:
+            pendentes.append(node.left)
+            pendentes.append(node.right)
+        elif kind is UnaryOperation:
+            pendentes.append(node.operand)
+        elif kind is FunctionCall:
+            pendentes.extend(node.args)
+    return nomes
+
+class DeadCodeEliminator(Visitor):
+    """
+    Remove código que não altera o resultado do programa, a partir do que a análise
+    semântica registrou em 'dead_stores' (ver SymbolTable.pop_scope):
+
+    - Declarações e atribuições de variáveis que nunca são lidas. Sem a declaração, a
+      variável não ocupa espaço na pilha nem registrador.
+    - Instruções de um bloco depois de um 'return', ou de um 'if' cujos dois ramos
+      retornam.
+    - Atribuições sobrescritas por outra atribuição à mesma variável no mesmo bloco sem
+      leitura entre as duas (e inicializações sobrescritas dessa forma).
+
+    As expressões da linguagem não têm efeitos colaterais, então descartar uma atribuição
+    não descarta nenhum outro efeito. Os nós são comparados por identidade, por isso o
+    passo roda antes dos que copiam a árvore (desenrolamento de laços).
+    """
+    def __init__(self, dead_stores=()):
+        self.dead_stores = dead_stores
+        # Nós que sempre terminam com 'return'.
+        self.returns = set()
+        self.declarations = 0
+        self.stores = 0
+        self.unreachable = 0
+
+    def optimize(self, ast_root):
+        return self.traverse(ast_root)
+
+    def generic_visit(self, node):
+        return node
+
+    def visit_list(self, node_list):
+        result = []
+        for node in node_list:
+            result.append((yield self.visit(node)))
+        return result
+
+    def visit_FunctionDefinition(self, node):
+        node.body = yield self.visit(node.body)
+        return node
+
+    def visit_CompoundStatement(self, node):
+        statements = []
+        for index, statement in enumerate(node.statements):
+            statement = yield self.visit(statement)
+            if statement is None:
+                continue
+            statements.append(statement)
+            if statement in self.returns:
+                self.unreachable += len(node.statements) - index - 1
+                self.returns.add(node)
+                break
+        node.statements = self.overwritten(statements)
+        return node
+
+    def overwritten(self, statements):
+        # Percorre o bloco de trás para frente guardando as variáveis que serão
+        # sobrescritas antes de qualquer leitura. Instruções com blocos internos
+        # interrompem a análise, que é apenas local.
+        sobrescritas = set()
+        kept = []
+        for statement in reversed(statements):
+            kind = type(statement)
+            if kind is Assignment:
+                name = statement.lhs.name
+                if name in sobrescritas:
+                    self.stores += 1
+                    continue
+                sobrescritas.add(name)
+                sobrescritas -= _leituras(statement.rhs)
+            elif kind is Declaration:
+                if statement.initial_value is not None:
+                    if statement.name in sobrescritas:
+                        self.stores += 1
+                        statement.initial_value = None
+                    else:
+                        sobrescritas -= _leituras(statement.initial_value)
+                # Antes da declaração o nome se refere a uma variável de fora do bloco.
+                sobrescritas.discard(statement.name)
+            elif kind is FunctionCall:
+                sobrescritas -= _leituras(statement)
+            else:
+                sobrescritas.clear()
+            kept.append(statement)
+        kept.reverse()
+        return kept
+
+    def visit_Declaration(self, node):
+        if node in self.dead_stores:
+            self.declarations += 1
+            return None
+        return node
+
+    def visit_Assignment(self, node):
+        if node in self.dead_stores:
+            self.stores += 1
+            return None
+        return node
+
+    def visit_ReturnStatement(self, node):
+        self.returns.add(node)
+        return node
+
+    def visit_IfStatement(self, node):
+        node.true_body = yield self.visit(node.true_body)
+        if node.false_body:
+            node.false_body = yield self.visit(node.false_body)
+            if node.true_body in self.returns and node.false_body in self.returns:
+                self.returns.add(node)
+        return node
+
+    def visit_ForStatement(self, node):
+        if node.init:
+            node.init = yield self.visit(node.init)
+        if node.incr:
+            node.incr = yield self.visit(node.incr)
+        node.body = yield self.visit(node.body)
+        return node
+
+    def visit_WhileStatement(self, node):
+        node.body = yield self.visit(node.body)
+        return node
+
+    def visit_DoWhileStatement(self, node):
+        node.body = yield self.visit(node.body)
+        # O corpo de um do-while sempre é executado ao menos uma vez.
+        if node.body in self.returns:
+            self.returns.add(node)
+        return node
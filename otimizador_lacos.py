@@ -0,0 +1,477 @@
+import copy
+from bisect import bisect_left
+
+from nos import *
+from visitante import Visitor
+from semantico import Symbol
+from otimizador import COMPARACOES, valor_constante, _int32
+
+# Nível atribuído às expressões que nunca saem do lugar: comparações (que só aparecem
+# em condições) e divisões que podem falhar (divisor zero, variável ou -1).
+FIXED = 1 << 30
+
+def _divisao_segura(node):
+    divisor = valor_constante(node.right)
+    return divisor is not None and divisor not in (0, -1)
+
+def _escritas(node):
+    # Variável (Symbol) escrita por um comando (atribuição, declaração ou x++/x--), ou None.
+    kind = type(node)
+    if kind is Assignment:
+        return node.lhs.symbol
+    if kind is Declaration:
+        return node.symbol
+    if kind is UnaryOperation:
+        return node.operand.symbol
+    return None
+
+def _filhos(node):
+    # Nós filhos de qualquer nó da AST, a partir dos campos declarados em __slots__.
+    for field in type(node).__slots__:
+        value = getattr(node, field)
+        if isinstance(value, Node):
+            yield field, value
+        elif type(value) is list:
+            for item in value:
+                if isinstance(item, Node):
+                    yield field, item
+
+def _subarvore(node, limite):
+    # Lista os nós da subárvore, ou None se ela tiver mais de 'limite' nós.
+    nodes = []
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        nodes.append(node)
+        if len(nodes) > limite:
+            return None
+        pending.extend(child for _, child in _filhos(node))
+    return nodes
+
+def _inducao(node):
+    # 'i = i + c', 'i = i - c' ou 'i = c + i' no incremento do for: retorna (i, passo).
+    incr = node.incr
+    if type(incr) is not Assignment or type(incr.rhs) is not BinaryOperation:
+        return None
+    symbol, rhs = incr.lhs.symbol, incr.rhs
+    if rhs.op in '+-' and type(rhs.left) is Identifier and rhs.left.symbol is symbol:
+        step = valor_constante(rhs.right)
+        if step is not None:
+            return symbol, step if rhs.op == '+' else -step
+    if rhs.op == '+' and type(rhs.right) is Identifier and rhs.right.symbol is symbol:
+        step = valor_constante(rhs.left)
+        if step is not None:
+            return symbol, step
+    return None
+
+class LoopInfo:
+    __slots__ = ('start', 'end', 'depth', 'induction', 'step', 'reductions', 'hoisted')
+    def __init__(self, start):
+        self.start = start
+        self.end = start
+        self.depth = 0
+        self.induction = None
+        self.step = 0
+        self.reductions = {}
+        self.hoisted = []
+
+class LoopAnalysis(Visitor):
+    """
+    Numera os comandos na ordem da travessia e registra, para cada variável (Symbol), as posições
+    em que ele é escrito (atribuído ou declarado) e, para cada laço, o intervalo de
+    posições que ele cobre, incluindo a inicialização do for. Um laço altera 'x' se
+    alguma escrita de 'x' cai no seu intervalo; a consulta é uma busca binária.
+    """
+    def __init__(self):
+        self.position = 0
+        self.writes = {}
+        self.loops = {}
+
+    def analyze(self, ast_root):
+        self.traverse(ast_root)
+        return self
+
+    def writes_in(self, symbol, info):
+        positions = self.writes.get(symbol, ())
+        return bisect_left(positions, info.end) - bisect_left(positions, info.start)
+
+    def generic_visit(self, node):
+        symbol = _escritas(node)
+        if symbol is not None:
+            self.writes.setdefault(symbol, []).append(self.position)
+            self.position += 1
+
+    def visit_list(self, node_list):
+        for node in node_list:
+            yield self.visit(node)
+
+    def visit_FunctionDefinition(self, node):
+        yield self.visit(node.body)
+
+    def visit_CompoundStatement(self, node):
+        for statement in node.statements:
+            yield self.visit(statement)
+
+    def visit_IfStatement(self, node):
+        yield self.visit(node.true_body)
+        if node.false_body:
+            yield self.visit(node.false_body)
+
+    def loop(self, node, *parts):
+        info = self.loops[node] = LoopInfo(self.position)
+        for part in parts:
+            if part:
+                yield self.visit(part)
+        info.end = self.position
+        return info
+
+    def visit_WhileStatement(self, node):
+        yield self.loop(node, node.body)
+
+    def visit_DoWhileStatement(self, node):
+        yield self.loop(node, node.body)
+
+    def visit_ForStatement(self, node):
+        info = yield self.loop(node, node.init, node.incr, node.body)
+        induction = _inducao(node)
+        if induction is not None:
+            # A variável de indução só pode ser escrita pelo incremento e pela inicialização.
+            symbol, step = induction
+            if self.writes_in(symbol, info) == 1 + (_escritas(node.init) is symbol if node.init else 0):
+                info.induction, info.step = symbol, step
+
+class LoopOptimizer(Visitor):
+    """
+    Otimizações de laços sobre a AST (nível -O2), depois do dobramento de constantes.
+
+    - Movimentação de código invariante: uma subexpressão cujas variáveis não são
+      escritas dentro de um laço é calculada uma única vez antes dele, em uma variável
+      '$invN' declarada em um bloco que envolve o laço. Cada subexpressão sobe até o
+      laço mais externo em relação ao qual é invariante; o nível de cada nó é o número
+      de laços (de fora para dentro) que escrevem alguma das suas variáveis.
+    - Redução de força: em 'for' com variável de indução 'i' (escrita só por
+      'i = i + c'), 'i * k' com k constante vira uma variável '$srN', iniciada com
+      'i * k' antes do laço e somada de 'c * k' ao fim de cada iteração.
+
+    Os nomes criados começam com '$', que não pode aparecer no código-fonte, e as
+    declarações e identificadores criados já vêm anotados com o seu Symbol. Divisões
+    só são movidas quando o divisor é uma constante diferente de 0 e -1, para que o
+    laço não passe a falhar em uma iteração que nunca executaria.
+    """
+    def __init__(self):
+        self.hoisted = 0
+        self.reduced = 0
+        self.analysis = None
+        self.chain = []
+        self.inductions = {}
+        self.level = {}
+        self.temp_counter = 0
+
+    def optimize(self, ast_root):
+        self.analysis = LoopAnalysis().analyze(ast_root)
+        return self.traverse(ast_root)
+
+    def new_symbol(self, prefix):
+        symbol = Symbol(f"${prefix}{self.temp_counter}", 'int')
+        self.temp_counter += 1
+        return symbol
+
+    def generic_visit(self, node):
+        return node
+
+    def visit_list(self, node_list):
+        result = []
+        for node in node_list:
+            result.append((yield self.visit(node)))
+        return result
+
+    def visit_FunctionDefinition(self, node):
+        node.body = yield self.visit(node.body)
+        return node
+
+    def visit_CompoundStatement(self, node):
+        statements = []
+        for statement in node.statements:
+            statements.append((yield self.visit(statement)))
+        node.statements = statements
+        return node
+
+    def visit_Declaration(self, node):
+        if node.initial_value:
+            node.initial_value = yield self.expression(node.initial_value)
+        return node
+
+    def visit_Assignment(self, node):
+        node.rhs = yield self.expression(node.rhs)
+        return node
+
+    def visit_ReturnStatement(self, node):
+        if node.value:
+            node.value = yield self.expression(node.value)
+        return node
+
+    def visit_IfStatement(self, node):
+        node.condition = yield self.expression(node.condition)
+        node.true_body = yield self.visit(node.true_body)
+        if node.false_body:
+            node.false_body = yield self.visit(node.false_body)
+        return node
+
+    def visit_WhileStatement(self, node):
+        info = self.enter(node)
+        node.condition = yield self.expression(node.condition)
+        node.body = yield self.visit(node.body)
+        self.leave(info)
+        return self.place(node, info)
+
+    def visit_DoWhileStatement(self, node):
+        info = self.enter(node)
+        node.body = yield self.visit(node.body)
+        node.condition = yield self.expression(node.condition)
+        self.leave(info)
+        return self.place(node, info)
+
+    def visit_ForStatement(self, node):
+        # A inicialização executa uma única vez, fora do laço.
+        if node.init:
+            node.init = yield self.visit(node.init)
+        info = self.enter(node)
+        if node.cond:
+            node.cond = yield self.expression(node.cond)
+        if node.incr:
+            node.incr = yield self.visit(node.incr)
+        node.body = yield self.visit(node.body)
+        self.leave(info)
+        return self.place(node, info)
+
+    def enter(self, node):
+        info = self.analysis.loops[node]
+        self.chain.append(info)
+        info.depth = len(self.chain)
+        if info.induction is not None:
+            self.inductions.setdefault(info.induction, []).append(info)
+        return info
+
+    def leave(self, info):
+        self.chain.pop()
+        if info.induction is not None:
+            self.inductions[info.induction].pop()
+
+    def place(self, node, info):
+        # Envolve o laço em um bloco com as declarações criadas para ele.
+        statements = info.hoisted
+        if info.reductions:
+            if node.init:
+                statements.append(node.init)
+                node.init = None
+            induction = info.induction
+            for factor, symbol in info.reductions.items():
+                start = BinaryOperation('*', Identifier(induction.name, induction), Constant(str(factor), 'int'))
+                statements.append(Declaration('int', symbol.name, start, symbol))
+                step = Constant(str(_int32(info.step * factor)), 'int')
+                increment = BinaryOperation('+', Identifier(symbol.name, symbol), step)
+                node.body.statements.append(Assignment(Identifier(symbol.name, symbol), increment))
+        if not statements:
+            return node
+        statements.append(node)
+        block = CompoundStatement(statements)
+        block.span = node.span
+        return block
+
+    def expression(self, node):
+        # Só as expressões dentro de algum laço são analisadas.
+        if not self.chain:
+            return node
+        node = yield self.levels(node)
+        node = yield self.hoist(node, len(self.chain))
+        return node
+
+    def variant_depth(self, symbol):
+        # Quantos laços da cadeia atual (de fora para dentro) escrevem a variável. Se um laço
+        # a escreve, todos os que o envolvem também escrevem: busca binária.
+        chain = self.chain
+        writes_in = self.analysis.writes_in
+        low, high = 0, len(chain)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if writes_in(symbol, chain[middle - 1]):
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def levels(self, node):
+        # Calcula o nível de cada nó da expressão (de baixo para cima), aplicando a
+        # redução de força nas multiplicações pela variável de indução.
+        kind = type(node)
+        if kind is Identifier:
+            self.level[node] = self.variant_depth(node.symbol)
+            return node
+        if kind is not BinaryOperation:
+            self.level[node] = 0
+            return node
+        node.left = yield self.levels(node.left)
+        node.right = yield self.levels(node.right)
+        if node.op == '*':
+            reduced = self.reduce(node)
+            if reduced is not None:
+                return reduced
+        if node.op in COMPARACOES or node.op == '/' and not _divisao_segura(node):
+            self.level[node] = FIXED
+        else:
+            self.level[node] = max(self.level[node.left], self.level[node.right])
+        return node
+
+    def reduce(self, node):
+        for variable, factor in ((node.left, node.right), (node.right, node.left)):
+            if type(variable) is Identifier and self.inductions.get(variable.symbol) and type(factor) is Constant:
+                info = self.inductions[variable.symbol][-1]
+                key = int(factor.value)
+                if key not in info.reductions:
+                    info.reductions[key] = self.new_symbol('sr')
+                self.reduced += 1
+                symbol = info.reductions[key]
+                reduced = Identifier(symbol.name, symbol)
+                self.level[reduced] = info.depth
+                return reduced
+        return None
+
+    def hoist(self, node, depth):
+        # Move para fora dos laços as maiores subexpressões invariantes (de cima para
+        # baixo). Dentro de uma expressão movida, as partes com nível ainda menor
+        # sobem mais.
+        if type(node) is not BinaryOperation:
+            return node
+        level = self.level[node]
+        if level < depth:
+            node.left = yield self.hoist(node.left, level)
+            node.right = yield self.hoist(node.right, level)
+            symbol = self.new_symbol('inv')
+            self.chain[level].hoisted.append(Declaration('int', symbol.name, node, symbol))
+            self.hoisted += 1
+            return Identifier(symbol.name, symbol)
+        node.left = yield self.hoist(node.left, depth)
+        node.right = yield self.hoist(node.right, depth)
+        return node
+
+class LoopUnroller(Visitor):
+    """
+    Desenrola completamente laços 'for' pequenos com número constante de iterações
+    (nível -O3): inicialização 'i = a' com constante, condição comparando 'i' com uma
+    constante e incremento 'i = i + c', com 'i' escrito apenas pelo incremento. Cada
+    iteração vira uma cópia do corpo com 'i' substituído pelo seu valor; o dobramento
+    de constantes executado em seguida simplifica as cópias.
+    """
+    MAX_TRIPS = 8
+    MAX_NODES = 256
+
+    def __init__(self):
+        self.unrolled = 0
+
+    def optimize(self, ast_root):
+        return self.traverse(ast_root)
+
+    def generic_visit(self, node):
+        return node
+
+    def visit_list(self, node_list):
+        result = []
+        for node in node_list:
+            result.append((yield self.visit(node)))
+        return result
+
+    def visit_FunctionDefinition(self, node):
+        node.body = yield self.visit(node.body)
+        return node
+
+    def visit_CompoundStatement(self, node):
+        statements = []
+        for statement in node.statements:
+            statements.append((yield self.visit(statement)))
+        node.statements = statements
+        return node
+
+    def visit_IfStatement(self, node):
+        node.true_body = yield self.visit(node.true_body)
+        if node.false_body:
+            node.false_body = yield self.visit(node.false_body)
+        return node
+
+    def visit_WhileStatement(self, node):
+        node.body = yield self.visit(node.body)
+        return node
+
+    def visit_DoWhileStatement(self, node):
+        node.body = yield self.visit(node.body)
+        return node
+
+    def visit_ForStatement(self, node):
+        node.body = yield self.visit(node.body)
+        values = self.trip_values(node)
+        if values is None:
+            return node
+        symbol, values, final = values
+        self.unrolled += 1
+        statements = []
+        for value in values:
+            body = copy.deepcopy(node.body)
+            self.substitute(body, symbol, value)
+            statements.append(body)
+        if type(node.init) is Assignment:
+            # A variável existe depois do laço e termina com o valor final.
+            statements.append(Assignment(Identifier(symbol.name, symbol), Constant(str(final), 'int')))
+        block = CompoundStatement(statements)
+        block.span = node.span
+        return block
+
+    def trip_values(self, node):
+        # Valores de 'i' em cada iteração e o valor final, ou None se o laço não se encaixa.
+        induction = _inducao(node)
+        if induction is None or node.cond is None or type(node.cond) is not BinaryOperation:
+            return None
+        symbol, step = induction
+        init = node.init
+        if type(init) is Assignment and init.lhs.symbol is symbol:
+            start = valor_constante(init.rhs)
+        elif type(init) is Declaration and init.symbol is symbol and init.initial_value is not None:
+            start = valor_constante(init.initial_value)
+        else:
+            return None
+        cond = node.cond
+        if cond.op not in COMPARACOES or start is None:
+            return None
+        if type(cond.left) is Identifier and cond.left.symbol is symbol:
+            limit, compare = valor_constante(cond.right), COMPARACOES[cond.op]
+        elif type(cond.right) is Identifier and cond.right.symbol is symbol:
+            limit, compare = valor_constante(cond.left), lambda a, b, op=COMPARACOES[cond.op]: op(b, a)
+        else:
+            return None
+        if limit is None:
+            return None
+
+        body = _subarvore(node.body, self.MAX_NODES)
+        if body is None or any(_escritas(item) is symbol for item in body):
+            return None
+        values = []
+        value = start
+        while compare(value, limit):
+            values.append(value)
+            if len(values) > self.MAX_TRIPS or len(values) * len(body) > self.MAX_NODES:
+                return None
+            value = _int32(value + step)
+        return symbol, values, value
+
+    def substitute(self, body, symbol, value):
+        # Troca as leituras da variável pela constante (o corpo não a escreve; uma variável
+        # de mesmo nome declarada no corpo é outro símbolo e fica intacta).
+        pending = [body]
+        while pending:
+            node = pending.pop()
+            for field in type(node).__slots__:
+                child = getattr(node, field)
+                if type(child) is Identifier and child.symbol is symbol:
+                    setattr(node, field, Constant(str(value), 'int'))
+                elif type(child) is list:
+                    pending.extend(item for item in child if isinstance(item, Node))
+                elif isinstance(child, Node):
+                    pending.append(child)
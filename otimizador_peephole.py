@@ -0,0 +1,422 @@
+import re
+from collections import Counter
+
+# Registradores de 32 bits e as partes de 8 bits usadas pelo gerador (setcc/movzx).
+REGISTERS = {'eax', 'ebx', 'ecx', 'edx', 'esi', 'edi', 'ebp', 'esp'}
+SUBREGISTERS = {'al': 'eax', 'bl': 'ebx', 'cl': 'ecx', 'dl': 'edx'}
+# Registradores de rascunho do gerador: não guardam valores entre instruções, salvo
+# quando uma instrução seguinte os lê.
+SCRATCH = ('eax', 'ecx', 'edx')
+
+CONDITIONS = {'l': 'ge', 'ge': 'l', 'g': 'le', 'le': 'g', 'e': 'ne', 'ne': 'e'}
+ARITHMETIC = {'add', 'sub', 'imul', 'and', 'or', 'xor', 'shl', 'sar'}
+
+_WORD = re.compile(r'[a-z]+')
+
+class Line:
+    """
+    Uma linha do Assembly: instrução (op e operandos), rótulo ou diretiva. Linhas
+    lidas do texto guardam a forma original, para serem emitidas sem alteração.
+    """
+    __slots__ = ('op', 'operands', 'label', 'text')
+    def __init__(self, op=None, operands=(), label=None, text=None):
+        self.op = op
+        self.operands = tuple(operands)
+        self.label = label
+        if text is None:
+            if label is not None:
+                text = f"{label}:"
+            else:
+                text = f"  {op} {', '.join(operands)}" if operands else f"  {op}"
+        self.text = text
+
+    @classmethod
+    def parse(cls, text):
+        code = text.split(';', 1)[0].strip()
+        if not code or code.startswith(('section', 'global', 'extern')) or ' db ' in code:
+            return cls(text=text)
+        if code.endswith(':') and ' ' not in code:
+            return cls(label=code[:-1], text=text)
+        op, _, rest = code.partition(' ')
+        return cls(op, split_operands(rest), text=text)
+
+    @property
+    def is_instruction(self):
+        return self.op is not None
+
+    @property
+    def is_jump(self):
+        return self.op is not None and self.op[0] == 'j'
+
+    def __repr__(self):
+        return self.text.strip()
+
+def split_operands(rest):
+    # Separa os operandos pelas vírgulas fora de colchetes.
+    operands, depth, current = [], 0, ''
+    for char in rest:
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        if char == ',' and depth == 0:
+            operands.append(current.strip())
+            current = ''
+        else:
+            current += char
+    if current.strip():
+        operands.append(current.strip())
+    return operands
+
+def is_register(operand):
+    return operand in REGISTERS
+
+def is_memory(operand):
+    return '[' in operand
+
+def is_immediate(operand):
+    return operand[:1].isdigit() or operand[:1] == '-'
+
+def registers_in(operand):
+    found = set()
+    for word in _WORD.findall(operand):
+        if word in REGISTERS:
+            found.add(word)
+        elif word in SUBREGISTERS:
+            found.add(SUBREGISTERS[word])
+    return found
+
+def effects(line):
+    """
+    Registradores lidos e registradores totalmente sobrescritos pela instrução.
+    Instruções desconhecidas são tratadas como se lessem todos os registradores.
+    """
+    op, operands = line.op, line.operands
+    if op in ('mov', 'movzx', 'lea'):
+        dest, src = operands
+        reads = registers_in(src) | (registers_in(dest) if is_memory(dest) else set())
+        return reads, {dest} if is_register(dest) else set()
+    if op in ARITHMETIC or op in ('cmp', 'test'):
+        if op == 'xor' and operands[0] == operands[1] and is_register(operands[0]):
+            return set(), {operands[0]}
+        reads = set()
+        for operand in operands:
+            reads |= registers_in(operand)
+        if op in ('cmp', 'test') or not is_register(operands[0]):
+            return reads, set()
+        if op == 'imul' and len(operands) == 3:
+            reads.discard(operands[0])
+            reads |= registers_in(operands[1]) | registers_in(operands[2])
+        return reads, {operands[0]}
+    if op.startswith('set'):
+        # Escrita parcial (al): o restante do registrador continua vivo.
+        return registers_in(operands[0]), set()
+    if op in ('neg', 'inc', 'dec'):
+        return registers_in(operands[0]), set()
+    if op == 'push':
+        return registers_in(operands[0]) | {'esp'}, set()
+    if op == 'pop':
+        return {'esp'}, {operands[0]} if is_register(operands[0]) else set()
+    if op == 'cdq':
+        return {'eax'}, {'edx'}
+    if op == 'idiv':
+        return {'eax', 'edx'} | registers_in(operands[0]), set()
+    if op == 'call':
+        # cdecl: eax, ecx e edx não são preservados pela função chamada.
+        return {'esp'}, {'eax', 'ecx', 'edx'}
+    if op == 'ret':
+        return {'eax', 'esp', 'ebp', 'ebx', 'esi', 'edi'}, set()
+    if op[0] == 'j':
+        return set(), set()
+    return set(REGISTERS), set()
+
+class PeepholeOptimizer:
+    """
+    Otimizador peephole sobre o Assembly gerado. O texto é convertido em linhas
+    estruturadas (instruções com operandos, rótulos e diretivas) e as regras de
+    PATTERNS são aplicadas em uma janela que começa em cada posição. As passadas se
+    repetem até que nenhuma regra se aplique (ponto fixo).
+
+    Regras que removem uma escrita em um registrador de rascunho só se aplicam quando
+    'dead_after' prova, seguindo os desvios, que o valor não é lido depois.
+    'rewrites' conta quantas vezes cada regra foi aplicada.
+    """
+    # Número máximo de instruções examinadas por 'dead_after' antes de desistir.
+    LOOKAHEAD = 64
+
+    def __init__(self):
+        self.rewrites = Counter()
+        self.lines = []
+        self.labels = {}
+        self.references = Counter()
+
+    def optimize(self, assembly):
+        self.lines = [Line.parse(text) for text in assembly.split("\n")]
+        changed = True
+        while changed:
+            changed = self.run_pass()
+        return "\n".join(line.text for line in self.lines)
+
+    def run_pass(self):
+        self.index_labels()
+        lines = self.lines
+        result = []
+        changed = False
+        i = 0
+        while i < len(lines):
+            for name, pattern in patterns_for(lines[i].op):
+                match = pattern(self, lines, i)
+                if match is not None:
+                    consumed, replacement = match
+                    self.rewrites[name] += 1
+                    result.extend(replacement)
+                    i += consumed
+                    changed = True
+                    break
+            else:
+                result.append(lines[i])
+                i += 1
+        self.lines = result
+        return changed
+
+    def index_labels(self):
+        self.labels = {}
+        self.references = Counter()
+        for index, line in enumerate(self.lines):
+            if line.label is not None:
+                self.labels[line.label] = index
+            elif line.is_jump:
+                self.references[line.operands[0]] += 1
+
+    def next_instruction(self, index):
+        # Posição da primeira instrução a partir de 'index', pulando rótulos.
+        lines = self.lines
+        while index < len(lines) and lines[index].label is not None:
+            index += 1
+        if index < len(lines) and lines[index].is_instruction:
+            return index
+        return None
+
+    def dead_after(self, index, register):
+        """Indica se 'register' não é lido antes de ser sobrescrito, após a linha 'index'."""
+        lines = self.lines
+        pending = [index + 1]
+        visited = set()
+        budget = self.LOOKAHEAD
+        while pending:
+            position = pending.pop()
+            while True:
+                if position in visited:
+                    break
+                if position >= len(lines) or budget == 0:
+                    return False
+                visited.add(position)
+                budget -= 1
+                line = lines[position]
+                if line.label is not None:
+                    position += 1
+                    continue
+                if not line.is_instruction:
+                    return False
+                reads, writes = effects(line)
+                if register in reads:
+                    return False
+                if register in writes or line.op == 'ret':
+                    break
+                if line.is_jump:
+                    target = self.labels.get(line.operands[0])
+                    if target is None:
+                        return False
+                    if line.op == 'jmp':
+                        position = target
+                        continue
+                    pending.append(target)
+                position += 1
+        return True
+
+# Cada regra recebe (otimizador, linhas, posição) e retorna (linhas consumidas,
+# linhas que as substituem) ou None quando não se aplica.
+
+def _instructions(lines, i, count):
+    window = lines[i:i + count]
+    if len(window) < count:
+        return None
+    for line in window:
+        if line.op is None:
+            return None
+    return window
+
+def redundant_move(optimizer, lines, i):
+    # mov A, A
+    line = lines[i]
+    if line.op == 'mov' and line.operands[0] == line.operands[1]:
+        return 1, []
+    return None
+
+def reload_after_store(optimizer, lines, i):
+    # mov A, B / mov B, A: o segundo mov não altera nada.
+    window = _instructions(lines, i, 2)
+    if window and window[0].op == window[1].op == 'mov':
+        (a, b), (c, d) = window[0].operands, window[1].operands
+        if a == d and b == c and not (is_memory(a) and is_memory(b)) and not registers_in(a) & registers_in(b):
+            return 2, [window[0]]
+    return None
+
+def push_pop(optimizer, lines, i):
+    # push A / pop B  ->  mov B, A
+    window = _instructions(lines, i, 2)
+    if window and window[0].op == 'push' and window[1].op == 'pop':
+        source, dest = window[0].operands[0], window[1].operands[0]
+        if source == dest:
+            return 2, []
+        if is_register(dest) and not (source.startswith('dword') and 'esp' in source):
+            return 2, [Line('mov', [dest, source.replace('dword ', '')])]
+    return None
+
+def branch_on_comparison(optimizer, lines, i):
+    # cmp X, Y / setcc al / movzx eax, al / cmp eax, 0 / je L  ->  cmp X, Y / j(!cc) L
+    window = _instructions(lines, i, 5)
+    if not window:
+        return None
+    compare, setcc, extend, test, jump = window
+    if (compare.op == 'cmp' and setcc.op.startswith('set') and setcc.op[3:] in CONDITIONS
+            and setcc.operands == ('al',) and extend.op == 'movzx' and extend.operands == ('eax', 'al')
+            and test.op == 'cmp' and test.operands == ('eax', '0') and jump.op in ('je', 'jne')
+            and optimizer.dead_after(i + 4, 'eax')):
+        condition = setcc.op[3:]
+        condition = CONDITIONS[condition] if jump.op == 'je' else condition
+        return 5, [compare, Line(f"j{condition}", jump.operands)]
+    return None
+
+def jump_to_next(optimizer, lines, i):
+    # jmp L / L:  (também para desvios condicionais)
+    line = lines[i]
+    if line.is_jump:
+        position = i + 1
+        while position < len(lines) and lines[position].label is not None:
+            if lines[position].label == line.operands[0]:
+                return 1, []
+            position += 1
+    return None
+
+def jump_over_jump(optimizer, lines, i):
+    # jcc L1 / jmp L2 / L1:  ->  j(!cc) L2 / L1:
+    if i + 2 < len(lines):
+        first, second, label = lines[i], lines[i + 1], lines[i + 2]
+        if (first.is_jump and first.op[1:] in CONDITIONS and second.op == 'jmp'
+                and label.label == first.operands[0]):
+            return 2, [Line(f"j{CONDITIONS[first.op[1:]]}", second.operands)]
+    return None
+
+def jump_chain(optimizer, lines, i):
+    # Desvio para um rótulo cuja primeira instrução é 'jmp L2': desvia direto para o
+    # fim da cadeia de saltos (cadeias circulares são deixadas como estão).
+    line = lines[i]
+    if not line.is_jump:
+        return None
+    label = line.operands[0]
+    visited = {label}
+    while True:
+        target = optimizer.labels.get(label)
+        following = optimizer.next_instruction(target) if target is not None else None
+        if following is None or lines[following].op != 'jmp':
+            break
+        label = lines[following].operands[0]
+        if label in visited:
+            return None
+        visited.add(label)
+    if label != line.operands[0]:
+        return 1, [Line(line.op, [label])]
+    return None
+
+def unreachable_code(optimizer, lines, i):
+    # Instruções depois de jmp/ret e antes do próximo rótulo nunca executam.
+    line = lines[i]
+    if line.op in ('jmp', 'ret'):
+        end = i + 1
+        while end < len(lines) and lines[end].is_instruction:
+            end += 1
+        if end > i + 1:
+            return end - i, [line]
+    return None
+
+def unused_label(optimizer, lines, i):
+    # Rótulos locais (.L, .B) que nenhum desvio referencia.
+    line = lines[i]
+    if line.label is not None and line.label.startswith('.') and not optimizer.references[line.label]:
+        return 1, []
+    return None
+
+def neutral_operation(optimizer, lines, i):
+    # add R, 0 / sub R, 0 / imul R, 1, quando as flags não são usadas em seguida.
+    line = lines[i]
+    if (line.op in ('add', 'sub') and len(line.operands) == 2 and line.operands[1] == '0'
+            or line.op == 'imul' and len(line.operands) == 2 and line.operands[1] == '1'):
+        following = lines[i + 1] if i + 1 < len(lines) else None
+        if following is None or not (following.is_jump and following.op != 'jmp' or (following.op or '').startswith('set')):
+            return 1, []
+    return None
+
+def copy_through_scratch(optimizer, lines, i):
+    # mov T, X / mov Y, T  ->  mov Y, X   (T é um registrador de rascunho morto depois)
+    window = _instructions(lines, i, 2)
+    if window and window[0].op == window[1].op == 'mov':
+        (scratch, source), (dest, value) = window[0].operands, window[1].operands
+        if (scratch in SCRATCH and value == scratch and scratch not in registers_in(dest)
+                and not (is_memory(source) and is_memory(dest))
+                and optimizer.dead_after(i + 1, scratch)):
+            if is_memory(dest) and is_immediate(source):
+                dest = f"dword {dest}"
+            return 2, [Line('mov', [dest, source])]
+    return None
+
+def compare_through_scratch(optimizer, lines, i):
+    # mov T, X / cmp T, Y  ->  cmp X, Y   (T é um registrador de rascunho morto depois)
+    window = _instructions(lines, i, 2)
+    if window and window[0].op == 'mov' and window[1].op == 'cmp':
+        scratch, source = window[0].operands
+        left, right = window[1].operands
+        if (scratch in SCRATCH and left == scratch and scratch not in registers_in(right)
+                and not is_immediate(source) and not (is_memory(source) and is_memory(right))
+                and optimizer.dead_after(i + 1, scratch)):
+            if is_memory(source) and is_immediate(right):
+                source = f"dword {source}"
+            return 2, [Line('cmp', [source, right])]
+    return None
+
+def zero_register(optimizer, lines, i):
+    # mov R, 0  ->  xor R, R   (instrução menor; não pode ficar entre um cmp e seu uso)
+    line = lines[i]
+    if line.op == 'mov' and is_register(line.operands[0]) and line.operands[1] == '0':
+        following = lines[i + 1] if i + 1 < len(lines) else None
+        if following is None or not (following.is_jump and following.op != 'jmp' or (following.op or '').startswith('set')):
+            return 1, [Line('xor', [line.operands[0], line.operands[0]])]
+    return None
+
+# (nome, ops da primeira linha da janela, regra). 'j' representa qualquer desvio e
+# None um rótulo; as regras de cada op são separadas uma única vez em 'patterns_for'.
+PATTERNS = [
+    ('mov redundante', ('mov',), redundant_move),
+    ('recarga após armazenamento', ('mov',), reload_after_store),
+    ('push/pop', ('push',), push_pop),
+    ('comparação em desvio', ('cmp',), branch_on_comparison),
+    ('desvio para a próxima linha', ('j',), jump_to_next),
+    ('desvio sobre desvio', ('j',), jump_over_jump),
+    ('desvio encadeado', ('j',), jump_chain),
+    ('código inalcançável', ('jmp', 'ret'), unreachable_code),
+    ('rótulo sem uso', (None,), unused_label),
+    ('operação neutra', ('add', 'sub', 'imul'), neutral_operation),
+    ('cópia via registrador', ('mov',), copy_through_scratch),
+    ('comparação via registrador', ('mov',), compare_through_scratch),
+    ('zerar registrador', ('mov',), zero_register),
+]
+
+_PATTERNS_BY_OP = {}
+
+def patterns_for(op):
+    patterns = _PATTERNS_BY_OP.get(op)
+    if patterns is None:
+        key = 'j' if op is not None and op[0] == 'j' else op
+        patterns = [(name, rule) for name, ops, rule in PATTERNS if op in ops or key in ops]
+        _PATTERNS_BY_OP[op] = patterns
+    return patterns
@@ -0,0 +1,198 @@
+import bisect
+import heapq
+
+from nos import *
+from visitante import Visitor
+
+# Registradores usados pelo gerador de código:
+# - TEMPORARIES guardam os valores intermediários das expressões (numeração de
+#   Sethi-Ullman). São salvos pelo chamador na convenção cdecl, e nenhum valor
+#   temporário está vivo durante uma chamada ao printf.
+# - LOCAL_REGISTERS guardam variáveis locais escolhidas pela varredura linear. São
+#   preservados pelo printf, então as variáveis sobrevivem às chamadas; o gerador os
+#   salva no prólogo da função que os usa.
+TEMPORARIES = ('eax', 'ecx', 'edx')
+LOCAL_REGISTERS = ('esi', 'edi', 'ebx')
+
+# Peso de cada uso de uma variável por nível de aninhamento de laços.
+LOOP_WEIGHT = 10
+
+class LiveIntervals(Visitor):
+    """
+    Calcula o intervalo de vida de cada variável local de uma função, numerando as
+    referências em ordem de execução textual. Uma variável usada dentro de um laço
+    declarado depois dela fica viva até o fim desse laço, pois o valor atravessa a
+    volta do laço. Cada uso soma LOOP_WEIGHT ** profundidade ao peso da variável.
+
+    As referências são resolvidas pelo Symbol anotado pela análise semântica, e os
+    intervalos são dados por símbolo. Cópias de uma declaração feitas pelo
+    desenrolamento de laços compartilham o símbolo e, portanto, o intervalo.
+    """
+    def __init__(self):
+        self.position = 0
+        self.start = {}
+        self.end = {}
+        self.weight = {}
+        # Laços abertos, do mais externo ao mais interno: posições de início (ordenadas)
+        # e as variáveis que ficam vivas até o fim de cada um.
+        self.loop_starts = []
+        self.loop_live = []
+
+    def intervals(self, function):
+        """Retorna [(início, fim, peso, símbolo)] ordenados pelo início."""
+        self.traverse(function.body)
+        return [(self.start[symbol], self.end[symbol], self.weight[symbol], symbol) for symbol in self.start]
+
+    def generic_visit(self, node):
+        # Constantes, chamadas e demais nós sem referências a variáveis locais.
+        return None
+
+    def use(self, symbol):
+        self.position += 1
+        # Um uso antes da declaração (que a análise semântica não deixa passar) abre o intervalo.
+        start = self.start.setdefault(symbol, self.position)
+        self.end[symbol] = self.position
+        self.weight[symbol] = self.weight.get(symbol, 0) + LOOP_WEIGHT ** min(len(self.loop_starts), 6)
+        # O laço mais externo aberto depois da declaração.
+        index = bisect.bisect_right(self.loop_starts, start)
+        if index < len(self.loop_live):
+            self.loop_live[index].add(symbol)
+
+    def loop(self, *parts):
+        self.position += 1
+        self.loop_starts.append(self.position)
+        self.loop_live.append(set())
+        for part in parts:
+            if part:
+                yield self.visit(part)
+        self.loop_starts.pop()
+        live = self.loop_live.pop()
+        self.position += 1
+        for symbol in live:
+            self.end[symbol] = self.position
+
+    def visit_CompoundStatement(self, node):
+        for statement in node.statements:
+            yield self.visit(statement)
+
+    def visit_Declaration(self, node):
+        if node.initial_value:
+            yield self.visit(node.initial_value)
+        self.position += 1
+        symbol = node.symbol
+        self.start.setdefault(symbol, self.position)
+        self.end[symbol] = self.position
+        self.weight[symbol] = self.weight.get(symbol, 0) + LOOP_WEIGHT ** min(len(self.loop_starts), 6)
+
+    def visit_Assignment(self, node):
+        yield self.visit(node.rhs)
+        self.use(node.lhs.symbol)
+
+    def visit_UnaryOperation(self, node):
+        self.use(node.operand.symbol)
+
+    def visit_BinaryOperation(self, node):
+        yield self.visit(node.left)
+        yield self.visit(node.right)
+
+    def visit_Identifier(self, node):
+        self.use(node.symbol)
+
+    def visit_ReturnStatement(self, node):
+        if node.value:
+            yield self.visit(node.value)
+
+    def visit_IfStatement(self, node):
+        yield self.visit(node.condition)
+        yield self.visit(node.true_body)
+        if node.false_body:
+            yield self.visit(node.false_body)
+
+    def visit_WhileStatement(self, node):
+        yield self.loop(node.condition, node.body)
+
+    def visit_DoWhileStatement(self, node):
+        yield self.loop(node.body, node.condition)
+
+    def visit_ForStatement(self, node):
+        if node.init:
+            yield self.visit(node.init)
+        yield self.loop(node.cond, node.body, node.incr)
+
+def linear_scan(intervals, registers=LOCAL_REGISTERS):
+    """
+    Alocação por varredura linear (Poletto e Sarkar). Quando faltam registradores,
+    fica na memória a variável de menor peso entre as ativas e a atual, de modo que
+    as variáveis mais usadas dentro de laços permanecem em registradores.
+    Retorna {variável: registrador}; as variáveis ausentes ficam na pilha.
+    """
+    free = list(reversed(registers))
+    active = []
+    location = {}
+    for start, end, weight, var in intervals:
+        for item in list(active):
+            if item[0] < start:
+                active.remove(item)
+                free.append(location[item[2]])
+
+        if free:
+            location[var] = free.pop()
+            active.append((end, weight, var))
+            continue
+
+        victim = min(active, key=lambda item: item[1])
+        if victim[1] < weight:
+            active.remove(victim)
+            location[var] = location.pop(victim[2])
+            active.append((end, weight, var))
+    return location
+
+def assign_stack_slots(intervals, location, first_offset=0):
+    """
+    Distribui as variáveis que ficaram sem registrador em posições [ebp-N] abaixo de
+    first_offset, também por varredura linear: variáveis com intervalos de vida
+    disjuntos (como as de escopos irmãos) compartilham a mesma posição. Acrescenta as
+    posições em 'location' e retorna o número de bytes ocupados.
+    """
+    active = []
+    free = []
+    slots = 0
+    for start, end, _, var in intervals:
+        if var in location:
+            continue
+        while active and active[0][0] < start:
+            heapq.heappush(free, heapq.heappop(active)[1])
+        if free:
+            slot = heapq.heappop(free)
+        else:
+            slot = slots
+            slots += 1
+        heapq.heappush(active, (end, slot))
+        location[var] = f"[ebp{first_offset - 4 * (slot + 1)}]"
+    return 4 * slots
+
+def frame_size(locals_size, saved_registers, calls):
+    """
+    Tamanho reservado com um único 'sub esp' no prólogo. Em funções que chamam o
+    printf, o quadro é completado para que esp esteja alinhado em 16 bytes no 'call'
+    (System V i386), contando o endereço de retorno, ebp, os registradores salvos e o
+    argumento empilhado.
+    """
+    if not calls:
+        return locals_size
+    return locals_size + -(12 + 4 * saved_registers + locals_size) % 16
+
+def allocate_locals(function):
+    """
+    Anota em 'offset' o Symbol de cada variável local da função com a sua localização:
+    um registrador de LOCAL_REGISTERS ou uma posição [ebp-N] abaixo dos registradores
+    salvos no prólogo. Retorna (registradores salvos, bytes de pilha).
+    """
+    intervals = LiveIntervals().intervals(function)
+    location = linear_scan(intervals)
+    used = set(location.values())
+    saved = [register for register in LOCAL_REGISTERS if register in used]
+    locals_size = assign_stack_slots(intervals, location, -4 * len(saved))
+    for symbol, place in location.items():
+        symbol.offset = place
+    return saved, locals_size
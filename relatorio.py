@@ -0,0 +1,50 @@
+# Níveis de verbosidade dos diagnósticos do compilador
+QUIET, SUMMARY, FULL = range(3)
+
+LEVEL_NAMES = {'silencioso': QUIET, 'resumo': SUMMARY, 'completo': FULL}
+
+class Reporter:
+    """
+    Centraliza as mensagens emitidas pelas fases do compilador.
+
+    - QUIET: nenhuma listagem é formatada; apenas erros são exibidos.
+    - SUMMARY: cabeçalhos das fases, contagens e avisos.
+    - FULL: além do resumo, as listagens completas (tokens, AST, símbolos e Assembly).
+
+    Listagens caras devem ser protegidas por 'if reporter.full:' para que nenhum
+    trabalho de formatação seja feito nos níveis mais baixos.
+
+    Avisos e erros são sempre registrados em 'diagnostics' como (tipo, mensagem),
+    mesmo quando não são exibidos, para que possam ser guardados no cache de compilação.
+    """
+    def __init__(self, level=FULL, stream=None):
+        self.level = level
+        self.stream = stream
+        self.diagnostics = []
+        self.summary = level >= SUMMARY
+        self.full = level >= FULL
+
+    def write(self, message):
+        print(message, file=self.stream)
+
+    def phase(self, title):
+        if self.summary:
+            self.write(f"\n--- {title} ---")
+
+    def info(self, message):
+        if self.summary:
+            self.write(message)
+
+    def detail(self, message):
+        if self.full:
+            self.write(message)
+
+    def warning(self, message):
+        self.diagnostics.append(('aviso', message))
+        if self.summary:
+            self.write(message)
+
+    def error(self, message):
+        # Erros são sempre exibidos, independentemente do nível.
+        self.diagnostics.append(('erro', message))
+        self.write(message)
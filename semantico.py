@@ -1,10 +1,21 @@
 # semantico.py
 
 from nos import *
+from relatorio import Reporter
+from visitante import Visitor
+from escopos import ScopedTable
 
 class SemanticError(Exception):
-    """Classe para erros semânticos."""
-    pass
+    """Classe para erros semânticos. 'node' é o nó onde o erro foi encontrado, se conhecido."""
+    def __init__(self, message, node=None):
+        super().__init__(message)
+        self.node = node
+
+class SemanticErrors(SemanticError):
+    """Todos os erros encontrados pela análise, cada um com a sua localização."""
+    def __init__(self, errors):
+        super().__init__("\n".join(errors))
+        self.errors = errors
 
 class Symbol:
     def __init__(self, name, symbol_type, category='variable', params=None):
@@ -13,45 +24,82 @@ class Symbol:
         self.category = category
         self.param_types = params if params else []
         self.is_used = False
+        self.is_read = False
+        # Registrador ou posição [ebp-N] da variável, definida pela alocação de
+        # registradores antes da geração de código.
         self.offset = None
+        # Declaração e atribuições que escrevem na variável, para a eliminação de
+        # código morto quando ela nunca é lida.
+        self.stores = []
 
+    def __deepcopy__(self, memo):
+        # Cópias da árvore (desenrolamento de laços) continuam apontando para o símbolo.
+        return self
 
-class SymbolTable:
-    def __init__(self):
-        self.scopes = [{}]
 
-    def push_scope(self):
-        self.scopes.append({})
+class SymbolTable(ScopedTable):
+    def __init__(self, reporter=None):
+        super().__init__()
+        self.reporter = reporter if reporter else Reporter()
+        # Nós (Declaration e Assignment) que escrevem em variáveis nunca lidas.
+        self.dead_stores = set()
+        # Símbolos declarados, para as estatísticas de compilação (--stats).
+        self.declared = 0
 
     def pop_scope(self):
-        last_scope = self.scopes.pop()
-        for name, symbol in last_scope.items():
+        for symbol in super().pop_scope():
+            name = symbol.name
             if not symbol.is_used:
-                print(f"[AVISO SEMÂNTICO] Variável '{name}' foi declarada mas nunca utilizada.")
+                self.reporter.warning(f"[AVISO SEMÂNTICO] Variável '{name}' foi declarada mas nunca utilizada.")
+            elif not symbol.is_read:
+                self.reporter.warning(f"[AVISO SEMÂNTICO] Variável '{name}' recebe valores mas nunca é lida.")
+            if not symbol.is_read:
+                self.dead_stores.update(symbol.stores)
 
     def add_symbol(self, symbol):
         name = symbol.name
-        if name in self.scopes[-1]:
+        if self.defined_in_scope(name):
             raise SemanticError(f"Erro: Símbolo '{name}' já declarado neste escopo.")
-        print(f"[SEMANTICO] Declarando '{name}' com tipo '{symbol.type}' (categoria: {symbol.category})")
-        self.scopes[-1][name] = symbol
+        if self.reporter.full:
+            self.reporter.detail(f"[SEMANTICO] Declarando '{name}' com tipo '{symbol.type}' (categoria: {symbol.category})")
+        self.declared += 1
+        self.define(name, symbol)
 
     def lookup_symbol(self, name):
-        for scope in reversed(self.scopes):
-            if name in scope:
-                return scope[name]
-        return None
+        return self.lookup(name)
 
-class SemanticAnalyzer:
+class SemanticAnalyzer(Visitor):
     """
     Percorre a AST (padrão Visitor) para realizar a análise semântica.
+    Os métodos que visitam filhos são geradores executados com pilha explícita
+    (ver visitante.executar), permitindo programas com aninhamento arbitrário.
+
+    Cada Declaration e cada Identifier de variável é anotado com o seu Symbol (tipo,
+    uso e, depois da alocação de registradores, a localização), de modo que os
+    geradores de código não precisam resolver nomes.
+
+    Um erro não interrompe a análise: ele é registrado em 'errors' com a linha e a
+    coluna (quando 'tokens' é informado) e a análise segue na próxima instrução, até
+    'max_errors' erros. Ao final, analyze() levanta SemanticErrors com todos eles.
+
+    'signatures' lista (nome, tipo de retorno) das funções definidas antes da AST
+    analisada, quando ela é só um trecho do programa (compilacao_por_funcao.py): elas
+    entram no escopo global como se tivessem sido visitadas.
     """
-    def __init__(self):
-        self.symbol_table = SymbolTable()
+    def __init__(self, reporter=None, tokens=None, max_errors=None, signatures=()):
+        self.reporter = reporter if reporter else Reporter()
+        self.tokens = tokens
+        self.max_errors = max_errors
+        self.errors = []
+        self.symbol_table = SymbolTable(self.reporter)
         self.current_function = None
-        self._preload_symbols() 
+        # Variável que recebe a atribuição visitada: ler a própria variável para calcular
+        # o novo valor ('x = x + 1') não conta como leitura.
+        self.assigned_symbol = None
+        self.dead_stores = self.symbol_table.dead_stores
+        self._preload_symbols(signatures)
 
-    def _preload_symbols(self):
+    def _preload_symbols(self, signatures=()):
         printf_symbol = Symbol(
             name='printf',
             symbol_type='int', 
@@ -59,91 +107,147 @@ class SemanticAnalyzer:
             params=[] 
         )
         self.symbol_table.add_symbol(printf_symbol)
-
-    def visit(self, node):
-        """Método dispatcher que chama o método 'visit_' apropriado."""
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        for name, return_type in signatures:
+            # Redefinições já foram relatadas na análise da função repetida.
+            if not self.symbol_table.defined_in_scope(name):
+                self.symbol_table.add_symbol(Symbol(name, return_type, 'function'))
 
     def generic_visit(self, node):
         """Visita os filhos de um nó genérico."""
-        raise SemanticError(f"Nó não esperado na análise semântica: {type(node).__name__}")
+        raise SemanticError(f"Nó não esperado na análise semântica: {type(node).__name__}", node)
 
     def analyze(self, ast_root):
         """Ponto de entrada para iniciar a análise."""
-        print("\n--- Iniciando Análise Semântica ---")
-        self.visit(ast_root)
-        print("--- Análise Semântica Concluída com Sucesso ---")
+        self.reporter.info("\n--- Iniciando Análise Semântica ---")
+        self.traverse(ast_root)
+        if self.errors:
+            raise SemanticErrors(self.errors)
+        self.reporter.info("--- Análise Semântica Concluída com Sucesso ---")
         return ast_root 
-    
+
+    def record(self, error, node=None):
+        """Registra um erro com a sua localização e interrompe a análise no limite."""
+        node = error.node or node
+        message = str(error)
+        if self.tokens is not None and node is not None and node.span is not None:
+            line, column = self.tokens.line_column(node.start)
+            message = f"{message} (linha {line}, coluna {column})"
+        self.errors.append(message)
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            self.errors.append(f"Limite de {self.max_errors} erro(s) atingido; análise interrompida.")
+            raise SemanticErrors(self.errors)
+
+    def checked(self, node):
+        # Visita 'node' registrando um erro em vez de propagá-lo, para que a análise
+        # continue depois dele. Retorna None quando houve erro.
+        try:
+            return (yield self.visit(node))
+        except SemanticErrors:
+            raise
+        except SemanticError as error:
+            self.record(error, node)
+            return None
+
+    def check_condition(self, node, message):
+        # Condições de comandos de controle: o erro é registrado sem impedir a análise do corpo.
+        condition_type = yield self.checked(node)
+        if condition_type not in ('bool', None):
+            self.record(SemanticError(message.format(condition_type), node))
+
     def visit_list(self, node_list):
         for node in node_list:
-            self.visit(node)
+            yield self.checked(node)
 
     def visit_FunctionDefinition(self, node):
         func_symbol = Symbol(node.name, node.return_type, 'function')
-        self.symbol_table.add_symbol(func_symbol)
+        try:
+            self.symbol_table.add_symbol(func_symbol)
+        except SemanticError as error:
+            self.record(error, node)
         self.current_function = func_symbol
-        self.visit(node.body)
+        yield self.visit(node.body)
         self.current_function = None
 
     def visit_CompoundStatement(self, node):
         self.symbol_table.push_scope()
         for statement in node.statements:
-            self.visit(statement)
+            yield self.checked(statement)
         self.symbol_table.pop_scope()
 
     def visit_Declaration(self, node):
         var_symbol = Symbol(node.name, node.var_type, 'variable')
-        self.symbol_table.add_symbol(var_symbol)
+        var_symbol.stores.append(node)
+        node.symbol = var_symbol
+        rhs_type = None
         if node.initial_value:
-            rhs_type = self.visit(node.initial_value)
+            # O inicializador é analisado antes de a variável entrar no escopo: em
+            # 'int b = b + 1;' o 'b' da direita não pode ser a própria variável, ainda sem valor.
+            rhs_type = yield self.checked(node.initial_value)
+        try:
+            self.symbol_table.add_symbol(var_symbol)
+        except SemanticError as error:
+            self.record(error, node)
+        if rhs_type is not None:
             # lhs_type = node.var_type
             if rhs_type != node.var_type: 
-                raise SemanticError(f"Erro: Tipo incompatível na declaração. Não se pode atribuir '{rhs_type}' à variável '{node.name}'.") # do tipo '{lhs_type}'
+                raise SemanticError(f"Erro: Tipo incompatível na declaração. Não se pode atribuir '{rhs_type}' à variável '{node.name}'.", node) # do tipo '{lhs_type}'
     
     def visit_Assignment(self, node):
         # Verifica se a variável à esquerda foi declarada.
         symbol = self.symbol_table.lookup_symbol(node.lhs.name)
         if not symbol:
-            raise SemanticError(f"Erro: Variável '{node.lhs.name}' não foi declarada.")
+            raise SemanticError(f"Erro: Variável '{node.lhs.name}' não foi declarada.", node)
+        if symbol.category != 'variable':
+            raise SemanticError(f"Erro: '{node.lhs.name}' não é uma variável.", node)
         
         symbol.is_used = True
+        symbol.stores.append(node)
+        node.lhs.symbol = symbol
 
-        rhs_type = self.visit(node.rhs)
+        self.assigned_symbol = symbol
+        try:
+            rhs_type = yield self.visit(node.rhs)
+        finally:
+            # Um erro no lado direito é registrado e a análise continua: as leituras
+            # seguintes da variável não podem ser tomadas como parte desta atribuição.
+            self.assigned_symbol = None
         if symbol.type != rhs_type:
-            raise SemanticError(f"Atribuição de tipo incompatível para '{symbol.name}'.")
+            raise SemanticError(f"Atribuição de tipo incompatível para '{symbol.name}'.", node)
 
     def visit_BinaryOperation(self, node):
-        left_type = self.visit(node.left)
-        right_type = self.visit(node.right)
+        left_type = yield self.visit(node.left)
+        right_type = yield self.visit(node.right)
 
         if node.op in ['+', '-', '*', '/']:
             if not (left_type == 'int' and right_type == 'int'):
-                raise SemanticError(f"Erro: Operação aritmética '{node.op}' requer operandos do tipo 'int'.")
+                raise SemanticError(f"Erro: Operação aritmética '{node.op}' requer operandos do tipo 'int'.", node)
             return 'int'
         
         elif node.op in ['<', '>', '<=', '>=', '==', '!=']:
             if left_type != right_type:
-                raise SemanticError(f"Erro: Operação de comparação '{node.op}' requer operandos do mesmo tipo.")
+                raise SemanticError(f"Erro: Operação de comparação '{node.op}' requer operandos do mesmo tipo.", node)
             return 'bool'
             
         elif node.op in ['&&', '||']:
             if not (left_type == 'bool' and right_type == 'bool'):
-                 raise SemanticError(f"Erro: Operação lógica '{node.op}' requer operandos do tipo 'bool'.")
+                 raise SemanticError(f"Erro: Operação lógica '{node.op}' requer operandos do tipo 'bool'.", node)
             return 'bool'
         
         else:
-            raise SemanticError(f"Operador binário desconhecido ou não implementado: {node.op}")
+            raise SemanticError(f"Operador binário desconhecido ou não implementado: {node.op}", node)
 
 
     def visit_Identifier(self, node):
         symbol = self.symbol_table.lookup_symbol(node.name)
         if not symbol:
-            raise SemanticError(f"Erro: Variável '{node.name}' não foi declarada.")
+            raise SemanticError(f"Erro: Variável '{node.name}' não foi declarada.", node)
+        if symbol.category != 'variable':
+            raise SemanticError(f"Erro: '{node.name}' não é uma variável.", node)
         
         symbol.is_used = True
+        node.symbol = symbol
+        if symbol is not self.assigned_symbol:
+            symbol.is_read = True
         
         return symbol.type
 
@@ -151,56 +255,51 @@ class SemanticAnalyzer:
         return node.const_type
 
     def visit_IfStatement(self, node):
-        if self.visit(node.condition) != 'bool':
-            raise SemanticError("Condição do 'if' deve ser booleana.")
-        self.visit(node.true_body)
+        yield self.check_condition(node.condition, "Condição do 'if' deve ser booleana.")
+        yield self.visit(node.true_body)
         if node.false_body: 
-            self.visit(node.false_body)
+            yield self.visit(node.false_body)
             
     def visit_ForStatement(self, node):
         self.symbol_table.push_scope()
         if node.init: 
-            self.visit(node.init)
-        if node.cond and self.visit(node.cond) != 'bool':
-            raise SemanticError("Condição do 'for' deve ser booleana.")
+            yield self.checked(node.init)
+        if node.cond:
+            yield self.check_condition(node.cond, "Condição do 'for' deve ser booleana.")
         if node.incr: 
-            self.visit(node.incr)
-        self.visit(node.body)
+            yield self.checked(node.incr)
+        yield self.visit(node.body)
         self.symbol_table.pop_scope()
 
     def visit_WhileStatement(self, node):
-        condition_type = self.visit(node.condition)
-        if condition_type != 'bool':
-            raise SemanticError(f"Erro: A condição de um 'while' deve ser do tipo 'bool', mas foi '{condition_type}'.")
-        self.visit(node.body)
+        yield self.check_condition(node.condition, "Erro: A condição de um 'while' deve ser do tipo 'bool', mas foi '{}'.")
+        yield self.visit(node.body)
 
     def visit_DoWhileStatement(self, node):
-        self.visit(node.body)
-        condition_type = self.visit(node.condition)
-        if condition_type != 'bool':
-            raise SemanticError(f"Erro: Condição do 'do-while' deve ser booleana, mas foi '{condition_type}'.")
+        yield self.visit(node.body)
+        yield self.check_condition(node.condition, "Erro: Condição do 'do-while' deve ser booleana, mas foi '{}'.")
 
     def visit_FunctionCall(self, node):
         func_name = node.name.name
 
         if func_name == 'printf':
             for arg_node in node.args:
-                self.visit(arg_node)
+                yield self.visit(arg_node)
             return 'int'
 
         symbol = self.symbol_table.lookup_symbol(func_name)
 
         if not symbol or symbol.category != 'function':
-            raise SemanticError(f"Erro: Função '{func_name}' não foi declarada.")
+            raise SemanticError(f"Erro: Função '{func_name}' não foi declarada.", node)
         
         return symbol.type
     
     def visit_ReturnStatement(self, node):
         if not self.current_function:
-            raise SemanticError("Erro: Declaração 'return' encontrada fora de uma função.")
+            raise SemanticError("Erro: Declaração 'return' encontrada fora de uma função.", node)
         
         expected = self.current_function.type
         
-        actual = self.visit(node.value) if node.value else 'void'
+        actual = (yield self.visit(node.value)) if node.value else 'void'
         if actual != expected:
-            raise SemanticError(f"Tipo de retorno incompatível em '{self.current_function.name}'.")
+            raise SemanticError(f"Tipo de retorno incompatível em '{self.current_function.name}'.", node)
@@ -0,0 +1,171 @@
+import io
+import os
+import sys
+import json
+import errno
+import socket
+import argparse
+import tempfile
+import contextlib
+import socketserver
+
+from main import compilar_codigo
+from relatorio import Reporter, LEVEL_NAMES, QUIET
+from cache_compilacao import CompilationCache
+from compilacao_por_funcao import FunctionCache
+
+# Segundos que uma conexão pode ficar sem enviar nada antes de ser fechada: as conexões
+# são atendidas em sequência, e um cliente ocioso não pode bloquear os demais.
+TIMEOUT_CONEXAO = 10
+
+def caminho_socket_padrao():
+    return os.path.join(tempfile.gettempdir(), f"compilador-c-{os.getuid()}.sock")
+
+def processar_requisicao(requisicao, cache=None):
+    # Compila uma requisição {"caminho": ...} ou {"codigo": ...} (com "opcoes" de
+    # compilação opcionais) e monta a resposta
+    # {"sucesso", "assembly", "diagnosticos", "saida"}.
+    comando = requisicao.get('comando', 'compilar')
+    if comando == 'ping':
+        return {'sucesso': True}
+    if comando == 'estatisticas':
+        return {'sucesso': True, 'cache': cache.stats() if cache is not None else None}
+    if comando != 'compilar':
+        return {'sucesso': False, 'diagnosticos': [('erro', f"ERRO: Comando desconhecido '{comando}'.")]}
+
+    reporter = Reporter(LEVEL_NAMES.get(requisicao.get('verbosidade'), QUIET))
+    opcoes = requisicao.get('opcoes') or {}
+    saida = io.StringIO()
+    resposta = {'sucesso': False, 'assembly': None}
+    with contextlib.redirect_stdout(saida):
+        try:
+            if 'codigo' in requisicao:
+                codigo = requisicao['codigo']
+            else:
+                with open(requisicao['caminho'], 'r', encoding='utf-8') as f:
+                    codigo = f.read()
+
+            chave = None
+            entrada = None
+            cache_funcoes = None
+            if cache is not None and not requisicao.get('sem_cache'):
+                chave = cache.key(codigo, opcoes)
+                entrada = cache.get(chave) if not reporter.full else None
+                # Arquivos recompilados a cada edição: só as funções alteradas são compiladas.
+                if entrada is None and not reporter.full and 'codigo' not in requisicao:
+                    cache_funcoes = FunctionCache(cache.load_functions(requisicao['caminho'], opcoes))
+
+            if entrada is not None:
+                for tipo, mensagem in entrada['diagnosticos']:
+                    if tipo == 'erro':
+                        reporter.error(mensagem)
+                    else:
+                        reporter.warning(mensagem)
+                resposta['sucesso'], resposta['assembly'] = entrada['sucesso'], entrada['assembly']
+            else:
+                resposta['sucesso'], resposta['assembly'] = compilar_codigo(codigo, reporter, opcoes,
+                                                                            cache_funcoes=cache_funcoes)
+                if chave is not None:
+                    cache.put(chave, {
+                        'sucesso': resposta['sucesso'],
+                        'assembly': resposta['assembly'],
+                        'diagnosticos': reporter.diagnostics,
+                    })
+                if cache_funcoes is not None and cache_funcoes.hits + cache_funcoes.misses:
+                    cache.store_functions(requisicao['caminho'], opcoes, cache_funcoes.entries)
+        except OSError as e:
+            reporter.error(f"ERRO: Não foi possível ler '{requisicao.get('caminho')}': {e.strerror}")
+        except Exception as e:
+            reporter.error(f"ERRO: {type(e).__name__}: {e}")
+
+    resposta['diagnosticos'] = reporter.diagnostics
+    resposta['saida'] = saida.getvalue()
+    return resposta
+
+class CompileRequestHandler(socketserver.StreamRequestHandler):
+    # Protocolo: cada linha recebida é uma requisição JSON e cada linha enviada, a resposta.
+    def setup(self):
+        # StreamRequestHandler aplica 'timeout' ao socket da conexão; o tempo de compilação
+        # não conta, só a espera por cada leitura ou escrita.
+        self.timeout = self.server.timeout_conexao
+        super().setup()
+
+    def handle(self):
+        try:
+            self.atender()
+        except TimeoutError:
+            # Cliente ocioso (ou que não lê as respostas): a conexão é encerrada.
+            pass
+
+    def atender(self):
+        for linha in self.rfile:
+            try:
+                requisicao = json.loads(linha)
+            except ValueError:
+                resposta = {'sucesso': False, 'diagnosticos': [('erro', "ERRO: Requisição JSON inválida.")]}
+            else:
+                if requisicao.get('comando') == 'parar':
+                    self.wfile.write(b'{"sucesso": true}\n')
+                    self.server.encerrar = True
+                    return
+                resposta = processar_requisicao(requisicao, self.server.cache)
+            self.wfile.write(json.dumps(resposta).encode('utf-8') + b'\n')
+
+def servidor_ativo(caminho_socket):
+    # Um servidor está ouvindo em 'caminho_socket' se a conexão for aceita; a conexão é
+    # recusada quando o arquivo do socket ficou para trás sem nenhum processo.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conexao:
+        try:
+            conexao.connect(caminho_socket)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+    return True
+
+class CompileServer(socketserver.UnixStreamServer):
+    """
+    Servidor de compilação persistente: os módulos do compilador e a regex do léxico
+    são carregados uma única vez, e cada requisição executa apenas as fases.
+    As conexões são atendidas em sequência (a compilação é limitada pela CPU e o
+    redirecionamento da saída dos diagnósticos não é seguro entre threads); por isso
+    uma conexão ociosa é fechada depois de 'timeout_conexao' segundos.
+    """
+    def __init__(self, caminho_socket, cache=None, timeout_conexao=TIMEOUT_CONEXAO):
+        if os.path.exists(caminho_socket):
+            if servidor_ativo(caminho_socket):
+                raise OSError(errno.EADDRINUSE, "Já existe um servidor de compilação em execução", caminho_socket)
+            # Socket deixado por um servidor que não foi encerrado normalmente.
+            os.unlink(caminho_socket)
+        super().__init__(caminho_socket, CompileRequestHandler)
+        self.cache = cache
+        self.timeout_conexao = timeout_conexao
+        self.encerrar = False
+
+    def servir(self):
+        try:
+            while not self.encerrar:
+                self.handle_request()
+        finally:
+            self.server_close()
+            os.unlink(self.server_address)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de compilação (socket Unix) para o compilador de C subset")
+    parser.add_argument("--socket", default=caminho_socket_padrao(), help="Caminho do socket Unix")
+    parser.add_argument("--sem-cache", action="store_true", help="Não usa o cache de compilação em disco")
+    parser.add_argument("--cache-dir", default=".cache_compilador", help="Diretório do cache de compilação")
+    parser.add_argument("--cache-max-mb", type=float, default=256, help="Tamanho máximo do cache em MiB")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_CONEXAO,
+                        help=f"Segundos sem atividade antes de fechar uma conexão (padrão: {TIMEOUT_CONEXAO})")
+    args = parser.parse_args()
+
+    cache = None if args.sem_cache else CompilationCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024))
+    try:
+        servidor = CompileServer(args.socket, cache, args.timeout)
+    except OSError as e:
+        print(f"ERRO: Não foi possível ouvir em '{args.socket}': {e.strerror}", file=sys.stderr)
+        sys.exit(2)
+    print(f"Servidor de compilação ouvindo em '{args.socket}'", file=sys.stderr)
+    try:
+        servidor.servir()
+    except KeyboardInterrupt:
+        pass
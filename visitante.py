@@ -0,0 +1,82 @@
+from types import GeneratorType
+
+def executar(raiz):
+    """
+    Executa uma travessia recursiva usando uma pilha explícita em vez da pilha do Python.
+
+    Cada passo da travessia é um gerador: 'resultado = yield subgerador' suspende o
+    gerador atual, executa o subgerador até o fim e devolve o seu valor de retorno.
+    Se o valor entregue por 'yield' não for um gerador, ele é devolvido imediatamente.
+    Exceções sobem pela pilha como na recursão comum, podendo ser tratadas com
+    try/except nos geradores intermediários. Assim, árvores de qualquer profundidade
+    são percorridas sem atingir o limite de recursão.
+    """
+    if type(raiz) is not GeneratorType:
+        return raiz
+
+    pilha = [raiz]
+    valor = None
+    erro = None
+    while pilha:
+        topo = pilha[-1]
+        try:
+            if erro is None:
+                filho = topo.send(valor)
+            else:
+                excecao, erro = erro, None
+                filho = topo.throw(excecao)
+        except StopIteration as fim:
+            pilha.pop()
+            valor = fim.value
+            continue
+        except BaseException as e:
+            pilha.pop()
+            if not pilha:
+                raise
+            erro = e
+            continue
+
+        if type(filho) is GeneratorType:
+            pilha.append(filho)
+            valor = None
+        else:
+            valor = filho
+    return valor
+
+class Visitor:
+    """
+    Base dos passes sobre a AST (padrão Visitor).
+
+    'visit' chama o método 'visit_<Classe>' do nó. Métodos que visitam filhos são
+    geradores ('tipo = yield self.visit(filho)'); métodos de folhas podem retornar o
+    valor diretamente. 'traverse' executa a visita a partir de um nó com a pilha
+    explícita de 'executar'.
+
+    O método de cada classe de nó é resolvido uma única vez por classe de visitante e
+    guardado em '_dispatch', evitando montar o nome e chamar getattr a cada nó.
+    """
+    _dispatch = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {}
+
+    @classmethod
+    def _resolve(cls, node_class):
+        method = getattr(cls, f'visit_{node_class.__name__}', cls.generic_visit)
+        cls._dispatch[node_class] = method
+        return method
+
+    def visit(self, node):
+        """Método dispatcher que chama o método 'visit_' apropriado."""
+        try:
+            method = self._dispatch[type(node)]
+        except KeyError:
+            method = self._resolve(type(node))
+        return method(self, node)
+
+    def generic_visit(self, node):
+        raise Exception(f"Nenhum método visit_{type(node).__name__} encontrado")
+
+    def traverse(self, node):
+        return executar(self.visit(node))